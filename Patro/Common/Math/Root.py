@@ -18,7 +18,23 @@
 #
 ####################################################################################################
 
-"""This module implements root finding for second and third degree equation.
+"""This module implements numerical root finding for polynomial equations.
+
+The coefficients are given from the highest degree to the constant term, like for
+:func:`numpy.roots`, e.g. ``cubic_root(a, b, c, d)`` solves :math:`a x^3 + b x^2 + c x + d = 0`.
+
+The functions return the sorted list of the real roots, a multiple root is returned once.  If the
+leading coefficients are null, the equation is solved for the lower degree.
+
+* quadratic, cubic and quartic equations are solved using closed-form formulae written to avoid
+  cancellations, the roots are then polished by a Newton step,
+* higher degree equations are solved by bracketing: the roots of the derivative split the real line
+  in intervals where the polynomial is monotonic, and each interval which brackets a root is
+  solved by a safeguarded Newton method.
+
+:func:`polynomial_root_batch` solves many polynomials of the same degree at once using the
+eigenvalues of their companion matrices.
+
 """
 
 ####################################################################################################
@@ -26,176 +42,454 @@
 __all__ = [
     'quadratic_root',
     'cubic_root',
+    'quartic_root',
     'fifth_root',
     'fifth_root_normalised',
+    'polynomial_root',
+    'polynomial_root_batch',
 ]
 
 ####################################################################################################
 
-from math import acos, cos, pi, sqrt
+from math import acos, copysign, cos, pi, sqrt
+
+import numpy as np
+
+####################################################################################################
+
+EPSILON = np.finfo(np.float64).eps
+
+####################################################################################################
+
+def _cbrt(x):
+    return copysign(abs(x)**(1/3), x)
+
+####################################################################################################
+
+def _horner(coefficients, x):
+    y = 0.
+    for coefficient in coefficients:
+        y = y*x + coefficient
+    return y
+
+####################################################################################################
+
+def _horner_with_derivative(coefficients, x):
+    y = 0.
+    dy = 0.
+    for coefficient in coefficients:
+        dy = dy*x + y
+        y = y*x + coefficient
+    return y, dy
+
+####################################################################################################
+
+def _polish(coefficients, roots):
+
+    """Polish the roots by Newton steps, and return them sorted without duplicates.
 
-try:
-    import sympy
-except ImportError:
-    sympy = None
+    A spurious root due to rounding errors is removed.
 
-from .Functions import sign
+    """
+
+    polished_roots = []
+    for x in roots:
+        y, dy = _horner_with_derivative(coefficients, x)
+        for i in range(2):
+            if y == 0 or dy == 0:
+                break
+            step = y / dy
+            # the derivative vanishes near a multiple root
+            if abs(step) > 1e-3 * max(1, abs(x)):
+                break
+            x1 = x - step
+            y1, dy1 = _horner_with_derivative(coefficients, x1)
+            # keep the step only if it improves the residual
+            if abs(y1) >= abs(y):
+                break
+            x, y, dy = x1, y1, dy1
+        if _is_root(coefficients, x, 1e-9):
+            polished_roots.append(x)
+
+    polished_roots.sort()
+    return _unique(polished_roots, coefficients)
+
+####################################################################################################
+
+def _strip(coefficients):
+
+    """Remove the leading null coefficients."""
+
+    for i, coefficient in enumerate(coefficients):
+        if coefficient != 0:
+            return [float(x) for x in coefficients[i:]]
+    return []
+
+####################################################################################################
+
+def _is_ill_scaled(coefficients):
+    # A small leading coefficient gives large normalised coefficients,
+    # the closed-form formulae then lose the small roots.
+    return max(abs(x) for x in coefficients[1:]) > 1e4 * abs(coefficients[0])
 
 ####################################################################################################
 
 def quadratic_root(a, b, c):
 
     # https://en.wikipedia.org/wiki/Quadratic_equation
+    # Numerical Recipes, 5.6 Quadratic and Cubic Equations
 
-    if a == 0 and b == 0:
-        return None
     if a == 0:
-        return - c / b
+        if b == 0:
+            return []
+        return [- c / b]
 
     D = b**2 - 4*a*c
 
-    if D < 0:
-        return None # not real
+    # a tiny discriminant is a rounding error for a double root
+    if abs(D) <= 16*EPSILON * max(b**2, abs(4*a*c)):
+        return [- b / (2*a)]
+    elif D < 0:
+        return [] # not real
 
-    b = -b
-    s = 1 / (2*a)
-    if D > 0:
-        # Fixme: sign of b ???
-        r1 = (b - sqrt(D)) * s
-        r2 = (b + sqrt(D)) * s
-        return r1, r2
-    else:
-        return b * s
+    # avoid the cancellation of -b + sqrt(D)
+    q = -.5 * (b + copysign(sqrt(D), b))
+    r1 = q / a
+    r2 = c / q
+    return sorted((r1, r2))
 
 ####################################################################################################
 
 def cubic_root(a, b, c, d):
 
+    # https://en.wikipedia.org/wiki/Cubic_function
+    # Numerical Recipes, 5.6 Quadratic and Cubic Equations
+
     if a == 0:
         return quadratic_root(b, c, d)
+    if d == 0:
+        # x = 0 is a root
+        return _polish((a, b, c, d), [0.] + quadratic_root(a, b, c))
+    if _is_ill_scaled((a, b, c, d)):
+        return _bracketing_root([float(x) for x in (a, b, c, d)])
+
+    # x**3 + A x**2 + B x + C
+    A = b / a
+    B = c / a
+    C = d / a
+
+    # depressed cubic t**3 + 3 Q t - 2 R with x = t - A/3
+    Q = (3*B - A**2) / 9
+    R = (9*A*B - 27*C - 2*A**3) / 54
+    shift = A / 3
+    Q3 = Q**3
+    D = Q3 + R**2
+
+    if abs(D) <= 16*EPSILON * (abs(Q3) + R**2):
+        # double root
+        u = _cbrt(R)
+        roots = [2*u - shift, -u - shift]
+    elif D > 0:
+        # one real root
+        # u**3 is computed without cancellation
+        u = _cbrt(R + copysign(sqrt(D), R))
+        roots = [u - Q/u - shift]
+        # a double root can be lost due to rounding errors,
+        # check the critical points t = ± sqrt(-Q)
+        if Q < 0:
+            sqrt_Q = sqrt(-Q)
+            for x in (sqrt_Q - shift, -sqrt_Q - shift):
+                if _is_root((1., A, B, C), x):
+                    roots.append(x)
     else:
-        return cubic_root_sympy(a, b, c, d)
+        # three real roots, Q < 0
+        sqrt_Q = sqrt(-Q)
+        theta = acos(max(-1., min(1., R / (sqrt_Q**3)))) / 3
+        roots = [2*sqrt_Q*cos(theta + k*2*pi/3) - shift for k in range(3)]
+
+    return _polish((1., A, B, C), roots)
 
 ####################################################################################################
 
-def x_symbol():
-    return sympy.Symbol('x', real=True)
+def quartic_root(a, b, c, d, e):
 
-def real_roots(expression, x):
-    return [i.n() for i in sympy.real_roots(expression, x)]
+    # https://en.wikipedia.org/wiki/Quartic_function#Ferrari's_solution
+
+    if a == 0:
+        return cubic_root(b, c, d, e)
+    if e == 0:
+        # x = 0 is a root
+        return _polish((a, b, c, d, e), [0.] + cubic_root(a, b, c, d))
+    if _is_ill_scaled((a, b, c, d, e)):
+        return _bracketing_root([float(x) for x in (a, b, c, d, e)])
+
+    # x**4 + A x**3 + B x**2 + C x + D
+    A = b / a
+    B = c / a
+    C = d / a
+    D = e / a
+    coefficients = (1., A, B, C, D)
+
+    # depressed quartic y**4 + p y**2 + q y + r with x = y - A/4
+    shift = A / 4
+    A2 = A**2
+    p = B - 3*A2/8
+    q = C - A*B/2 + A2*A/8
+    r = D - A*C/4 + A2*B/16 - 3*A2**2/256
+
+    scale = max(1, abs(p), abs(r), abs(q))
+    if abs(q) <= 8*EPSILON * scale:
+        # biquadratic y**4 + p y**2 + r
+        roots = []
+        for z in quadratic_root(1, p, r):
+            if z > 0:
+                y = sqrt(z)
+                roots.extend((y - shift, -y - shift))
+            elif z == 0:
+                roots.append(-shift)
+    else:
+        # the resolvent cubic z**3 + 2p z**2 + (p**2 - 4r) z - q**2 has a positive root
+        # since its value is -q**2 at 0
+        z = max(cubic_root(1, 2*p, p**2 - 4*r, -q**2))
+        if z <= 0:
+            z = EPSILON * scale
+        s = sqrt(z)
+        # y**4 + p y**2 + q y + r = (y**2 + s y + u) (y**2 - s y + v)
+        u = (p + z - q/s) / 2
+        v = (p + z + q/s) / 2
+        roots = [y - shift for y in quadratic_root(1, s, u) + quadratic_root(1, -s, v)]
+
+    # a double root can be lost due to rounding errors, check the critical points
+    if len(roots) < 4:
+        for x in cubic_root(4, 3*A, 2*B, C):
+            if _is_root(coefficients, x):
+                roots.append(x)
+
+    return _polish(coefficients, roots)
 
 ####################################################################################################
 
-def cubic_root_sympy(a, b, c, d):
-    x = x_symbol()
-    E = a*x**3 + b*x**2 + c*x + d
-    return real_roots(E, x)
+def _bracketed_root(coefficients, x0, x1, y0, y1):
+
+    """Find the root of a monotonic polynomial on [x0, x1] using a safeguarded Newton method."""
+
+    # x0 < x1
+    is_positive0 = y0 > 0
+    # start with a secant step
+    x = x0 - y0 * (x1 - x0) / (y1 - y0)
+    for i in range(100):
+        y, dy = _horner_with_derivative(coefficients, x)
+        if y == 0:
+            return x
+        # shrink the bracket
+        if (y > 0) == is_positive0:
+            x0 = x
+        else:
+            x1 = x
+        scale = max(1, abs(x))
+        if dy != 0:
+            x_next = x - y / dy
+            if x0 <= x_next <= x1:
+                # Newton converges quadratically, the error of x_next is about step**2
+                if abs(x_next - x) <= 1e-9 * scale:
+                    return x_next
+            else:
+                x_next = .5 * (x0 + x1)
+        else:
+            x_next = .5 * (x0 + x1)
+        if x1 - x0 <= 4*EPSILON * scale:
+            return x_next
+        x = x_next
+    return x
 
 ####################################################################################################
 
-def cubic_root_normalised(a, b, c):
-    x = x_symbol()
-    E = x**3 + a*x**2 + b*x + c
-    return real_roots(E, x)
+def _is_root(coefficients, x, tolerance=64*EPSILON):
+    # the value is null up to the rounding errors, which scale as sum |coefficient * x**i|
+    y = 0.
+    scale = 0.
+    abs_x = abs(x)
+    for coefficient in coefficients:
+        y = y*x + coefficient
+        scale = scale*abs_x + abs(coefficient)
+    return abs(y) <= tolerance * scale
 
 ####################################################################################################
 
-def fourth_root_normalised(a, b, c, d):
-    x = x_symbol()
-    E = x**4 + a*x**3 + b*x**2 + c*x + d
-    return real_roots(E, x)
+def _bracketing_root(coefficients, interval=None):
 
-####################################################################################################
+    degree = len(coefficients) - 1
+    derivative = [coefficient * (degree - i) for i, coefficient in enumerate(coefficients[:-1])]
 
-def fifth_root_sympy(a, b, c, d, e, f):
-    x = x_symbol()
-    E = a*x**5 + b*x**4 + c*x**3 + d*x**2 + e*x + f
-    return real_roots(E, x)
+    if interval is None:
+        # Cauchy bound on the roots
+        leading = coefficients[0]
+        bound = 1 + max(abs(coefficient / leading) for coefficient in coefficients[1:])
+        inf, sup = -bound, bound
+    else:
+        inf, sup = interval
+    critical_points = polynomial_root(derivative, (inf, sup))
+
+    points = [inf] + [x for x in critical_points if inf < x < sup] + [sup]
+    values = [_horner(coefficients, x) for x in points]
+
+    roots = []
+    last = len(points) - 1
+    for i, (x, y) in enumerate(zip(points, values)):
+        # a critical point is a multiple root when the polynomial is flat enough
+        is_critical_point = 0 < i < last
+        if y == 0 or ((is_critical_point or interval is not None) and _is_root(coefficients, x)):
+            roots.append(x)
+            values[i] = 0
+        elif i:
+            x0, y0 = points[i-1], values[i-1]
+            if y0 != 0 and (y0 < 0) != (y < 0):
+                roots.append(_bracketed_root(coefficients, x0, x, y0, y))
+
+    return _unique(sorted(roots), coefficients)
 
 ####################################################################################################
 
-def fifth_root_normalised(a, b, c, d, e):
-    x = x_symbol()
-    E = x**5 + a*x**4 + b*x**3 + c*x**2 + d*x + e
-    return real_roots(E, x)
+def _unique(roots, coefficients=None):
 
-####################################################################################################
+    """Remove the duplicated roots, *roots* must be sorted.
 
-def fifth_root(*args):
-    # Fixme: RuntimeWarning: divide by zero encountered in double_scalars
-    a = args[0]
-    if a == 0:
-        return fifth_root_sympy(*args)
-    else:
-        return fifth_root_normalised(*[x/a for x in args[1:]])
+    A multiple root is found as a cluster of close roots due to rounding errors, two roots are
+    merged when the polynomial vanishes at their middle.
+
+    """
+
+    unique_roots = []
+    for x in roots:
+        if unique_roots:
+            x0 = unique_roots[-1]
+            if abs(x - x0) <= 8*EPSILON*max(1, abs(x)):
+                continue
+            if coefficients is not None:
+                middle = .5*(x0 + x)
+                if _is_root(coefficients, middle):
+                    continue
+        unique_roots.append(x)
+    return unique_roots
 
 ####################################################################################################
 
-def cubic_root_normalised(a, b, c):
+def polynomial_root(coefficients, interval=None):
 
-    # Reference: ???
-    # converted from haskell http://hackage.haskell.org/package/cubicbezier-0.6.0.5
+    """Return the real roots of the polynomial given by *coefficients*, from the highest degree to
+    the constant term.
 
-    q = (a**2 - 3*b) / 9
-    q3 = q**3
-    m2sqrtQ = -2 * sqrt(q)
-    r = (2*a**3 - 9*a*b + 27*c) / 54
-    r2 = r**2
-    d = - sign(r)*((abs(r) + sqrt(r2-q3))**1/3) # Fixme: sqrt ??
+    If *interval* is a ``(inf, sup)`` pair, only the roots in this closed interval are returned.  For
+    a degree higher than 4, the roots outside the interval are then not computed.
 
-    if d == 0:
-        e = 0
-    else:
-        e = q/d
-
-    if r2 < q3:
-        t = acos(r/sqrt(q3))
-        return [
-            m2sqrtQ * cos(t/3)          - a/3,
-            m2sqrtQ * cos((t + 2*pi)/3) - a/3,
-            m2sqrtQ * cos((t - 2*pi)/3) - a/3,
-        ]
+    """
+
+    coefficients = _strip(coefficients)
+    degree = len(coefficients) - 1
+    if degree < 1:
+        roots = []
+    elif degree == 1:
+        roots = [- coefficients[1] / coefficients[0]]
+    elif degree == 2:
+        roots = quadratic_root(*coefficients)
+    elif degree == 3:
+        roots = cubic_root(*coefficients)
+    elif degree == 4:
+        roots = quartic_root(*coefficients)
     else:
-        return [d + e - a/3]
+        return _bracketing_root(coefficients, interval)
 
-####################################################################################################
+    if interval is not None:
+        inf, sup = interval
+        roots = [x for x in roots if inf <= x <= sup]
+    return roots
 
-def _cubic_root(a, b, c, d):
+####################################################################################################
 
-    # https://en.wikipedia.org/wiki/Cubic_function
+def cubic_root_normalised(a, b, c):
+    return cubic_root(1, a, b, c)
 
-    # x, a, b, c, d = symbols('x a b c d')
-    # solveset(x**3+b*x**2+c*x+d, x)
+####################################################################################################
 
-    # D0 = b**2 - 3*c
-    # D1 = 2*b**3 - 9*b*c + 27*d
-    # DD = D1**2 - 4*D0**3
-    # C = ((D1 + sqrt(DD) /2)**(1/3)
-    # - (b + C                      + D0/C                        ) /3
-    # - (b + (-1/2 - sqrt(3)*I/2)*C + D0/((-1/2 - sqrt(3)*I/2)*C) ) /3
-    # - (b + (-1/2 + sqrt(3)*I/2)*C + D0/((-1/2 + sqrt(3)*I/2)*C) ) /3
+def fourth_root_normalised(a, b, c, d):
+    return quartic_root(1, a, b, c, d)
 
-    # Fixme: divide by a ???
+####################################################################################################
 
-    D = 18*a*b*c*d - 4*b**3*d + b**2*c**2 - 4*a*c**3 - 27*a**2*d**2
-    D0 = b**2 - 3*a*c
+def fifth_root(a, b, c, d, e, f):
+    return polynomial_root((a, b, c, d, e, f))
 
-    if D == 0:
-        if D0 == 0:
-            return - b / (3*a) # triple root
-        else:
-            r1 = (9*a*d - b*c) / (2*D0) # double root
-            r2 = (4*a*b*c - 9*a**2*d - b**3) / (a*D0) # simple root
-            return r1, r2
-    else:
-        D1 = 2*b**3 - 9*a*b*c + 27*a**2*d
-        # DD = - D / (27*a**2)
-        DD = D1**2 - 4*D0**3
+####################################################################################################
 
-        # Fixme: need more info ...
-        # can have 3 real roots, e.g. 3*x**3 - 25*x**2 + 27*x + 9
+def fifth_root_normalised(a, b, c, d, e):
+    return polynomial_root((1, a, b, c, d, e))
 
-        # C1 = pow((D1 +- sqrt(DD))/2, 1/3)
-        # r = - (b + C + D0/C) / (3*a)
+####################################################################################################
 
-        raise NotImplementedError
+def polynomial_root_batch(coefficients, imaginary_tolerance=1e-8):
+
+    """Solve many polynomials of the same degree at once.
+
+    *coefficients* is a M×(n+1) array, each row gives the coefficients of a polynomial of degree n
+    from the highest degree to the constant term.
+
+    Return a M×n array where each row contains the sorted real roots of the polynomial, padded with
+    NaN.  A root of multiplicity k splits into a cluster of k eigenvalues which are usually complex,
+    thus it can be returned less than k times, or missed if the whole cluster is rejected by
+    *imaginary_tolerance*, and its accuracy is about the k-th root of the machine epsilon.
+
+    The roots are the eigenvalues of the companion matrices, computed by one LAPACK call for all the
+    polynomials, then polished by a Newton step.  A polynomial having a null leading coefficient is
+    solved by :func:`polynomial_root`.
+
+    """
+
+    coefficients = np.asarray(coefficients, dtype=np.float64)
+    if coefficients.ndim != 2 or coefficients.shape[1] < 2:
+        raise ValueError('Coefficients must have a (M, n+1) shape, got {}'.format(coefficients.shape))
+
+    number_of_polynomials, size = coefficients.shape
+    degree = size - 1
+    roots = np.full((number_of_polynomials, degree), np.nan)
+
+    leading = coefficients[:,0]
+    regular = leading != 0
+    for i in np.flatnonzero(~regular):
+        row_roots = polynomial_root(coefficients[i])
+        roots[i,:len(row_roots)] = row_roots
+
+    if not np.any(regular):
+        return roots
+
+    normalised = coefficients[regular,1:] / leading[regular,np.newaxis]
+    if degree == 1:
+        roots[regular,0] = -normalised[:,0]
+        return roots
+
+    # companion matrices
+    companion = np.zeros((normalised.shape[0], degree, degree))
+    companion[:,0,:] = -normalised
+    index = np.arange(degree - 1)
+    companion[:,index + 1,index] = 1
+    eigenvalues = np.linalg.eigvals(companion)
+
+    real_parts = eigenvalues.real
+    magnitude = np.maximum(1, np.abs(eigenvalues))
+    is_real = np.abs(eigenvalues.imag) <= imaginary_tolerance * magnitude
+    real_roots = np.where(is_real, real_parts, np.nan)
+
+    # Newton step, y and dy are computed by Horner's method
+    x = real_roots
+    y = np.ones_like(x)
+    dy = np.zeros_like(x)
+    for i in range(degree):
+        dy = dy*x + y
+        y = y*x + normalised[:,i,np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        step = np.where(dy != 0, y / dy, 0)
+    # a multiple root has a null derivative, the step is then meaningless
+    step = np.where(np.abs(step) <= 1e-3 * np.maximum(1, np.abs(x)), step, 0)
+    real_roots = np.sort(x - step, axis=1) # NaN are sorted at the end
+
+    roots[regular] = real_roots
+    return roots
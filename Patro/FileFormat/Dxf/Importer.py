@@ -28,6 +28,8 @@ __all__ = ['DxfImporter']
 
 ####################################################################################################
 
+import math
+
 import ezdxf # Python packahe to read/write DXF
 
 from Patro.GeometryEngine.Conic import Circle2D, Ellipse2D, AngularDomain
@@ -113,7 +115,11 @@ class DxfImporter:
         item_dxf = item.dxf
         center = self._to_vector(item_dxf.center)
         if is_arc:
-            domain = AngularDomain(item_dxf.start_angle, item_dxf.end_angle)
+            # DXF arcs are counterclockwise
+            start_angle, stop_angle = item_dxf.start_angle, item_dxf.end_angle
+            if stop_angle < start_angle:
+                stop_angle += 360
+            domain = AngularDomain(start_angle, stop_angle)
         else:
             domain = None
         circle = Circle2D(center, item_dxf.radius, domain=domain)
@@ -127,7 +133,10 @@ class DxfImporter:
         center = self._to_vector(item_dxf.center)
         major_axis = self._to_vector(item_dxf.major_axis)
         minor_axis = major_axis * item_dxf.ratio
-        domain = AngularDomain(item_dxf.start_param, item_dxf.end_param, degrees=False)
+        start_parameter, stop_parameter = item_dxf.start_param, item_dxf.end_param
+        if stop_parameter < start_parameter:
+            stop_parameter += 2*math.pi
+        domain = AngularDomain(start_parameter, stop_parameter, degrees=False)
         radius_x, radius_y = major_axis.magnitude, minor_axis.magnitude
         angle = major_axis.orientation
         if angle == 90:
@@ -53,13 +53,16 @@ __all__ = [
 
 import logging
 
-from math import log, sqrt
+from math import comb, log, sqrt
 
+from IntervalArithmetic import Interval2D
 import numpy as np
 
-from Patro.Common.Math.Root import quadratic_root, cubic_root, fifth_root
+from Patro.Common.Math.Root import quadratic_root, cubic_root, polynomial_root
+from .Flattening import FlatteningMixin, flatten_bezier, _bezier_deviations, _split_bezier
 from .Interpolation import interpolate_two_points
 from .Line import Line2D
+from .PointArray import Point2DArray
 from .Primitive import Primitive3P, Primitive4P, PrimitiveNP, Primitive2DMixin
 from .Transformation import AffineTransformation
 from .Vector import Vector2D
@@ -70,12 +73,215 @@ _module_logger = logging.getLogger(__name__)
 
 ####################################################################################################
 
-class BezierMixin2D(Primitive2DMixin):
+_gauss_legendre_cache = {}
+
+def _gauss_legendre(order):
+    """Return the nodes and weights of the Gauss-Legendre quadrature on [-1, 1]"""
+    quadrature = _gauss_legendre_cache.get(order, None)
+    if quadrature is None:
+        quadrature = np.polynomial.legendre.leggauss(order)
+        _gauss_legendre_cache[order] = quadrature
+    return quadrature
+
+####################################################################################################
+
+def _elevate_to_cubic(curves):
+
+    """Elevate a M×(degree+1)×2 array of Bézier curves of degree lower than 3 to cubic curves"""
+
+    while curves.shape[1] < 4:
+        degree = curves.shape[1] - 1
+        # Q_i = i/(n+1) P_{i-1} + (1 - i/(n+1)) P_i
+        ratios = (np.arange(1, degree + 1) / (degree + 1))[:,np.newaxis]
+        inner = ratios * curves[:,:-1] + (1 - ratios) * curves[:,1:]
+        curves = np.concatenate((curves[:,:1], inner, curves[:,-1:]), axis=1)
+    return curves
+
+####################################################################################################
+
+def _bezier_extrema(curves):
+
+    """Return the minimum and maximum coordinates of a M×(degree+1)×2 array of Bézier curves as two
+    M×2 arrays.
+
+    The coordinates are extremal at the end points or where their derivative vanishes.  For a
+    degree lower or equal to 3, the roots of the derivatives are computed by the quadratic formula
+    for all the curves at once, else by :func:`numpy.roots` for each curve.
+
+    """
+
+    curves = np.asarray(curves, dtype=np.float64)
+    degree = curves.shape[1] - 1
+    if degree > 3:
+        return _polynomial_bezier_extrema(curves)
+    elif degree < 3:
+        curves = _elevate_to_cubic(curves)
+
+    p0, p1, p2, p3 = [curves[:,i] for i in range(4)]
+    # the derivative is 3 (a t**2 + 2 b t + c)
+    a = p3 - 3*p2 + 3*p1 - p0
+    b = 2*(p2 - 2*p1 + p0)
+    c = p1 - p0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        discriminant = b**2 - 4*a*c
+        # stable quadratic formula, handles a = 0
+        q = -(b + np.where(b < 0, -1, 1) * np.sqrt(np.maximum(discriminant, 0))) / 2
+        t = np.stack((q / a, c / q), axis=-1)
+    is_valid = (discriminant[...,np.newaxis] >= 0) & (0 < t) & (t < 1)
+    # the end points are extremal candidates, t = 0 is a harmless substitute
+    t = np.where(is_valid, t, 0)
+    u = 1 - t
+    values = (u**3 * p0[...,np.newaxis] + 3*u**2*t * p1[...,np.newaxis] +
+              3*u*t**2 * p2[...,np.newaxis] + t**3 * p3[...,np.newaxis])
+    minimum = np.minimum(np.minimum(p0, p3), values.min(axis=-1))
+    maximum = np.maximum(np.maximum(p0, p3), values.max(axis=-1))
+    return minimum, maximum
+
+####################################################################################################
+
+def _polynomial_bezier_extrema(curves):
+
+    """Implement :func:`_bezier_extrema` for any degree"""
+
+    degree = curves.shape[1] - 1
+    # matrix from the Bernstein basis to the power basis
+    basis = np.zeros((degree + 1, degree + 1))
+    for k in range(degree + 1):
+        for i in range(k + 1):
+            basis[k,i] = comb(degree, k) * comb(k, i) * (-1)**(k - i)
+    coefficients = np.einsum('ki,mij->mkj', basis, curves)
+    derivatives = coefficients[:,1:] * np.arange(1, degree + 1)[:,np.newaxis]
+
+    minimum = np.minimum(curves[:,0], curves[:,-1])
+    maximum = np.maximum(curves[:,0], curves[:,-1])
+    for m in range(curves.shape[0]):
+        for axis in range(2):
+            derivative = np.trim_zeros(derivatives[m,:,axis], 'b')
+            if derivative.shape[0] < 2:
+                continue
+            roots = np.roots(derivative[::-1])
+            roots = roots.real[(np.abs(roots.imag) < 1e-12) & (0 < roots.real) & (roots.real < 1)]
+            if roots.size:
+                values = np.polynomial.polynomial.polyval(roots, coefficients[m,:,axis])
+                minimum[m,axis] = min(minimum[m,axis], values.min())
+                maximum[m,axis] = max(maximum[m,axis], values.max())
+    return minimum, maximum
+
+####################################################################################################
+
+def _bounding_boxes_overlap(curves1, curves2, tolerance):
+
+    """Test if the bounding boxes of the control points of two M×(degree+1)×2 arrays of curves
+    overlap, return a boolean array.
+
+    """
+
+    return (np.all(curves1.min(axis=1) <= curves2.max(axis=1) + tolerance, axis=1) &
+            np.all(curves2.min(axis=1) <= curves1.max(axis=1) + tolerance, axis=1))
+
+####################################################################################################
+
+def _fat_lines_overlap(curves1, curves2, tolerance):
+
+    """Test if the control points of *curves2* can lie in the fat line of *curves1*, return a boolean
+    array.
+
+    The fat line is the strip parallel to the chord which encloses the control points.
+
+    """
+
+    chords = curves1[:,-1] - curves1[:,0]
+    lengths = np.hypot(chords[:,0], chords[:,1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normals = np.stack((-chords[:,1], chords[:,0]), axis=1) / lengths[:,np.newaxis]
+    origins = curves1[:,:1]
+    distances1 = np.einsum('ijk,ik->ij', curves1 - origins, normals)
+    distances2 = np.einsum('ijk,ik->ij', curves2 - origins, normals)
+    is_outside = ((distances2.min(axis=1) > distances1.max(axis=1) + tolerance) |
+                  (distances2.max(axis=1) < distances1.min(axis=1) - tolerance))
+    # a null chord has no fat line
+    return ~is_outside | (lengths == 0)
+
+####################################################################################################
+
+def _chord_intersections(curves1, curves2, margin=1e-3):
+
+    """Intersect the chords of two M×(degree+1)×2 arrays of curves, return the arrays of parameters
+    of the intersections on each chord and a boolean array for the pairs which intersect.
+
+    The chord segments are extended by *margin* to catch an intersection at an end point.
+
+    """
+
+    a0 = curves1[:,0]
+    b0 = curves2[:,0]
+    da = curves1[:,-1] - a0
+    db = curves2[:,-1] - b0
+    offset = b0 - a0
+    denominator = da[:,0]*db[:,1] - da[:,1]*db[:,0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = (offset[:,0]*db[:,1] - offset[:,1]*db[:,0]) / denominator
+        r = (offset[:,0]*da[:,1] - offset[:,1]*da[:,0]) / denominator
+    # parallel chords give nan or inf
+    is_intersection = ((denominator != 0) &
+                       (-margin <= s) & (s <= 1 + margin) &
+                       (-margin <= r) & (r <= 1 + margin))
+    return np.clip(s, 0, 1), np.clip(r, 0, 1), is_intersection
+
+####################################################################################################
+
+class BasisMatrixMixin:
+
+    r"""Mixin to evaluate a polynomial curve defined by a basis matrix for an array of parameters.
+
+    The curve is :math:`Q(t) = P \cdot BASIS \cdot T^t` where :math:`T = (1, t, t^2, \ldots)`.
+
+    """
+
+    ##############################################
+
+    @classmethod
+    def basis_matrix(cls, t, derivative=False):
+
+        """Return the N×(degree+1) matrix of the basis polynomials, or their derivatives, evaluated at the
+        array *t*.
+
+        The points are given by ``np.dot(matrix, curve.point_array.transpose())``, thus the matrix can
+        be reused to evaluate several curves at the same parameters.
+
+        """
+
+        t = np.asarray(t, dtype=np.float64)
+        degree = cls.BASIS.shape[0] - 1
+        if derivative:
+            powers = np.zeros((t.shape[0], degree + 1))
+            powers[:,1:] = np.vander(t, degree, increasing=True) * np.arange(1, degree + 1)
+        else:
+            powers = np.vander(t, degree + 1, increasing=True)
+        return np.dot(powers, cls.BASIS.transpose())
+
+    ##############################################
+
+    def _points_at_t(self, t, derivative=False):
+        """Evaluate the curve, or its derivative, for an array *t*, return a N×2 array"""
+        return np.dot(self.basis_matrix(t, derivative), self.point_array.transpose())
+
+####################################################################################################
+
+class BezierMixin2D(BasisMatrixMixin, FlatteningMixin, Primitive2DMixin):
 
     """Mixin to implements 2D Bezier Curve."""
 
     LineInterpolationPrecision = 0.05
 
+    ArcLengthQuadratureOrder = 16
+    ArcLengthSubdivisions = 4
+    ArcLengthTableSize = 32
+
+    IntersectionTolerance = 1e-6
+    IntersectionMaximumDepth = 32
+    IntersectionMaximumPairs = 4096
+
     _logger = _module_logger.getChild('BezierMixin2D')
 
     ##############################################
@@ -98,57 +304,161 @@ class BezierMixin2D(Primitive2DMixin):
 
     ##############################################
 
+    def _derivative_coefficients(self):
+        coefficients = self._power_coefficients()
+        powers = np.arange(1, coefficients.shape[0])[:,np.newaxis]
+        return coefficients[1:] * powers
+
+    ##############################################
+
+    def _speed_at_t(self, t, derivative=None):
+        """Return the magnitude of the derivative for an array *t*"""
+        if derivative is None:
+            derivative = self._derivative_coefficients()
+        return np.hypot(*self._polynomial_at_t(derivative, t).transpose())
+
+    ##############################################
+
+    def _arc_lengths(self, t0, t1, derivative=None):
+
+        """Return the arc lengths between the arrays of parameters *t0* and *t1*.
+
+        The integral of the speed is computed by a Gauss-Legendre quadrature of order
+        :attr:`ArcLengthQuadratureOrder`.
+
+        """
+
+        nodes, weights = _gauss_legendre(self.ArcLengthQuadratureOrder)
+        half = (np.asarray(t1, dtype=np.float64) - t0) / 2
+        middle = t0 + half
+        t = middle[...,np.newaxis] + half[...,np.newaxis] * nodes
+        speed = self._speed_at_t(t.ravel(), derivative).reshape(t.shape)
+        return half * np.dot(speed, weights)
+
+    ##############################################
+
+    def arc_length(self, t0=0, t1=1):
+        """Compute the length of the curve between *t0* and *t1* using a Gauss-Legendre quadrature."""
+        # Split the range to handle a fast varying speed, e.g. near a cusp
+        t = np.linspace(t0, t1, self.ArcLengthSubdivisions + 1)
+        return float(np.sum(self._arc_lengths(t[:-1], t[1:])))
+
+    ##############################################
+
+    def arc_length_table(self):
+
+        """Return a tuple of arrays ``(t, lengths)`` where *lengths* are the cumulative arc lengths at
+        :attr:`ArcLengthTableSize` uniform parameters *t*.
+
+        The table is cached and recomputed when the control points change.
+
+        """
+
+        key = self.point_array.tobytes()
+        table = getattr(self, '_arc_length_table', None)
+        if table is None or table[0] != key:
+            t = np.linspace(0, 1, self.ArcLengthTableSize + 1)
+            lengths = np.zeros(t.shape)
+            np.cumsum(self._arc_lengths(t[:-1], t[1:]), out=lengths[1:])
+            table = (key, t, lengths)
+            self._arc_length_table = table
+        return table[1:]
+
+    ##############################################
+
     def length_at_t(self, t, cache=False):
 
-        """Compute the length of the curve at *t*."""
+        """Compute the length of the curve at *t*.
+
+        If *cache* is set, the arc length table is used.
 
-        if cache: # lookup cache
-            if not hasattr(self, '_length_cache'):
-                self._length_cache = {}
-            length = self._length_cache.get(t, None)
-            if length is not None:
-                return length
+        """
 
-        length = self.split_at_t(t).length
+        if cache:
+            return float(self._lengths_at_t(np.array([t]))[0])
+        else:
+            return self.arc_length(0, t)
 
-        if cache: # save
-            self._length_cache[t] = length
+    ##############################################
 
-        return length
+    def _lengths_at_t(self, t, derivative=None):
+        # Use the arc length table for an array t
+        table_t, table_lengths = self.arc_length_table()
+        index = np.clip(np.searchsorted(table_t, t, side='right') - 1, 0, table_t.shape[0] - 2)
+        return table_lengths[index] + self._arc_lengths(table_t[index], t, derivative)
 
     ##############################################
 
     def t_at_length(self, length, precision=1e-6):
 
-        """Compute t for the given length. Length must lie in [0, curve length] range]. """
+        """Compute t for the given length. Length must lie in [0, curve length] range].
 
-        if length < 0:
+        *length* can be a scalar or an array.  The parameter is interpolated from the arc length
+        table, then refined by Newton steps.
+
+        """
+
+        lengths = np.asarray(length, dtype=np.float64)
+        is_scalar = lengths.ndim == 0
+        lengths = np.atleast_1d(lengths)
+
+        if np.any(lengths < 0):
             raise ValueError('Negative length')
-        if length == 0:
-            return 0
-        curve_length = self.length # Fixme: cache ?
-        if (curve_length - length) <= precision:
-            return 1
-        if length > curve_length:
+        table_t, table_lengths = self.arc_length_table()
+        curve_length = table_lengths[-1]
+        if np.any(lengths - curve_length > precision):
             raise ValueError('Out of length')
 
-        # Search t for length using dichotomy
-        # convergence rate :
-        #  10 iterations corresponds to curve length / 1024
-        #  16                                        / 65536
-        # start range
-        inf = 0
-        sup = 1
-        while True:
-            middle = (sup + inf) / 2
-            length_at_middle = self.length_at_t(middle, cache=True) # Fixme: out of memory, use LRU ???
-            # exit condition
-            if abs(length_at_middle - length) <= precision:
-                return middle
-            elif length_at_middle < length:
-                inf = middle
-            else: # length < length_at_middle
-                sup = middle
+        # interpolate the table
+        t = np.interp(lengths, table_lengths, table_t)
+        derivative = self._derivative_coefficients()
+        for i in range(10):
+            # ds/dt = speed
+            error = self._lengths_at_t(t, derivative) - lengths
+            if np.all(np.abs(error) <= precision):
+                break
+            speed = self._speed_at_t(t, derivative)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = np.where(speed > 0, error / speed, 0)
+            t = np.clip(t - step, 0, 1)
+
+        t[lengths == 0] = 0
+        t[curve_length - lengths <= precision] = 1
+
+        if is_scalar:
+            return float(t[0])
+        else:
+            return t
+
+    ##############################################
+
+    @property
+    def bounding_box(self):
+        """Return the tight bounding box of the curve, see :func:`_bezier_extrema`"""
+        (x_min, y_min), (x_max, y_max) = [array[0] for array in
+                                          _bezier_extrema(self.point_array.transpose()[np.newaxis])]
+        return Interval2D((x_min, x_max), (y_min, y_max))
+
+    ##############################################
+
+    def _flatten(self, tolerance):
+        return flatten_bezier(self.point_array.transpose(), tolerance)
+
+    ##############################################
+
+    def offset(self, distance, tolerance=None):
+
+        """Return the offset curve at *distance*, on the left for a positive distance, as a list of
+        cubic Bézier curves which approximate the true offset within *tolerance*.
+
+        """
+
+        from .Offset import offset_parametric
+        if tolerance is None:
+            tolerance = self.FlatteningTolerance
+        curves = offset_parametric(self._points_at_t, lambda t: self._points_at_t(t, derivative=True),
+                                   (0, 1), distance, tolerance)
+        return [CubicBezier2D(*points) for points in curves]
 
     ##############################################
 
@@ -197,13 +507,256 @@ class BezierMixin2D(Primitive2DMixin):
 
     ##############################################
 
+    def _closest_point_at_roots(self, point, roots):
+
+        """Return the closest point to *point* for the parameters *roots* in [0, 1] and the end points.
+
+        The distance is extremal at the roots, but the closest point can be an end point and several
+        roots can be found.
+
+        """
+
+        closest_point = None
+        for t in [0, 1] + list(roots):
+            curve_point = self.point_at_t(t)
+            distance = (curve_point - point).magnitude_square
+            if closest_point is None or distance < min_distance:
+                closest_point, min_distance = curve_point, distance
+        return closest_point
+
+    ##############################################
+
     def distance_to_point(self, point):
+        return (point - self.closest_point(point)).magnitude
 
-        p = self.closest_point(point)
-        if p is not None:
-            return (point - p).magnitude
-        else:
-            return None
+    ##############################################
+
+    def _power_coefficients(self):
+        """Return the coefficients of the curve in the power basis as a (degree+1)×2 array, from t**0"""
+        return np.dot(self.point_array, self.BASIS).transpose()
+
+    ##############################################
+
+    @staticmethod
+    def _polynomial_at_t(coefficients, t):
+        """Evaluate a polynomial curve for an array *t* using Horner's method, return a N×2 array"""
+        t = t[:,np.newaxis]
+        points = np.zeros((t.shape[0], 2)) + coefficients[-1]
+        for coefficient in coefficients[-2::-1]:
+            points *= t
+            points += coefficient
+        return points
+
+    ##############################################
+
+    def closest_points(self, points, number_of_samples=None, number_of_iterations=10):
+
+        """Find the closest points on the curve to a set of points.
+
+        *points* is a N×2 array or a :class:`Point2DArray`.
+
+        Return a tuple ``(t, closest_points, distances)`` where *t* and *distances* are arrays of size
+        N and *closest_points* is a :class:`Point2DArray`.
+
+        The curve is first sampled at *number_of_samples* uniform parameters, then the parameter of
+        each sample which is a local minimum of the distance is refined by Newton steps on the
+        derivative of the squared distance, and the best result is kept.  Refining only the nearest
+        sample could converge to the wrong branch when two branches are almost equally close.
+
+        """
+
+        points = Point2DArray._to_array(points)
+
+        coefficients = self._power_coefficients()
+        degree = coefficients.shape[0] - 1
+        powers = np.arange(1, degree + 1)[:,np.newaxis]
+        first_derivative = coefficients[1:] * powers
+        second_derivative = first_derivative[1:] * powers[:-1]
+
+        # coarse sampling
+        if number_of_samples is None:
+            number_of_samples = 16 * degree + 1
+        sample_t = np.linspace(0, 1, number_of_samples)
+        samples = self._polynomial_at_t(coefficients, sample_t)
+        deltas = samples[np.newaxis,:,:] - points[:,np.newaxis,:] # N×M×2
+        sample_distances = np.einsum('ijk,ijk->ij', deltas, deltas)
+
+        # local minima of the sampled distances, there is at least one for each point
+        padded = np.pad(sample_distances, ((0, 0), (1, 1)), constant_values=np.inf)
+        is_minimum = ((sample_distances <= padded[:,:-2]) & (sample_distances < padded[:,2:]))
+        point_indexes, sample_indexes = np.nonzero(is_minimum)
+        t = sample_t[sample_indexes]
+        candidate_points = points[point_indexes]
+
+        # Newton refinement of (P(t) - Q).P'(t) = 0
+        for i in range(number_of_iterations):
+            delta = self._polynomial_at_t(coefficients, t) - candidate_points
+            d1 = self._polynomial_at_t(first_derivative, t)
+            d2 = self._polynomial_at_t(second_derivative, t)
+            f = np.einsum('ij,ij->i', delta, d1)
+            df = np.einsum('ij,ij->i', d1, d1) + np.einsum('ij,ij->i', delta, d2)
+            # df <= 0 means we are not in the basin of a minimum
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = np.where(df > 0, f / df, 0)
+            new_t = np.clip(t - step, 0, 1)
+            converged = np.all(np.abs(new_t - t) <= 1e-12)
+            t = new_t
+            if converged:
+                break
+
+        closest_points = self._polynomial_at_t(coefficients, t)
+        distances = np.hypot(*(closest_points - candidate_points).transpose())
+
+        # Newton steps cannot be worse than the sample
+        sample_distances = np.sqrt(sample_distances[point_indexes, sample_indexes])
+        is_worse = distances > sample_distances
+        if np.any(is_worse):
+            t[is_worse] = sample_t[sample_indexes[is_worse]]
+            closest_points[is_worse] = samples[sample_indexes[is_worse]]
+            distances[is_worse] = sample_distances[is_worse]
+
+        # keep the best candidate for each point, the candidates are grouped by point
+        order = np.lexsort((distances, point_indexes))
+        is_first = np.ones(order.shape[0], dtype=np.bool_)
+        is_first[1:] = point_indexes[order][1:] != point_indexes[order][:-1]
+        best = order[is_first]
+        t, closest_points, distances = t[best], closest_points[best], distances[best]
+
+        return t, Point2DArray._from_array(closest_points), distances
+
+    ##############################################
+
+    def distances_to_points(self, points, **kwargs):
+        """Return the distances of a set of points to the curve, see :meth:`closest_points`"""
+        return self.closest_points(points, **kwargs)[2]
+
+    ##############################################
+
+    def intersect_curve(self, curve, tolerance=None):
+
+        """Find the intersections with a Bézier curve.
+
+        Return a list of tuples ``(t1, t2)`` sorted by *t1*, where *t1* and *t2* are the parameters
+        of an intersection on this curve and on *curve*.  *tolerance* is the distance under which two
+        points are considered as equal, :attr:`IntersectionTolerance` by default.
+
+        The pairs of sub-curves are recursively split at t = 1/2 and pruned when the bounding boxes
+        or the fat lines of their control points don't overlap.  When both sub-curves are flat, the
+        intersection of their chords is refined by Newton steps.  All the pairs of a recursion level
+        are processed at once.
+
+        """
+
+        if tolerance is None:
+            tolerance = self.IntersectionTolerance
+
+        curves1 = self.point_array.transpose()[np.newaxis]
+        curves2 = curve.point_array.transpose()[np.newaxis]
+        t1, dt1 = np.zeros(1), np.ones(1)
+        t2, dt2 = np.zeros(1), np.ones(1)
+
+        candidates = []
+        for depth in range(self.IntersectionMaximumDepth):
+            keep = (_bounding_boxes_overlap(curves1, curves2, tolerance) &
+                    _fat_lines_overlap(curves1, curves2, tolerance) &
+                    _fat_lines_overlap(curves2, curves1, tolerance))
+            curves1, curves2 = curves1[keep], curves2[keep]
+            t1, dt1, t2, dt2 = t1[keep], dt1[keep], t2[keep], dt2[keep]
+            if not keep.any():
+                break
+
+            is_flat1 = _bezier_deviations(curves1) <= tolerance
+            is_flat2 = _bezier_deviations(curves2) <= tolerance
+            is_flat = is_flat1 & is_flat2
+            if depth == self.IntersectionMaximumDepth - 1 or curves1.shape[0] > self.IntersectionMaximumPairs:
+                self._logger.warning('Intersection: maximum subdivision reached, curves could overlap')
+                is_flat[:] = True
+            if is_flat.any():
+                s, r, is_intersection = _chord_intersections(curves1[is_flat], curves2[is_flat])
+                candidates.append((
+                    (t1[is_flat] + s * dt1[is_flat])[is_intersection],
+                    (t2[is_flat] + r * dt2[is_flat])[is_intersection],
+                ))
+
+            # split the curves which are not flat
+            pairs = []
+            for must_split1, must_split2 in ((True, True), (True, False), (False, True)):
+                selection = ~is_flat & (~is_flat1 == must_split1) & (~is_flat2 == must_split2)
+                if not selection.any():
+                    continue
+                parts1 = _split_bezier(curves1[selection]) if must_split1 else (curves1[selection],)
+                parts2 = _split_bezier(curves2[selection]) if must_split2 else (curves2[selection],)
+                half_dt1 = dt1[selection] / len(parts1)
+                half_dt2 = dt2[selection] / len(parts2)
+                for i, part1 in enumerate(parts1):
+                    for j, part2 in enumerate(parts2):
+                        pairs.append((part1, part2,
+                                      t1[selection] + i * half_dt1, half_dt1,
+                                      t2[selection] + j * half_dt2, half_dt2))
+            if not pairs:
+                break
+            curves1, curves2, t1, dt1, t2, dt2 = [np.concatenate(arrays) for arrays in zip(*pairs)]
+
+        if not candidates:
+            return []
+        t1, t2 = [np.concatenate(arrays) for arrays in zip(*candidates)]
+        t1, t2 = self._refine_intersections(curve, t1, t2)
+
+        # check and merge the intersections
+        points1 = self._polynomial_at_t(self._power_coefficients(), t1)
+        points2 = self._polynomial_at_t(curve._power_coefficients(), t2)
+        errors = np.hypot(*(points1 - points2).transpose())
+        order = np.argsort(t1)
+        intersections = []
+        last_point = None
+        for i in order:
+            if errors[i] > tolerance:
+                continue
+            if last_point is not None and np.hypot(*(points1[i] - last_point)) <= tolerance:
+                continue
+            intersections.append((float(t1[i]), float(t2[i])))
+            last_point = points1[i]
+
+        return intersections
+
+    ##############################################
+
+    def _refine_intersections(self, curve, t1, t2, number_of_iterations=10):
+
+        """Refine the parameters of the intersections by Newton steps on P1(t1) - P2(t2) = 0"""
+
+        coefficients1 = self._power_coefficients()
+        coefficients2 = curve._power_coefficients()
+        derivative1 = self._derivative_coefficients()
+        derivative2 = curve._derivative_coefficients()
+
+        def distances(t1, t2):
+            delta = self._polynomial_at_t(coefficients1, t1) - self._polynomial_at_t(coefficients2, t2)
+            return np.hypot(delta[:,0], delta[:,1])
+
+        initial_t1, initial_t2 = t1, t2
+        for i in range(number_of_iterations):
+            delta = self._polynomial_at_t(coefficients1, t1) - self._polynomial_at_t(coefficients2, t2)
+            d1 = self._polynomial_at_t(derivative1, t1)
+            d2 = self._polynomial_at_t(derivative2, t2)
+            # Solve [d1 -d2] (dt1, dt2) = -delta
+            determinant = d2[:,0]*d1[:,1] - d1[:,0]*d2[:,1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step1 = np.where(determinant != 0, (d2[:,0]*delta[:,1] - d2[:,1]*delta[:,0]) / determinant, 0)
+                step2 = np.where(determinant != 0, (d1[:,0]*delta[:,1] - d1[:,1]*delta[:,0]) / determinant, 0)
+            new_t1 = np.clip(t1 - step1, 0, 1)
+            new_t2 = np.clip(t2 - step2, 0, 1)
+            converged = np.all(np.abs(new_t1 - t1) <= 1e-14) and np.all(np.abs(new_t2 - t2) <= 1e-14)
+            t1, t2 = new_t1, new_t2
+            if converged:
+                break
+
+        # Newton steps can diverge near a tangential intersection
+        is_worse = distances(t1, t2) > distances(initial_t1, initial_t2)
+        t1 = np.where(is_worse, initial_t1, t1)
+        t2 = np.where(is_worse, initial_t2, t2)
+
+        return t1, t2
 
 ####################################################################################################
 
@@ -267,6 +820,8 @@ class QuadraticBezier2D(BezierMixin2D, Primitive3P):
     def point_at_t(self, t):
         # if 0 < t or 1 < t:
         #     raise ValueError()
+        if np.ndim(t):
+            return self._points_at_t(t)
         u = 1 - t
         return self._p0 * u**2 + self._p1 * 2 * t * u + self._p2 * t**2
 
@@ -314,6 +869,8 @@ class QuadraticBezier2D(BezierMixin2D, Primitive3P):
     ##############################################
 
     def tangent_at(self, t):
+        if np.ndim(t):
+            return self._points_at_t(t, derivative=True) / 2
         u = 1 - t
         return (self._p1 - self._p0) * u + (self._p2 - self._p1) * t
 
@@ -383,20 +940,14 @@ class QuadraticBezier2D(BezierMixin2D, Primitive3P):
         B = self._p2 - self._p1 - A
         M = self._p0 - point
 
-        roots = cubic_root(
+        roots = polynomial_root((
             B.magnitude_square,
             3*A.dot(B),
             2*A.magnitude_square + M.dot(B),
             M.dot(A),
-        )
-        t = [root for root in roots if 0 <= root <= 1]
-        if not t:
-            return None
-        elif len(t) > 1:
-            self._logger.warning("Found more than one root {} for {} and point {}".format(t, self, point))
-            return None
-        else:
-            return self.point_at_t(t)
+        ), (0, 1))
+
+        return self._closest_point_at_roots(point, roots)
 
     ##############################################
 
@@ -464,13 +1015,15 @@ class CubicBezier2D(BezierMixin2D, Primitive4P):
 
     @property
     def length(self):
-        return self.adaptive_length_approximation()
+        return self.arc_length()
 
     ##############################################
 
     def point_at_t(self, t):
         # if 0 < t or 1 < t:
         #     raise ValueError()
+        if np.ndim(t):
+            return self._points_at_t(t)
         return (self._p0 +
                 (self._p1 - self._p0) * 3 * t  +
                 (self._p2 - self._p1*2 + self._p0) * 3 * t**2 +
@@ -552,6 +1105,8 @@ class CubicBezier2D(BezierMixin2D, Primitive4P):
     ##############################################
 
     def tangent_at(self, t):
+        if np.ndim(t):
+            return self._points_at_t(t, derivative=True) / 3
         u = 1 - t
         return (self._p1 - self._p0) * u**2 + (self._p2 - self._p1) * 2 * t * u + (self._p3 - self._p2) * t**2
 
@@ -606,232 +1161,6 @@ class CubicBezier2D(BezierMixin2D, Primitive4P):
 
     ##############################################
 
-    def _clipping_convex_hull(self):
-
-        line_03 = Line2D(self._p0, self._p3)
-        d1 = line_03.distance_to_line(self._p1)
-        d2 = line_03.distance_to_line(self._p2)
-
-        # Check if p1 and p2 are on the same side of the line [p0, p3]
-        if d1 * d2 < 0:
-            # p1 and p2 lie on different sides of [p0, p3].
-            # The hull is a quadrilateral and line [p0, p3] is not part of the hull.
-            # The top part includes p1, we will reverse it later if that is not the case.
-            hull = [
-                [self._p0, self._p1, self._p3], # top part
-                [self._p0, self._p2, self._p3]  # bottom part
-            ]
-            flip = d1 < 0
-        else:
-            # p1 and p2 lie on the same sides of [p0, p3]. The hull can be a triangle or a
-            # quadrilateral and line [p0, p3] is part of the hull.  Check if the hull is a triangle
-            # or a quadrilateral.  Also, if at least one of the distances for p1 or p2, from line
-            # [p0, p3] is zero then hull must at most have 3 vertices.
-             # Fixme: check cross product
-            y0, y1, y2, y3 = [p.y for p in self.points]
-            if abs(d1) < abs(d2):
-                pmax = p2;
-                # apex is y0 in this case, and the other apex point is y3
-                # vector yapex -> yapex2 or base vector which is already part of the hull
-                # V30xV10 * V10xV20
-                cross_product = ((y1 - y0) - (y3 - y0)/3) * (2*(y1 - y0) - (y2 - y0)) /3
-            else:
-                pmax = p1;
-                # apex is y3 and the other apex point is y0
-                # vector yapex -> yapex2 or base vector which is already part of the hull
-                # V32xV30 * V32xV31
-                cross_product = ((y3 - y2) - (y3 - y0)/3) * (2*(y3 - y2) - (y3 + y1)) /3
-
-            # Compare cross products of these vectors to determine if the point is in the triangle
-            # [p3, pmax, p0], or if it is a quadrilateral.
-            has_null_distance = d1 == 0 or d2 == 0 # Fixme: don't need to compute cross_product
-            if cross_product < 0 or has_null_distance:
-                # hull is a triangle
-                hull = [
-                    [self._p0, pmax, self._p3], # top part is a triangle
-                    [self._p0, self._p3],       # bottom part is just an edge
-                ]
-            else:
-                hull = [
-                    [self._p0, self._p1, self._p2, self._p3], # top part is a quadrilateral
-                    [self._p0, self._p3],                     # bottom part is just an edge
-                ]
-            flip =  d1 < 0 if d1 else d2 < 0
-
-        if flip:
-            hull.reverse()
-
-        return hull
-
-    ##############################################
-
-    @staticmethod
-    def _clip_convex_hull(hull_top, hull_bottom, d_min, d_max) :
-
-
-        #              Top   /----
-        #                   /     ---/
-        #                  /        /
-        # d_max -------------------*---
-        #                /        / t_max
-        #         t_min /        /
-        # d_min -------*---------------
-        #             /        /
-        #            /    ----/   Bottom
-        #        p0 /----
-
-        if (hull_top[0].y < d_min):
-            # Left of hull is below d_min,
-            # walk through the hull until it enters the region between d_min and d_max
-            return self._clip_convex_hull_part(hull_top, True, d_min);
-        elif (hull_bottom[0].y > d_max) :
-            # Left of hull is above d_max,
-            # walk through the hull until it enters the region between d_min and d_max
-            return self._clip_convex_hull_part(hull_bottom, False, d_max);
-        else :
-            # Left of hull is between d_min and d_max, no clipping possible
-            return hull_top[0].x; # Fixme: 0 ???
-
-    ##############################################
-
-    @staticmethod
-    def _clip_convex_hull_part(part, top, threshold) :
-
-        """Clip the bottom or top part of the convex hull.
-
-        *part* is a list of points, *top* is a boolean flag to indicate if it corresponds to the top
-        part, *threshold* is d_min if top part else d_max.
-
-        """
-
-        # Walk on the edges
-        px = part[0].x;
-        py = part[0].y;
-        for i in range(1, len(part)):
-            qx = part[i].x;
-            qy = part[i].y;
-            if (qy >= threshold if top else qy <= threshold):
-                # compute a linear interpolation
-                #   threshold = s * (t - px) + py
-                #   t = (threshold - py) / s + px
-                return px + (threshold - py) * (qx - px) / (qy - py);
-            px = qx;
-            py = qy;
-
-        return None; # no intersection
-
-    ##############################################
-
-    @staticmethod
-    def _instersect_curve(
-            curve1, curve2,
-            t_min=0, t_max=1,
-            u_min=0, u_max=1,
-            old_delta_t=1,
-            reverse=False, # flag to indicate that 1 <-> 2 when we store locations
-            recursion=0, # number of recursions
-            recursion_limit=32,
-            t_limit=0.8,
-            locations=[],
-    ) :
-
-        """Compute the intersection of two Bézier curves.
-
-        Code inspired from
-
-          *  https://github.com/paperjs/paper.js/blob/master/src/path/Curve.js
-          *  http://nbviewer.jupyter.org/gist/hkrish/0a128f21a5b9e5a7a914 The Bezier Clipping Algorithm
-          *  https://gist.github.com/hkrish/5ef0f2da7f9882341ee5 hkrish/bezclip_manual.py
-
-        """
-
-        # Note:
-        #   see https://github.com/paperjs/paper.js/issues/565
-        #   It was determined that more than 20 recursions are needed sometimes, depending on the
-        #   delta_t threshold values further below when determining which curve converges the
-        #   least. He also recommended a threshold of 0.5 instead of the initial 0.8
-
-        if recursion > recursion_limit:
-            return
-
-        tolerance = 1e-5
-        epsilon = 1e-10
-
-        # t_min_new = 0.
-        # t_max_new = 0.
-        # delta_t = 0.
-
-        # NOTE: the recursion threshold of 4 is needed to prevent this issue from occurring:
-        #       https://github.com/paperjs/paper.js/issues/571
-        #       when two curves share an end point
-        if curve1.p0.x == curve1.p3.x and u_max - u_min <= epsilon and recursion > 4:
-            # The fat-line of curve1 has converged to a point, the clipping is not reliable.
-            # Return the value we have even though we will miss the precision.
-            t_max_new = t_min_new = (t_max + t_min) / 2
-            delta_t = 0
-        else :
-            # Compute the fat-line for curve1:
-            #  a baseline and two offsets which completely encloses the curve
-            fatline, d_min, d_max = curve1.fat_line()
-
-            # Calculate a non-parametric bezier curve D(ti, di(t)) where di(t) is the distance of curve2 from
-            # the baseline, ti is equally spaced in [0, 1]
-            non_parametric_curve = curve2.non_parametric_curve(fatline)
-
-            # Get the top and bottom parts of the convex-hull
-            top, bottom = non_parametric_curve._clip_convex_hull()
-            # Clip the convex-hull with d_min and d_max
-            t_min_clip = self.clip_convex_hull(top, bottom, d_min, d_max);
-            top.reverse()
-            bottom.reverse()
-            t_max_clip = clipConvexHull(top, bottom, d_min, d_max);
-
-            # No intersections if one of the t values is None
-            if t_min_clip is None or t_max_clip is None:
-                return
-
-            # Clip curve2 with the fat-line for curve1
-            curve2 = curve2.split_at_two_t(t_min_clip, t_max_clip)
-            delta_t = t_max_clip - t_min_clip
-            # t_min and t_max are within the range [0, 1]
-            # We need to project it to the original parameter range
-            t_min_new = t_max * t_min_clip + t_min * (1 - t_min_clip)
-            t_max_new = t_max * t_max_clip + t_min * (1 - t_max_clip)
-            delta_t_new = t_max_new - t_min_new
-
-        delta_u = u_max - u_min
-
-        # Check if we need to subdivide the curves
-        if old_delta_t > t_limit and delta_t > t_limit:
-            # Subdivide the curve which has converged the least.
-            args = (delta_t, not reverse, recursion+1, recursion_limit, t_limit, locations)
-            if delta_u < delta_t_new: # curve2 < curve1
-                parts = curve1.split_at_t(0.5)
-                t = t_min_new + delta_t_new / 2
-                self._intersect_curve(curve2, parts[0], u_min, u_max, t_min_new, t, *args)
-                self._intersect_curve(curve2, parts[1], u_min, u_max, t, t_max_new, *args)
-            else :
-                parts = curve2.split_at_t(0.5)
-                t = u_min + delta_u / 2
-                self._intersect_curve(parts[0], curve1, u_min, t, t_min_new, t_max_new, *args)
-                self._intersect_curve(parts[1], curve1, t, u_max, t_min_new, t_max_new, *args)
-
-        elif max(delta_u, delta_t_new) < tolerance:
-            # We have isolated the intersection with sufficient precision
-            t1 = t_min_new + delta_t_new / 2
-            t2 = u_min + delta_u / 2
-            if reverse:
-                t1, t2 = t2, t1
-            p1 = curve1.point_at_t(t1)
-            p2 = curve2.point_at_t(t2)
-            locations.append([t1, point1, t2, point2])
-
-        else:
-            args = (delta_t, not reverse, recursion+1, recursion_limit, t_limit)
-            self._intersect_curve(curve2, curve1, locations, u_min, u_max, t_min_new, t_max_new, *args)
-
-    ##############################################
-
     def is_flat_enough(self, flatness):
 
          r"""Determines if a curve is sufficiently flat, meaning it appears as a straight line and has
@@ -886,31 +1215,14 @@ class CubicBezier2D(BezierMixin2D, Primitive4P):
         s = (self._p1 - self._p0)*3
         v = self._p0
 
-        roots = fifth_root(
+        # only the roots in [0, 1] are computed
+        roots = polynomial_root((
             -3 * n.magnitude_square,
             -5 * n.dot(r),
             -2 * (2*n.dot(s) + r.magnitude_square),
             3 * (point.dot(n) - n.dot(v) - r.dot(s)),
             2*point.dot(r) - 2*r.dot(v) - s.magnitude_square,
             point.dot(s) - s.dot(v),
-        )
-        # Fixme: to func
-        t = [root for root in roots if 0 <= root <= 1]
-        if not t:
-            return None
-        elif len(t) > 1:
-            # Fixme:
-            # Found more than one root [0, 0.516373783749732]
-            # for CubicBezier2D(
-            #   Vector2D[1394.4334 1672.0004], Vector2D[1394.4334 1672.0004],
-            #   Vector2D[1585.0004 1624.9634], Vector2D[1585.0004 1622.0004])
-            # and point Vector2D[1495.11502887 1649.7386517 ]
-            # raise NameError("Found more than one root: {}".format(t))
-            self._logger.warning("Found more than one root {} for {} and point {}".format(t, self, point))
-            # self._logger.warning("is flat {}".format(self.is_flat_enough(.1)))
-            if len(t) == 2 and t[0] == 0:
-                return self.point_at_t(t[1])
-            else:
-                return None
-        else:
-            return self.point_at_t(t[0])
+        ), (0, 1))
+
+        return self._closest_point_at_roots(point, roots)
@@ -0,0 +1,344 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""Module to implement boolean operations on polygons: union, intersection, difference and xor.
+
+An operand is a set of rings, i.e. closed polylines, whose region is defined by a fill rule: the
+even-odd rule by default, thus a hole is simply a ring inside another one, the non-zero or the
+positive winding rule.  The algorithm follows the approach of Martínez et al.:
+
+* the edges of both operands are subdivided at their intersections using the Bentley–Ottmann sweep
+  line of :mod:`SweepLine`, the edges which overlap are merged,
+* a second sweep line sorts the subdivided edges from bottom to top and computes for each edge if
+  the winding numbers of the subject and the clipping operand for the region just below it, the
+  winding numbers of the region above are deduced from the direction of the edge in the operands,
+* an edge is selected if the result of the operation differs on its sides, it is oriented so as the
+  result is on its left, and the selected edges are connected to form the result rings.
+
+The complexity is :math:`O((n + k) \\log n)` where *k* is the number of intersections.
+
+Example of usage::
+
+  rings = union(polygon1, polygon2)
+  rings = difference(piece, [outline, hole])
+
+The result is a list of :class:`Polygon2D`, the outer rings are counterclockwise and the holes are
+clockwise.
+
+References
+
+  * F. Martínez, A. J. Rueda, F. R. Feito, A new algorithm for computing Boolean operations on
+    polygons, Computers & Geosciences, 35 (2009)
+  * B. R. Vatti, A generic solution to polygon clipping, Communications of the ACM, 35 (1992)
+
+"""
+
+####################################################################################################
+
+__all__ = [
+    'boolean_operation',
+    'difference',
+    'intersection',
+    'union',
+    'xor',
+]
+
+####################################################################################################
+
+import math
+
+import numpy as np
+
+from .PointArray import Point2DArray
+from .Polygon import Polygon2D
+from .SweepLine import segment_intersections
+
+####################################################################################################
+
+SUBJECT = 1
+CLIPPING = 2
+
+# Test if a point is inside an operand from its winding number
+FILL_RULES = {
+    'evenodd': lambda winding: winding % 2 == 1,
+    'nonzero': lambda winding: winding != 0,
+    'positive': lambda winding: winding > 0,
+}
+
+# Test if a point is inside the result from its inside flags
+OPERATIONS = {
+    'union': lambda inside: inside != 0,
+    'intersection': lambda inside: inside == SUBJECT | CLIPPING,
+    'difference': lambda inside: inside == SUBJECT,
+    'xor': lambda inside: inside in (SUBJECT, CLIPPING),
+}
+
+####################################################################################################
+
+def _to_rings(operand):
+
+    """Return the rings of an operand as a list of N×2 arrays.
+
+    An operand is a :class:`Polygon2D`, a :class:`Point2DArray`, a N×2 array or a list of them.
+
+    """
+
+    if isinstance(operand, (Polygon2D, Point2DArray, np.ndarray)):
+        operand = (operand,)
+    rings = []
+    for ring in operand:
+        if isinstance(ring, Polygon2D):
+            ring = ring.point2d_array
+        rings.append(np.asarray(Point2DArray._to_array(ring), dtype=np.float64))
+    return rings
+
+####################################################################################################
+
+def _subdivide_edges(operands):
+
+    """Subdivide the edges of the operands at their intersections.
+
+    Return a dictionary which maps the edges ``(left, right)``, where *left* is the smallest vertex
+    in lexicographic order, to the variation of the winding number of each operand across the edge
+    from below to above, i.e. +1 for an edge from left to right.
+
+    """
+
+    segments = []
+    owners = []
+    for owner, rings in enumerate(operands):
+        for ring in rings:
+            stop = np.roll(ring, -1, axis=0)
+            is_null = np.all(ring == stop, axis=1)
+            segments.append(np.stack((ring[~is_null], stop[~is_null]), axis=1))
+            owners.extend([owner] * int(np.sum(~is_null)))
+    segments = np.concatenate(segments)
+
+    splits = {}
+    for point, indexes in segment_intersections(segments):
+        for i in indexes:
+            splits.setdefault(i, []).append(point)
+
+    edges = {}
+    for i, (start, stop) in enumerate(segments.tolist()):
+        start, stop = tuple(start), tuple(stop)
+        vertices = [start]
+        points = splits.get(i, ())
+        if points:
+            dx, dy = stop[0] - start[0], stop[1] - start[1]
+            points = {point for point in points if point != start and point != stop}
+            vertices.extend(sorted(points, key=lambda p: (p[0] - start[0])*dx + (p[1] - start[1])*dy))
+        vertices.append(stop)
+        for p0, p1 in zip(vertices[:-1], vertices[1:]):
+            if p0 != p1:
+                if p0 < p1:
+                    edge, direction = (p0, p1), 1
+                else:
+                    edge, direction = (p1, p0), -1
+                windings = edges.setdefault(edge, [0, 0])
+                windings[owners[i]] += direction
+
+    return {edge:windings for edge, windings in edges.items() if windings != [0, 0]}
+
+####################################################################################################
+
+def _classify_edges(edges, deltas):
+
+    """Compute for each edge the winding numbers of the region just below it.
+
+    *edges* is a list of non crossing edges ``(left, right)`` and *deltas* the variations of the
+    winding numbers across them.  For a vertical edge, the region below is on its right.  Return a
+    list of pairs of winding numbers.
+
+    """
+
+    def y_at(i, x):
+        (x0, y0), (x1, y1) = edges[i]
+        if x <= x0:
+            return y0
+        elif x >= x1:
+            return y1
+        else:
+            return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+    slopes = []
+    events = []
+    for i, ((x0, y0), (x1, y1)) in enumerate(edges):
+        slope = (y1 - y0) / (x1 - x0) if x1 != x0 else math.inf
+        slopes.append(slope)
+        # at a vertex, the edges are removed first then inserted from bottom to top
+        events.append(((x0, y0), 1, slope, i))
+        events.append(((x1, y1), 0, 0, i))
+    events.sort()
+
+    below = [(0, 0)] * len(edges)
+    status = [] # edges crossing the sweep line sorted by y
+
+    for (x, y), is_insertion, slope, i in events:
+        # find the first edge of the status which is above the vertex
+        lower, upper = 0, len(status)
+        while lower < upper:
+            middle = (lower + upper) // 2
+            j = status[middle]
+            y_j = y_at(j, x)
+            if y_j < y or (is_insertion and y_j == y and slopes[j] < slope):
+                lower = middle + 1
+            else:
+                upper = middle
+        if is_insertion:
+            if lower:
+                j = status[lower - 1]
+                (winding1, winding2), (delta1, delta2) = below[j], deltas[j]
+                below[i] = (winding1 + delta1, winding2 + delta2)
+            status.insert(lower, i)
+        else:
+            # the edges which stop at the vertex are at this position
+            try:
+                status.pop(status.index(i, lower, lower + 8))
+            except ValueError:
+                # guard against the rounding
+                status.remove(i)
+
+    return below
+
+####################################################################################################
+
+def _connect_edges(edges):
+
+    """Connect oriented edges to form rings, return a list of N×2 arrays.
+
+    The result must be on the left of the edges, thus at a vertex shared by several rings the next
+    edge is the first one clockwise from the incoming edge.
+
+    """
+
+    outgoing = {}
+    for i, (start, stop) in enumerate(edges):
+        outgoing.setdefault(start, []).append(i)
+
+    is_used = [False] * len(edges)
+    rings = []
+    for first in range(len(edges)):
+        if is_used[first]:
+            continue
+        ring = []
+        i = first
+        while True:
+            is_used[i] = True
+            start, stop = edges[i]
+            ring.append(start)
+            if stop == edges[first][0]:
+                break
+            candidates = [j for j in outgoing.get(stop, ()) if not is_used[j]]
+            if not candidates:
+                # unclosed ring due to the rounding
+                break
+            if len(candidates) > 1:
+                back = math.atan2(start[1] - stop[1], start[0] - stop[0])
+                def clockwise_angle(j):
+                    x, y = edges[j][1]
+                    angle = (back - math.atan2(y - stop[1], x - stop[0])) % (2*math.pi)
+                    return angle if angle > 0 else 2*math.pi
+                candidates.sort(key=clockwise_angle)
+            i = candidates[0]
+        ring = _remove_collinear_vertices(np.array(ring))
+        if ring.shape[0] >= 3:
+            rings.append(ring)
+
+    return rings
+
+####################################################################################################
+
+def _remove_collinear_vertices(ring):
+
+    """Remove the vertices of a ring which lie on a straight line"""
+
+    if ring.shape[0] < 3:
+        return ring
+    incoming = ring - np.roll(ring, 1, axis=0)
+    outgoing = np.roll(ring, -1, axis=0) - ring
+    cross = incoming[:,0]*outgoing[:,1] - incoming[:,1]*outgoing[:,0]
+    dot = np.einsum('ij,ij->i', incoming, outgoing)
+    scale = np.hypot(incoming[:,0], incoming[:,1]) * np.hypot(outgoing[:,0], outgoing[:,1])
+    is_collinear = (np.abs(cross) <= 1e-12 * scale) & (dot > 0)
+    return ring[~is_collinear]
+
+####################################################################################################
+
+def boolean_operation(subject, clipping, operation, fill_rule='evenodd'):
+
+    """Compute a boolean operation on two operands, *operation* is ``union``, ``intersection``,
+    ``difference`` or ``xor``.
+
+    An operand is a :class:`Polygon2D`, a :class:`Point2DArray`, a N×2 array or a list of them,
+    whose region is defined by *fill_rule*: ``evenodd``, ``nonzero`` or ``positive``.  Return a list
+    of :class:`Polygon2D`, the outer rings are counterclockwise and the holes are clockwise.
+
+    The union of an operand with an empty list resolves its self-intersections.
+
+    """
+
+    try:
+        operation = OPERATIONS[operation]
+    except KeyError:
+        raise ValueError('Unknown operation {}'.format(operation))
+    try:
+        fill_rule = FILL_RULES[fill_rule]
+    except KeyError:
+        raise ValueError('Unknown fill rule {}'.format(fill_rule))
+
+    def is_inside(windings):
+        winding1, winding2 = windings
+        return operation(fill_rule(winding1) * SUBJECT | fill_rule(winding2) * CLIPPING)
+
+    operands = (_to_rings(subject), _to_rings(clipping))
+    if not (operands[0] or operands[1]):
+        return []
+    edges = _subdivide_edges(operands)
+    deltas = list(edges.values())
+    edges = list(edges.keys())
+    below = _classify_edges(edges, deltas)
+
+    selected_edges = []
+    for (left, right), (delta1, delta2), (winding1, winding2) in zip(edges, deltas, below):
+        is_inside_below = is_inside((winding1, winding2))
+        if is_inside_below != is_inside((winding1 + delta1, winding2 + delta2)):
+            # the region below is on the right of the edge from left to right
+            selected_edges.append((right, left) if is_inside_below else (left, right))
+
+    return [Polygon2D(ring) for ring in _connect_edges(selected_edges)]
+
+####################################################################################################
+
+def union(subject, clipping, fill_rule='evenodd'):
+    """Return the union of two operands, see :func:`boolean_operation`"""
+    return boolean_operation(subject, clipping, 'union', fill_rule)
+
+def intersection(subject, clipping, fill_rule='evenodd'):
+    """Return the intersection of two operands, see :func:`boolean_operation`"""
+    return boolean_operation(subject, clipping, 'intersection', fill_rule)
+
+def difference(subject, clipping, fill_rule='evenodd'):
+    """Return the difference of two operands, see :func:`boolean_operation`"""
+    return boolean_operation(subject, clipping, 'difference', fill_rule)
+
+def xor(subject, clipping, fill_rule='evenodd'):
+    """Return the symmetric difference of two operands, see :func:`boolean_operation`"""
+    return boolean_operation(subject, clipping, 'xor', fill_rule)
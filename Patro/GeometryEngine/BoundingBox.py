@@ -27,81 +27,134 @@
 __all__ = [
     'bounding_box_from_points',
     'convex_hull',
+    'convex_hull_indexes',
 ]
 
 ####################################################################################################
 
-import functools
+from IntervalArithmetic import Interval2D
+import numpy as np
+
+from .PointArray import Point2DArray
 
 ####################################################################################################
 
 def bounding_box_from_points(points):
 
-    """Return the bounding box of the list of points."""
+    """Return the bounding box of a set of points, or None if it is empty.
+
+    *points* can be a list of vectors, a N×2 Numpy array or a :class:`Point2DArray`, the extrema
+    are computed by Numpy.
+
+    """
 
-    bounding_box = None
-    for point in points:
-        if bounding_box is None:
-            bounding_box = point.bounding_box
-        else:
-            bounding_box |= point.bounding_box
-    return bounding_box
+    if isinstance(points, Point2DArray):
+        return points.bounding_box
+    if not isinstance(points, np.ndarray):
+        points = [(point.x, point.y) for point in points]
+    array = np.asarray(points, dtype=np.float64)
+    if not array.size:
+        return None
+    x_min, y_min = array.min(axis=0)
+    x_max, y_max = array.max(axis=0)
+    return Interval2D((x_min, x_max), (y_min, y_max))
 
 ####################################################################################################
 
-def _sort_point_for_graham_scan(points):
+def _ccw(p1, p2, p3):
+    """Three points are a counter-clockwise turn if ccw > 0, clockwise if ccw < 0, and collinear if ccw
+     = 0 because ccw is a determinant that gives twice the signed area of the triangle formed by p1,
+     p2 and p3.
 
-    def sort_by_y(p0, p1):
-        return p0.x < p1.x if (p0.y == p1.y) else p0.y < p1.y
+    """
+    return (p2[0] - p1[0])*(p3[1] - p1[1]) - (p2[1] - p1[1])*(p3[0] - p1[0])
 
-    # sort by ascending y
-    sorted_points = sorted(points, key=functools.cmp_to_key(sort_by_y))
+####################################################################################################
 
-    # sort by ascending slope with p0
-    p0 = sorted_points[0]
-    x0 = p0.x
-    y0 = p0.y
-    def slope(p):
-        # return (p - p0).tan
-        return (p.y - y0) / (p.x - x0)
-    def sort_by_slope(p0, p1):
-        s0 = slope(p0)
-        s1 = slope(p1)
-        return p0.x < p1.x if (s0 == s1) else s0 < s1
+def _interior_points(array):
 
-    return sorted_points[0] + sorted(sorted_points[1:], key=cmp_to_key(sort_by_slope))
+    """Return a mask of the points which lie strictly inside the polygon of the extreme points in the
+    directions x, y, x+y and x-y, these points cannot be on the convex hull (Akl–Toussaint heuristic).
+
+    """
+
+    x, y = array[:,0], array[:,1]
+    extremes = [np.argmin(x), np.argmin(x - y), np.argmax(y), np.argmax(x + y),
+                np.argmax(x), np.argmax(x - y), np.argmin(y), np.argmin(x + y)]
+    # ordered counter-clockwise from the left, remove duplicates
+    polygon = array[[index for i, index in enumerate(extremes) if index not in extremes[:i]][::-1]]
+    if polygon.shape[0] < 3:
+        return np.zeros(array.shape[0], dtype=np.bool_)
+    is_inside = np.ones(array.shape[0], dtype=np.bool_)
+    for p0, p1 in zip(polygon, np.roll(polygon, -1, axis=0)):
+        is_inside &= _ccw(p0, p1, array.transpose()) > 0
+    return is_inside
 
 ####################################################################################################
 
-def _ccw(p1, p2, p3):
-    """Three points are a counter-clockwise turn if ccw > 0, clockwise if ccw < 0, and collinear if ccw
-     = 0 because ccw is a determinant that gives twice the signed area of the triangle formed by p1,
-     p2 and p3.
+def convex_hull_indexes(points):
+
+    """Return the indexes of the vertices of the convex hull of a N×2 array of points, see
+    :func:`convex_hull`.
 
     """
-    return (p2.x - p1.x)*(p3.y - p1.y) - (p2.y - p1.y)*(p3.x - p1.x)
+
+    array = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    indexes = np.arange(array.shape[0])
+    if array.shape[0] > 64:
+        indexes = indexes[~_interior_points(array)]
+
+    # sort by x then y, and remove duplicated points
+    order = np.lexsort((array[indexes,1], array[indexes,0]))
+    indexes = indexes[order]
+    sorted_points = array[indexes]
+    is_unique = np.ones(indexes.shape[0], dtype=np.bool_)
+    is_unique[1:] = np.any(sorted_points[1:] != sorted_points[:-1], axis=1)
+    indexes = indexes[is_unique].tolist()
+    sorted_points = sorted_points[is_unique].tolist()
+    if len(indexes) < 3:
+        return indexes
+
+    def half_hull(points, indexes):
+        hull = [] # stack of (point, index)
+        for point, index in zip(points, indexes):
+            # pop the last point while we don't turn counter-clockwise
+            while len(hull) > 1 and _ccw(hull[-2][0], hull[-1][0], point) <= 0:
+                hull.pop()
+            hull.append((point, index))
+        return [index for point, index in hull]
+
+    lower = half_hull(sorted_points, indexes)
+    upper = half_hull(sorted_points[::-1], indexes[::-1])
+    # the last point of each half is the first point of the other half
+    return lower[:-1] + upper[:-1]
 
 ####################################################################################################
 
 def convex_hull(points):
 
-    """Return the convex hull of the list of points using Graham Scan algorithm.
+    """Return the convex hull of a set of points using Andrew's monotone chain algorithm.
+
+    *points* can be a list of vectors, a N×2 Numpy array or a :class:`Point2DArray`, the hull is
+    returned in the same form.  Its vertices are ordered counter-clockwise from the leftmost lowest
+    point, and collinear points are removed.
+
+    The points are sorted by Numpy and the points which lie inside the polygon of the extreme points
+    are discarded before the scan.
 
-     References
+    References
 
-     * https://en.wikipedia.org/wiki/Graham_scan
+     * A. M. Andrew, Another efficient algorithm for convex hulls in two dimensions, Information
+       Processing Letters, 1979
+     * https://en.wikibooks.org/wiki/Algorithm_Implementation/Geometry/Convex_hull/Monotone_chain
 
     """
 
-   # convex_hull is a stack of points beginning with the leftmost point.
-    convex_hull = []
-    sorted_points = _sort_point_for_graham_scan(points)
-    for p in sorted_points:
-        # if we turn clockwise to reach this point,
-        # pop the last point from the stack, else, append this point to it.
-        while len(convex_hull) > 1 and _ccw(convex_hull[-1], convex_hull[-2], p) >= 0: # Fixme: check
-            convex_hull.pop()
-        convex_hull.append(p)
-
-    # the stack is now a representation of the convex hull, return it.
-    return convex_hull
+    if isinstance(points, np.ndarray):
+        return points[convex_hull_indexes(points)]
+    elif isinstance(points, Point2DArray):
+        return Point2DArray._from_array(points.array[convex_hull_indexes(points.array)])
+    else:
+        points = list(points)
+        indexes = convex_hull_indexes([(point.x, point.y) for point in points])
+        return [points[i] for i in indexes]
@@ -42,8 +42,9 @@ from math import fabs, sqrt, radians, pi, cos, sin # , degrees
 import numpy as np
 
 from Patro.Common.Math.Functions import sign # , epsilon_float
-from .Bezier import CubicBezier2D
+from .Bezier import CubicBezier2D, _gauss_legendre
 from .BoundingBox import bounding_box_from_points
+from .Flattening import FlatteningMixin, flatten_circle_arc, flatten_parametric
 from .Line import Line2D
 from .Mixin import AngularDomainMixin, CenterMixin, AngularDomain
 from .Primitive import Primitive, Primitive2DMixin
@@ -61,7 +62,65 @@ class PointNotOnCircleError(ValueError):
 
 ####################################################################################################
 
-class Circle2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
+MAXIMUM_ITERATION = 1074 # for double
+
+def _eberly_foot_points(radius0, radius1, points):
+
+    """Return the closest points on an ellipse to a N×2 array of points as a N×2 array.
+
+    The points are expressed in the ellipse coordinate system and lie in the first quadrant, the
+    radii verify radius0 ≥ radius1 > 0.  This is the algorithm of :meth:`Ellipse2D._eberly_distance`
+    where the bisections of all the points run in lockstep.
+
+    """
+
+    y0, y1 = points[:,0], points[:,1]
+
+    # y1 == 0
+    numerator0 = radius0 * y0
+    denominator0 = radius0**2 - radius1**2
+    is_inner = numerator0 < denominator0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xde0 = np.where(is_inner, numerator0 / denominator0, 1)
+    x0 = radius0 * xde0
+    x1 = radius1 * np.sqrt(1 - xde0**2)
+
+    # y0 == 0
+    is_on_minor_axis = (y0 == 0) & (y1 > 0)
+    x0[is_on_minor_axis] = 0
+    x1[is_on_minor_axis] = radius1
+
+    index = np.nonzero((y0 > 0) & (y1 > 0))[0]
+    if index.size:
+        z0 = y0[index] / radius0
+        z1 = y1[index] / radius1
+        g = z0**2 + z1**2 - 1
+        r0 = (radius0 / radius1)**2
+        n0 = r0 * z0
+        s0 = z1 - 1
+        s1 = np.where(g < 0, 0, np.hypot(n0, z1) - 1)
+        s = np.zeros(index.shape)
+        active = np.nonzero(g != 0)[0]
+        for i in range(MAXIMUM_ITERATION):
+            if not active.size:
+                break
+            s_active = (s0[active] + s1[active]) / 2
+            is_converged = (s_active == s0[active]) | (s_active == s1[active])
+            ratio0 = n0[active] / (s_active + r0)
+            ratio1 = z1[active] / (s_active + 1)
+            g = ratio0**2 + ratio1**2 - 1
+            s[active] = s_active
+            s0[active] = np.where(g > 0, s_active, s0[active])
+            s1[active] = np.where(g < 0, s_active, s1[active])
+            active = active[~is_converged & (g != 0)]
+        x0[index] = r0 * y0[index] / (s + r0)
+        x1[index] = y1[index] / (s + 1)
+
+    return np.stack((x0, x1), axis=1)
+
+####################################################################################################
+
+class Circle2D(FlatteningMixin, Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
 
     """Class to implements 2D Circle."""
 
@@ -139,8 +198,8 @@ class Circle2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
 
     ##############################################
 
-    def apply_transformation(self, transformation):
-        self._center = transformation * self._center
+    def _set_transformed_array(self, array, transformation):
+        self._center = self.__vector_cls__(array[0])
         # Fixme: shear -> ellipse
         if self._radius is not None:
             self._radius = transformation * self._radius
@@ -172,7 +231,7 @@ class Circle2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
 
     @property
     def perimeter(self):
-        if self._domain is not None:
+        if self._domain is None:
             return 2*pi * self._radius
         else:
             return self._radius * self._domain.length
@@ -223,8 +282,18 @@ class Circle2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
 
     @property
     def bounding_box(self):
-        # Fixme: wrong for arc
-        return self._center.bounding_box.enlarge(self._radius)
+
+        """Return the bounding box of the circle or of its arc.
+
+        The coordinates are extremal at the cardinal angles which lie on the arc and at its end
+        points.
+
+        """
+
+        angles = np.radians(self._arc_extremal_angles(np.array((0, 90, 180, 270))))
+        points = np.stack((np.cos(angles), np.sin(angles)), axis=1)
+        points = points * self._radius + tuple(self._center)
+        return bounding_box_from_points(points)
 
     ##############################################
 
@@ -334,9 +403,33 @@ class Circle2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
     def bezier_approximation(self):
         raise NotImplementedError
 
+    ##############################################
+
+    def _flattening_key(self):
+        domain = self._domain
+        if domain is not None:
+            domain = (domain.start, domain.stop)
+        return tuple(self._center), self._radius, domain
+
+    ##############################################
+
+    def _flatten(self, tolerance):
+
+        if self._domain is not None:
+            # the arc is swept from start to stop, see AngularDomain
+            start_angle, stop_angle = self._domain.start, self._domain.stop
+        else:
+            start_angle, stop_angle = 0, 360
+
+        angles = np.radians(flatten_circle_arc(self._radius, start_angle, stop_angle, tolerance))
+        points = np.empty((angles.shape[0], 2))
+        points[:,0] = self._center.x + self._radius * np.cos(angles)
+        points[:,1] = self._center.y + self._radius * np.sin(angles)
+        return points
+
 ####################################################################################################
 
-class Ellipse2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
+class Ellipse2D(FlatteningMixin, Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
 
     r"""Class to implements 2D Ellipse.
 
@@ -345,6 +438,8 @@ class Ellipse2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
 
     _logger = _module_logger.getChild('Ellipse2D')
 
+    ArcLengthQuadratureOrder = 16
+
     ##############################################
 
     @classmethod
@@ -392,7 +487,7 @@ class Ellipse2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
         # Ensure radii are large enough
         radii_scale = point1_prime.x**2/radius_x2 + point1_prime.y**2/radius_y2
         if radii_scale > 1:
-            self._logger.warning('SVG Arc: radii must be scale')
+            cls._logger.warning('SVG Arc: radii must be scale')
             radii_scale = math.sqrt(radii_scale)
             radius_x = radii_scale * radius_x
             radius_y = radii_scale * radius_y
@@ -402,7 +497,8 @@ class Ellipse2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
         # step 2
 
         den = radius_x2 * point1_prime.y**2 + radius_y2 * point1_prime.x**2
-        num = radius_x2*radius_y2 - den
+        # the rounding of the radii scaling can make it negative instead of null
+        num = max(radius_x2*radius_y2 - den, 0)
 
         ratio = radius_x/radius_y
 
@@ -411,15 +507,15 @@ class Ellipse2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
         # print(point1_prime.anti_normal)
         # print(ratio)
         # print(point1_prime.anti_normal.scale(ratio, 1/ratio))
-        sign *= -1 # Fixme: solve mirroring artefacts for y-axis pointing to the top
         center_prime = sign * math.sqrt(num / den) * point1_prime.anti_normal.scale(ratio, 1/ratio)
 
         center = Transformation2D.Rotation(angle) * center_prime + origin_prime
 
         vector1 =   (point1_prime - center_prime).divide(radius_x, radius_y)
         vector2 = - (point1_prime + center_prime).divide(radius_x, radius_y)
-        theta = cls.__vector_cls__(1, 0).angle_with(vector1)
-        delta_theta = vector1.angle_with(vector2)
+        # Note: angle_with returns the angle from its argument to self
+        theta = vector1.angle_with(cls.__vector_cls__(1, 0))
+        delta_theta = vector2.angle_with(vector1)
         # if theta < 0:
         #     theta = 180 + theta
         # if delta_theta < 0:
@@ -459,8 +555,8 @@ class Ellipse2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
 
     ##############################################
 
-    def apply_transformation(self, transformation):
-        self._center = transformation * self._center
+    def _set_transformed_array(self, array, transformation):
+        self._center = self.__vector_cls__(array[0])
         self._radius_x = transformation * self._radius_x
         self._radius_y = transformation * self._radius_y
         self._bounding_box = None
@@ -517,6 +613,98 @@ class Ellipse2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
 
     ##############################################
 
+    def _angle_range(self):
+        """Return the start and stop angles in radians, the domain is oriented from start to stop"""
+        if self._domain is not None:
+            return self._domain.start_radians, self._domain.stop_radians
+        else:
+            return 0, 2*pi
+
+    ##############################################
+
+    def _arc_lengths(self, angle0, angle1):
+
+        """Return the arc lengths between the arrays of angles *angle0* and *angle1* in radians.
+
+        The integral of the speed is computed by a Gauss-Legendre quadrature of order
+        :attr:`ArcLengthQuadratureOrder`.
+
+        """
+
+        nodes, weights = _gauss_legendre(self.ArcLengthQuadratureOrder)
+        half = (np.asarray(angle1, dtype=np.float64) - angle0) / 2
+        t = (angle0 + half)[...,np.newaxis] + half[...,np.newaxis] * nodes
+        speed = np.hypot(self._radius_x * np.sin(t), self._radius_y * np.cos(t))
+        return np.abs(half * np.dot(speed, weights))
+
+    ##############################################
+
+    @property
+    def length(self):
+        """Return the length of the ellipse or of its arc, the quadrature is applied on each quadrant"""
+        start_angle, stop_angle = self._angle_range()
+        number_of_segments = max(math.ceil(abs(stop_angle - start_angle) / (pi/2)), 1)
+        angles = np.linspace(start_angle, stop_angle, number_of_segments + 1)
+        return float(np.sum(self._arc_lengths(angles[:-1], angles[1:])))
+
+    ##############################################
+
+    def _angles_at_lengths(self, lengths, precision=1e-6):
+
+        """Return the angles in degrees at an array of arc *lengths* from the start of the domain.
+
+        The angles are interpolated from an arc length table, then refined by Newton steps.
+
+        """
+
+        start_angle, stop_angle = self._angle_range()
+        span = stop_angle - start_angle
+        lengths = np.asarray(lengths, dtype=np.float64)
+
+        # table with 8 intervals by quadrant, parametrised by u in [0, 1]
+        number_of_segments = max(math.ceil(abs(span) / (pi/16)), 1)
+        table_u = np.linspace(0, 1, number_of_segments + 1)
+        table_angles = start_angle + table_u * span
+        table_lengths = np.zeros(table_u.shape)
+        np.cumsum(self._arc_lengths(table_angles[:-1], table_angles[1:]), out=table_lengths[1:])
+
+        u = np.interp(lengths, table_lengths, table_u)
+        for i in range(10):
+            index = np.clip(np.searchsorted(table_u, u, side='right') - 1, 0, number_of_segments - 1)
+            angles = start_angle + u * span
+            error = table_lengths[index] + self._arc_lengths(table_angles[index], angles) - lengths
+            if np.all(np.abs(error) <= precision):
+                break
+            # ds/du = |span| * speed
+            speed = abs(span) * np.hypot(self._radius_x * np.sin(angles), self._radius_y * np.cos(angles))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = np.where(speed > 0, error / speed, 0)
+            u = np.clip(u - step, 0, 1)
+
+        return np.degrees(start_angle + u * span)
+
+    ##############################################
+
+    def _tangents_at_angles(self, angles):
+
+        """Return the derivatives at an array of *angles* in degrees as a N×2 array, they are oriented
+        from the start to the stop of the domain.
+
+        """
+
+        angles = np.radians(angles)
+        x = -self._radius_x * np.sin(angles)
+        y = self._radius_y * np.cos(angles)
+        if self._angle != 0:
+            angle = radians(self._angle)
+            x, y = x * cos(angle) - y * sin(angle), x * sin(angle) + y * cos(angle)
+        start_angle, stop_angle = self._angle_range()
+        if stop_angle < start_angle:
+            x, y = -x, -y
+        return np.stack((x, y), axis=1)
+
+    ##############################################
+
     def matrix(self):
 
         # unit circle -> scale(a, b) -> rotation -> translation(xc, yc)
@@ -573,26 +761,25 @@ class Ellipse2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
     @property
     def bounding_box(self):
 
-        if self._bounding_box is None:
+        """Return the bounding box of the ellipse or of its arc.
+
+        The coordinates are extremal at the angles where their derivative vanishes, if they lie on
+        the arc, and at its end points.
+
+        """
+
+        key = self._flattening_key()
+        if self._bounding_box is None or self._bounding_box[0] != key:
             radius_x, radius_y = self._radius_x, self._radius_y
-            if self._angle == 0:
-                bounding_box = self._center.bounding_box
-                bounding_box.x.enlarge(radius_x)
-                bounding_box.y.enlarge(radius_y)
-                self._bounding_box = bounding_box
-            else:
-                angle_x = self._angle
-                angle_y = angle_x + 90
-                Vector2D = self.__vector_cls__
-                points = [self._center + offset for offset in (
-                    Vector2D.from_polar(angle_x,  radius_x),
-                    Vector2D.from_polar(angle_x, -radius_x),
-                    Vector2D.from_polar(angle_y,  radius_y),
-                    Vector2D.from_polar(angle_y, -radius_y),
-                )]
-                self._bounding_box = bounding_box_from_points(points)
+            angle = radians(self._angle)
+            # x' = -rx sin(t) cos(a) - ry cos(t) sin(a), y' = -rx sin(t) sin(a) + ry cos(t) cos(a)
+            angle_x = math.degrees(math.atan2(-radius_y * sin(angle), radius_x * cos(angle)))
+            angle_y = math.degrees(math.atan2(radius_y * cos(angle), radius_x * sin(angle)))
+            angles = self._arc_extremal_angles(np.array((angle_x, angle_x + 180, angle_y, angle_y + 180)))
+            self._bounding_box = (key, bounding_box_from_points(self._points_at_angles(angles)))
 
-        return self._bounding_box
+        # the caller can enlarge it in place
+        return self._bounding_box[1].copy()
 
     ##############################################
 
@@ -652,6 +839,10 @@ class Ellipse2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
 
         y0, y1 = point
         e0, e1 = self._radius_x, self._radius_y
+        # swap the axes so as e0 ≥ e1
+        is_swapped = e0 < e1
+        if is_swapped:
+            y0, y1, e0, e1 = y1, y0, e1, e0
 
         if y1 > 0:
             if  y0 > 0:
@@ -687,14 +878,112 @@ class Ellipse2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
                 x1 = 0
                 distance = abs(y0 - e0)
 
+        if is_swapped:
+            x0, x1 = x1, x0
+
         return distance, self.__vector_cls__(x0, x1)
 
     ##############################################
 
+    def _arc_foot_points(self, points):
+
+        """Return the closest points on the arc to a N×2 array of points expressed in the ellipse
+        coordinate system.
+
+        The closest point is an end point of the arc or a local minimum of the distance.  The local
+        minima are bracketed by sampling the derivative of the squared distance with respect to the
+        parametric angle, then they are refined by a bisection in lockstep.
+
+        """
+
+        radius0, radius1 = self._radius_x, self._radius_y
+        y0, y1 = points[:,0,np.newaxis], points[:,1,np.newaxis]
+
+        def derivative(t):
+            # -1/2 derivative of the squared distance
+            sin_t, cos_t = np.sin(t), np.cos(t)
+            return (radius0**2 - radius1**2) * sin_t * cos_t - y0 * radius0 * sin_t + y1 * radius1 * cos_t
+
+        start = radians(min(self._domain.start, self._domain.stop))
+        span = radians(self._domain.span)
+        number_of_samples = max(math.ceil(span / (2*pi) * 64), 4)
+        t = start + span * np.linspace(0, 1, number_of_samples + 1)
+
+        values = derivative(t[np.newaxis])
+        point_index, sample_index = np.nonzero((values[:,:-1] > 0) & (values[:,1:] <= 0))
+        t0 = t[sample_index]
+        t1 = t[sample_index + 1]
+        y0, y1 = y0[point_index], y1[point_index]
+        for i in range(53):
+            middle = (t0 + t1) / 2
+            is_before = derivative(middle[:,np.newaxis])[:,0] > 0
+            t0 = np.where(is_before, middle, t0)
+            t1 = np.where(is_before, t1, middle)
+
+        number_of_points = points.shape[0]
+        candidate_index = np.concatenate((point_index, np.arange(number_of_points), np.arange(number_of_points)))
+        candidate_t = np.concatenate(((t0 + t1) / 2, np.full(number_of_points, t[0]), np.full(number_of_points, t[-1])))
+        candidates = np.stack((radius0 * np.cos(candidate_t), radius1 * np.sin(candidate_t)), axis=1)
+        delta = candidates - points[candidate_index]
+        distances = np.hypot(delta[:,0], delta[:,1])
+        order = np.lexsort((distances, candidate_index))
+        _, first = np.unique(candidate_index[order], return_index=True)
+        return candidates[order[first]]
+
+    ##############################################
+
+    def distances_to_points(self, points):
+
+        """Compute the distances from the ellipse, or the arc, to a N×2 array of points.
+
+        Return the array of distances and the N×2 array of the closest points.
+
+        """
+
+        points = np.asarray(points, dtype=np.float64)
+        angle = radians(self._angle)
+        c, s = cos(angle), sin(angle)
+        x = points[:,0] - self._center.x
+        y = points[:,1] - self._center.y
+        points_in_frame = np.stack((c*x + s*y, -s*x + c*y), axis=1)
+
+        # the algorithm requires radius0 ≥ radius1
+        if self._radius_x >= self._radius_y:
+            axes = [0, 1]
+        else:
+            axes = [1, 0]
+        radius0, radius1 = sorted((self._radius_x, self._radius_y), reverse=True)
+        feet = _eberly_foot_points(radius0, radius1, np.abs(points_in_frame[:,axes]))[:,axes]
+        feet = np.copysign(feet, points_in_frame)
+
+        if self._domain is not None and not self._domain.is_closed:
+            angles = np.degrees(np.arctan2(feet[:,1] / self._radius_y, feet[:,0] / self._radius_x))
+            is_outside = ~self._domain.is_inside_array(angles)
+            if np.any(is_outside):
+                feet[is_outside] = self._arc_foot_points(points_in_frame[is_outside])
+
+        delta = feet - points_in_frame
+        distances = np.hypot(delta[:,0], delta[:,1])
+        feet = np.stack((
+            c*feet[:,0] - s*feet[:,1] + self._center.x,
+            s*feet[:,0] + c*feet[:,1] + self._center.y,
+        ), axis=1)
+
+        return distances, feet
+
+    ##############################################
+
     def distance_to_point(self, point, return_point=False, is_inside=False):
 
         # Fixme: can be transform the problem to a circle using transformation ???
 
+        if not is_inside and self._domain is not None and not self._domain.is_closed:
+            distances, points = self.distances_to_points(np.array(((point.x, point.y),)))
+            if return_point:
+                return distances[0], self.__vector_cls__(points[0])
+            else:
+                return distances[0]
+
         point_in_frame = self.point_in_ellipse_frame(point)
         point_in_frame_abs = self.__vector_cls__(abs(point_in_frame.x), abs(point_in_frame.y))
         distance, point_in_ellipse = self._eberly_distance(point_in_frame_abs)
@@ -759,6 +1048,43 @@ class Ellipse2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
 
     ##############################################
 
+    def _points_at_angles(self, angles):
+
+        """Return the points at an array of *angles* in degrees as a N×2 array"""
+
+        angles = np.radians(angles)
+        x = self._radius_x * np.cos(angles)
+        y = self._radius_y * np.sin(angles)
+        if self._angle != 0:
+            angle = radians(self._angle)
+            x, y = x * cos(angle) - y * sin(angle), x * sin(angle) + y * cos(angle)
+        return np.stack((x + self._center.x, y + self._center.y), axis=1)
+
+    ##############################################
+
+    def _flattening_key(self):
+        domain = self._domain
+        if domain is not None:
+            domain = (domain.start, domain.stop)
+        return tuple(self._center), self._radius_x, self._radius_y, self._angle, domain
+
+    ##############################################
+
+    def _flatten(self, tolerance):
+
+        # The domain is oriented from start to stop, see svg_arc
+        if self._domain is not None:
+            start_angle, stop_angle = self._domain.start, self._domain.stop
+        else:
+            start_angle, stop_angle = 0, 360
+
+        # start with one interval by quadrant
+        number_of_segments = max(math.ceil(abs(stop_angle - start_angle) / 90), 1)
+        angles = np.linspace(start_angle, stop_angle, number_of_segments + 1)
+        return flatten_parametric(self._points_at_angles, angles, tolerance)[1]
+
+    ##############################################
+
     def to_bezier(self):
 
         """Convert an ellipse arc to a set of Quadratic Bézier curves."""
@@ -766,7 +1092,7 @@ class Ellipse2D(Primitive2DMixin, CenterMixin, AngularDomainMixin, Primitive):
         if self._domain is not None:
             # Fixme: is_over_closer
             start_angle = self._domain.start
-            angle_span = self._domain.span
+            angle_span = self._domain.stop - self._domain.start
         else:
             start_angle = 0
             angle_span = 360
@@ -0,0 +1,242 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""Module to flatten curves to polylines.
+
+A curve is flattened to a polyline whose distance to the curve is lower than a chord *tolerance*.
+The polylines are stored as N×2 Numpy arrays and exposed as :class:`Point2DArray`, they are cached
+per curve and tolerance, since exporters and hit-testers flatten the same curves repeatedly.
+
+Example of usage::
+
+  polyline = curve.flatten(tolerance=.1)
+  polyline = path.flatten(tolerance=.1)
+
+"""
+
+####################################################################################################
+
+__all__ = [
+    'FlatteningMixin',
+    'flatten_bezier',
+    'flatten_circle_arc',
+    'flatten_parametric',
+]
+
+####################################################################################################
+
+import math
+
+import numpy as np
+
+from .PointArray import Point2DArray
+
+####################################################################################################
+
+MAXIMUM_DEPTH = 16
+
+####################################################################################################
+
+def _distances_to_segments(points, start, stop):
+
+    """Return the distances of the M×K×2 array *points* to the M segments *start* – *stop*"""
+
+    # the coordinates are computed separately, it is faster than einsum and hypot for two components
+    dx = (stop[:,0] - start[:,0])[:,np.newaxis]
+    dy = (stop[:,1] - start[:,1])[:,np.newaxis]
+    ox = points[...,0] - start[:,0,np.newaxis]
+    oy = points[...,1] - start[:,1,np.newaxis]
+    length_square = dx*dx + dy*dy
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(length_square > 0, (ox*dx + oy*dy) / length_square, 0)
+    s = np.minimum(np.maximum(s, 0), 1)
+    x = ox - dx*s
+    y = oy - dy*s
+    return np.sqrt(x*x + y*y)
+
+####################################################################################################
+
+def _bezier_deviations(control_points):
+
+    """Return the maximum distance of the inner control points to the chord, for a M×(degree+1)×2
+    array of control points.
+
+    Since a Bézier curve lies in the convex hull of its control points, this distance is an upper
+    bound of the distance of the curve to its chord.
+
+    """
+
+    distances = _distances_to_segments(control_points[:,1:-1], control_points[:,0], control_points[:,-1])
+    return np.max(distances, axis=1)
+
+####################################################################################################
+
+def _split_bezier(control_points):
+
+    """Split a M×(degree+1)×2 array of Bézier curves at t = 1/2 using De Casteljau algorithm"""
+
+    left = [control_points[:,0]]
+    right = [control_points[:,-1]]
+    points = control_points
+    for i in range(control_points.shape[1] - 1):
+        points = (points[:,:-1] + points[:,1:]) / 2
+        left.append(points[:,0])
+        right.append(points[:,-1])
+    return np.stack(left, axis=1), np.stack(right[::-1], axis=1)
+
+####################################################################################################
+
+def flatten_bezier(control_points, tolerance):
+
+    """Flatten a Bézier curve defined by a (degree+1)×2 array of control points, return a N×2 array.
+
+    The curve is recursively split at t = 1/2 until the control points of each part lie within
+    *tolerance* of its chord.  The parts of a recursion level are processed at once.
+
+    """
+
+    control_points = np.asarray(control_points, dtype=np.float64)
+    curves = control_points[np.newaxis]
+    t = np.zeros(1)
+    dt = 1.
+
+    flat_t = []
+    flat_points = []
+    for depth in range(MAXIMUM_DEPTH + 1):
+        if depth < MAXIMUM_DEPTH:
+            is_flat = _bezier_deviations(curves) <= tolerance
+        else:
+            is_flat = np.ones(t.shape, dtype=np.bool_)
+        flat_t.append(t[is_flat])
+        flat_points.append(curves[is_flat,0])
+        if np.all(is_flat):
+            break
+        left, right = _split_bezier(curves[~is_flat])
+        t = t[~is_flat]
+        dt /= 2
+        curves = np.concatenate((left, right))
+        t = np.concatenate((t, t + dt))
+
+    t = np.concatenate(flat_t)
+    points = np.concatenate(flat_points + [control_points[-1:]])
+    order = np.argsort(t)
+    return points[np.append(order, order.shape[0])]
+
+####################################################################################################
+
+def flatten_parametric(function, t, tolerance):
+
+    """Flatten a parametric curve, return a tuple of arrays ``(t, points)``.
+
+    *function* evaluates the curve for an array of parameters and return a N×2 array.  *t* is the
+    array of initial parameters, which must include the parameters of the discontinuities.
+
+    Each interval is checked at its quarter parameters and is split at its middle until the distance
+    of these points to the chord is lower than *tolerance*.
+
+    """
+
+    t = np.asarray(t, dtype=np.float64)
+    points = function(t)
+    is_active = np.ones(t.shape[0] - 1, dtype=np.bool_)
+    quarters = np.array((.25, .5, .75))
+
+    for depth in range(MAXIMUM_DEPTH):
+        index = np.nonzero(is_active)[0]
+        if not index.size:
+            break
+        t0 = t[index]
+        t1 = t[index + 1]
+        probe_t = t0[:,np.newaxis] + (t1 - t0)[:,np.newaxis] * quarters
+        probes = function(probe_t.ravel()).reshape(probe_t.shape + (2,))
+        errors = np.max(_distances_to_segments(probes, points[index], points[index + 1]), axis=1)
+        must_split = errors > tolerance
+        split_index = index[must_split] + 1
+        is_active[:] = False
+        is_active[index[must_split]] = True
+        t = np.insert(t, split_index, probe_t[must_split,1])
+        points = np.insert(points, split_index, probes[must_split,1], axis=0)
+        is_active = np.insert(is_active, split_index, True)
+
+    return t, points
+
+####################################################################################################
+
+def flatten_circle_arc(radius, start_angle, stop_angle, tolerance):
+
+    """Return the angles in degrees which flatten a circle arc, the sagitta of the chords being lower
+    than *tolerance*.
+
+    """
+
+    if tolerance >= radius:
+        step = 90
+    else:
+        step = min(math.degrees(2 * math.acos(1 - tolerance / radius)), 90)
+    number_of_segments = max(math.ceil(abs(stop_angle - start_angle) / step), 1)
+    return np.linspace(start_angle, stop_angle, number_of_segments + 1)
+
+####################################################################################################
+
+class FlatteningMixin:
+
+    """Mixin to flatten a curve to a polyline.
+
+    The subclass implements :meth:`_flatten` which returns a N×2 array and :meth:`_flattening_key`
+    which returns a value that changes when the geometry changes.
+
+    """
+
+    FlatteningTolerance = 0.05
+
+    ##############################################
+
+    def _flattening_key(self):
+        return tuple((point.x, point.y) for point in self.points)
+
+    ##############################################
+
+    def flatten(self, tolerance=None):
+
+        """Return a :class:`Point2DArray` polyline which approximates the curve within *tolerance*.
+
+        The polyline is cached per tolerance and its array is read-only.
+
+        """
+
+        if tolerance is None:
+            tolerance = self.FlatteningTolerance
+        if tolerance <= 0:
+            raise ValueError('Tolerance must be positive')
+
+        key = self._flattening_key()
+        cache = getattr(self, '_flattening_cache', None)
+        if cache is None or cache[0] != key:
+            cache = (key, {})
+            self._flattening_cache = cache
+
+        polyline = cache[1].get(tolerance, None)
+        if polyline is None:
+            array = self._flatten(tolerance)
+            array.setflags(write=False)
+            polyline = Point2DArray._from_array(array)
+            cache[1][tolerance] = polyline
+
+        return polyline
@@ -38,11 +38,19 @@ __all__ = [
 import math
 from math import radians, pi # , degrees
 
+import numpy as np
+
 ####################################################################################################
 
 class AngularDomain:
 
-    """Class to define an angular domain"""
+    """Class to define an angular domain.
+
+    The arc is swept from the start to the stop angle, counterclockwise if start <= stop, else
+    clockwise, e.g. 300 to 30 is a clockwise arc of 270 degrees and 300 to 390 a counterclockwise
+    arc of 90 degrees.
+
+    """
 
     ##############################################
 
@@ -113,13 +121,12 @@ class AngularDomain:
 
     @property
     def is_counterclockwise(self):
-        """Return True if start <= stop, e.g. 10 <= 300"""
-        # Fixme: name ???
+        """Return True if the arc is swept counterclockwise, i.e. start <= stop, e.g. 10 <= 300"""
         return self.start <= self.stop
 
     @property
     def is_clockwise(self):
-        """Return True if stop < start, e.g. 300 < 10"""
+        """Return True if the arc is swept clockwise, i.e. stop < start, e.g. 300 to 10"""
         return self.stop < self.start
 
     ##############################################
@@ -130,20 +137,29 @@ class AngularDomain:
         if self.is_closed:
             return 2*pi
         else:
-            length = self.stop_radians - self.start_radians
-            if self.is_counterclockwise:
-                return length
-            else:
-                return 2*pi - length
+            return radians(self.span)
 
     ##############################################
 
     def is_inside(self, angle):
-        if self.is_counterclockwise:
-            return self._start <= angle <= self._stop
-        else:
-            # Fixme: check !!!
-            return not(self._stop < angle < self._start)
+        """Test if an angle in degrees lies on the arc, see :meth:`is_inside_array`"""
+        return bool(self.is_inside_array(angle))
+
+    ##############################################
+
+    def is_inside_array(self, angles):
+
+        """Test if an array of angles in degrees lie on the arc swept from start to stop, the angles
+        are taken modulo 360.  The arc covers the angles from the lower to the upper bound whatever
+        its orientation.
+
+        """
+
+        span = self.span
+        if span >= 360:
+            return np.ones(np.shape(angles), dtype=np.bool_)
+        lower = min(self._start, self._stop)
+        return (np.asarray(angles) - lower) % 360 <= span
 
 ####################################################################################################
 
@@ -190,6 +206,20 @@ class AngularDomainMixin:
     def stop_point(self):
         return self.start_stop_point(start=False)
 
+    ##############################################
+
+    def _arc_extremal_angles(self, angles):
+
+        """Return the angles in degrees where a coordinate can be extremal on the arc, i.e. the
+        critical *angles* of the closed curve which lie on the arc and its end angles.
+
+        """
+
+        domain = self._domain
+        if domain is None or domain.is_closed:
+            return angles
+        return np.concatenate((angles[domain.is_inside_array(angles)], (domain.start, domain.stop)))
+
 ####################################################################################################
 
 class CenterMixin:
@@ -0,0 +1,1093 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""Module to offset polylines and polygons, e.g. to compute seam allowances.
+
+Each edge is moved along its normal by the offset distance, then consecutive edges are joined:
+
+* on the inner side of a corner, the offset edges are cut at their intersection,
+* on the outer side, the gap is filled with a *miter*, a circular arc for a *round* join or a
+  segment for a *bevel* join.  A miter longer than *miter_limit* times the distance is replaced by a
+  bevel.
+
+An offset edge which is reversed, because the distance is larger than the features of the
+outline, is removed and its neighbours are joined together.  This removes the local loops in linear
+time, and the new joins are checked against the distance to the outline.  Then the remaining
+self-intersections are resolved: the loops of a polyline are cut, and a polygon whose check failed
+or which self-intersects is offset again through the vertices of its inner corners and cleaned by a
+boolean union with the positive winding rule, which is exact but slower.
+
+The polylines are processed as a whole, thus the pieces of a garment can be offset in one call.
+
+The offset of a curve is approximated by cubic Bézier curves, see :func:`offset_parametric`, thus a
+seam allowance can be exported as curves.
+
+Example of usage::
+
+  rings = offset_polygons([piece1, piece2], 1, join='round')
+  seam_allowances = polygon.offset(1)
+  curves = bezier.offset(1, tolerance=.01)
+
+"""
+
+####################################################################################################
+
+__all__ = [
+    'offset_parametric',
+    'offset_polygons',
+    'offset_polyline',
+    'offset_polylines',
+]
+
+####################################################################################################
+
+import math
+
+import numpy as np
+
+from .Flattening import MAXIMUM_DEPTH, FlatteningMixin, _distances_to_segments
+from .PointArray import Point2DArray
+
+####################################################################################################
+
+JOINS = ('miter', 'round', 'bevel')
+MITER_LIMIT = 4
+
+# above this mean number of candidate pairs per box, the sweep along x is replaced by a grid
+MAXIMUM_SWEEP_PAIRS = 16
+
+# number of samples to fit the offset of a curve interval, the error is also measured at their
+# midpoints
+NUMBER_OF_SAMPLES = 9
+
+# number of samples of an initial interval to find the cusps of the offset of a curve
+NUMBER_OF_CUSP_SAMPLES = 64
+
+####################################################################################################
+
+def _cross(u, v):
+    return u[...,0]*v[...,1] - u[...,1]*v[...,0]
+
+def _dot(u, v):
+    return u[...,0]*v[...,0] + u[...,1]*v[...,1]
+
+def _norm(u):
+    return np.sqrt(_dot(u, u))
+
+def _polar(radius, angles):
+    return np.stack((radius * np.cos(angles), radius * np.sin(angles)), axis=1)
+
+####################################################################################################
+
+def _neighbours(rings, closed):
+
+    """Return the previous and next indexes of consecutive items, *rings* is the sorted index of the
+    polyline of each item, -1 stands for the end of an open polyline.
+
+    """
+
+    number_of_items = rings.shape[0]
+    previous = np.arange(-1, number_of_items - 1)
+    next_ = np.arange(1, number_of_items + 1)
+    if number_of_items:
+        firsts = np.flatnonzero(rings[1:] != rings[:-1]) + 1
+        lasts = np.append(firsts, number_of_items) - 1
+        firsts = np.insert(firsts, 0, 0)
+        if closed:
+            previous[firsts] = lasts
+            next_[lasts] = firsts
+        else:
+            previous[firsts] = -1
+            next_[lasts] = -1
+    return previous, next_
+
+####################################################################################################
+
+def _is_last_occurrence(values, slots):
+
+    """Return the mask of the last occurrence of each value in an array of indexes, without sorting.
+    *slots* is a work array which is larger than the values.
+
+    """
+
+    positions = np.arange(values.size)
+    slots[values] = positions
+    return slots[values] == positions
+
+####################################################################################################
+
+def _intersect_lines(origin1, direction1, origin2, direction2, fallback):
+
+    """Return the intersections of lines, or the *fallback* points for parallel lines"""
+
+    denominator = _cross(direction1, direction2)
+    is_parallel = np.abs(denominator) <= 1e-12
+    s = np.divide(_cross(origin2 - origin1, direction2), denominator, out=np.zeros(denominator.size),
+                  where=~is_parallel)
+    points = origin1 + direction1 * s[:,np.newaxis]
+    if is_parallel.any():
+        points[is_parallel] = fallback[is_parallel]
+    return points
+
+####################################################################################################
+
+def _grid_pairs(lower1, upper1, groups1, lower2, upper2, groups2, cell_size):
+
+    """Return the arrays of the indexes of the pairs of boxes of two sets which share a cell of a
+    uniform grid and have the same group, the boxes are given by their lower and upper corners.
+
+    """
+
+    origin = np.minimum(lower1.min(axis=0), lower2.min(axis=0))
+    extent = np.maximum(upper1.max(axis=0), upper2.max(axis=0)) - origin
+    cell_size = max(cell_size, np.max(extent) / 2**20, 1e-300)
+    number_of_columns = int(extent[1] / cell_size) + 1
+    number_of_cells = (int(extent[0] / cell_size) + 1) * number_of_columns
+
+    def cells_of(lower, upper, groups):
+        # enumerate the cells covered by each box
+        lower_cell = ((lower - origin) / cell_size).astype(np.int64)
+        size = ((upper - origin) / cell_size).astype(np.int64) - lower_cell + 1
+        counts = size[:,0] * size[:,1]
+        owner = np.repeat(np.arange(lower.shape[0]), counts)
+        local = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = (groups[owner] * number_of_cells +
+                 (lower_cell[owner,0] + local // size[owner,1]) * number_of_columns +
+                 lower_cell[owner,1] + local % size[owner,1])
+        return cells, owner
+
+    cells1, owner1 = cells_of(lower1, upper1, groups1)
+    cells2, owner2 = cells_of(lower2, upper2, groups2)
+    order = np.argsort(cells2, kind='stable')
+    cells2 = cells2[order]
+    owner2 = owner2[order]
+
+    lower_index = np.searchsorted(cells2, cells1, side='left')
+    counts = np.searchsorted(cells2, cells1, side='right') - lower_index
+    first = np.repeat(owner1, counts)
+    second = owner2[np.repeat(lower_index, counts) + np.arange(first.size) -
+                    np.repeat(np.cumsum(counts) - counts, counts)]
+    number_of_boxes = lower2.shape[0]
+    pairs = np.unique(first * number_of_boxes + second)
+    return np.divmod(pairs, number_of_boxes)
+
+####################################################################################################
+
+def _overlapping_pairs(lower, upper, groups, cell_size):
+
+    """Return the arrays *i*, *j*, *i* < *j*, of the indexes of the pairs of boxes which overlap and
+    have the same group.
+
+    The boxes are sorted by their lower x, thus the candidates of a box are the following boxes up to
+    its upper x.  When the boxes overlap too much along x, e.g. for a vertical comb, a uniform grid
+    of *cell_size* is used.
+
+    """
+
+    number_of_boxes = lower.shape[0]
+    order = np.argsort(lower[:,0], kind='stable')
+    x_min = lower[order,0]
+    counts = np.searchsorted(x_min, upper[order,0], side='right') - np.arange(1, number_of_boxes + 1)
+    number_of_pairs = np.sum(counts)
+    if number_of_pairs > MAXIMUM_SWEEP_PAIRS * number_of_boxes:
+        i, j = _grid_pairs(lower, upper, groups, lower, upper, groups, cell_size)
+        is_ordered = i < j
+        return i[is_ordered], j[is_ordered]
+
+    first = np.repeat(np.arange(number_of_boxes), counts)
+    second = first + 1 + np.arange(number_of_pairs) - np.repeat(np.cumsum(counts) - counts, counts)
+    # the pairs are filtered in the sorted order, then mapped to the boxes
+    y_min = lower[order,1]
+    y_max = upper[order,1]
+    groups = groups[order]
+    is_overlapping = ((y_min[first] <= y_max[second]) & (y_min[second] <= y_max[first]) &
+                      (groups[first] == groups[second]))
+    first = order[first[is_overlapping]]
+    second = order[second[is_overlapping]]
+    return np.minimum(first, second), np.maximum(first, second)
+
+####################################################################################################
+
+def _distances_to_slabs(start, stop, edge_start, edge_stop):
+
+    """Return the distances between the pairs of segments *start* – *stop* and the lines of the edges,
+    restricted to the part of the segments which is projected inside the edges.  It is null for
+    crossing segments and infinite if the segment is outside the slab of the edge.
+
+    """
+
+    # the computations are made on the coordinates, it is faster than on N×2 arrays
+    ux = edge_stop[:,0] - edge_start[:,0]
+    uy = edge_stop[:,1] - edge_start[:,1]
+    length = np.sqrt(ux*ux + uy*uy)
+    ux /= length
+    uy /= length
+    x0 = start[:,0] - edge_start[:,0]
+    y0 = start[:,1] - edge_start[:,1]
+    x1 = stop[:,0] - edge_start[:,0]
+    y1 = stop[:,1] - edge_start[:,1]
+    t0 = x0*ux + y0*uy
+    t1 = x1*ux + y1*uy
+    d0 = ux*y0 - uy*x0
+    d1 = ux*y1 - uy*x1
+    # clip the parameter of the segment to the slab
+    dt = t1 - t0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s0 = np.where(dt > 0, -t0 / dt, (t0 - length) / -dt)
+        s1 = np.where(dt > 0, (length - t0) / dt, t0 / -dt)
+    is_parallel = dt == 0
+    s0 = np.where(is_parallel, 0, np.maximum(s0, 0))
+    s1 = np.where(is_parallel, 1, np.minimum(s1, 1))
+    is_outside = (s0 > s1) | (is_parallel & ((t0 < 0) | (t0 > length)))
+    e0 = d0 + (d1 - d0) * s0
+    e1 = d0 + (d1 - d0) * s1
+    distances = np.where(e0 * e1 <= 0, 0, np.minimum(np.abs(e0), np.abs(e1)))
+    distances[is_outside] = np.inf
+    return distances
+
+####################################################################################################
+
+def _nearest_points_on_segments(points, start, stop):
+
+    """Return the nearest points of the segments *start* – *stop* to the points."""
+
+    direction = stop - start
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = _dot(points - start, direction) / _dot(direction, direction)
+    # fmax replaces the nan of a null segment
+    s = np.minimum(np.fmax(s, 0), 1)
+    return start + direction * s[:,np.newaxis]
+
+####################################################################################################
+
+def _offset_distances(points, start, stop, normal1, normal2, number_of_steps, factors, is_miter, is_end):
+
+    """Return the distances of the points to the edges *start* – *stop* as measured by the offset.
+
+    It is the distance to the line of the edge in its slab, or to its start vertex.  In the wedge
+    between the unit normals of the previous edge and the edge on the offset side, it is the largest
+    projection on the normals for a miter and the projection on the bisector divided by the chord
+    factor for a bevel.  The distance to the stop vertex is used at the end of an open polyline.
+
+    """
+
+    distances = _distances_to_slabs(points, points, start, stop)
+    w = points - start
+    vertex_distances = _norm(w)
+    turn = np.sign(_cross(normal1, normal2))
+    is_in_wedge = (turn * _cross(normal1, w) >= 0) & (turn * _cross(w, normal2) >= 0) & (turn != 0)
+    is_bevel = is_in_wedge & (number_of_steps == 1)
+    if np.any(is_bevel):
+        bisector = normal1[is_bevel] + normal2[is_bevel]
+        bisector /= _norm(bisector)[:,np.newaxis]
+        vertex_distances[is_bevel] = _dot(w[is_bevel], bisector) / factors[is_bevel]
+    is_miter = is_in_wedge & is_miter
+    vertex_distances[is_miter] = np.maximum(_dot(w[is_miter], normal1[is_miter]),
+                                            _dot(w[is_miter], normal2[is_miter]))
+    distances = np.minimum(distances, vertex_distances)
+    if np.any(is_end):
+        w = points[is_end] - stop[is_end]
+        distances[is_end] = np.minimum(distances[is_end], _norm(w))
+    return distances
+
+####################################################################################################
+
+def _distances_in_wedges(start, stop, vertex, normal1, normal2, is_miter):
+
+    """Return the distances from the vertices of the part of the segments *start* – *stop* which is
+    inside the wedges between the unit normals, it is infinite if the segment is outside the wedge.
+    The distance is measured along the bisector of the wedge for a bevel and it is the largest
+    projection on the normals for a miter.
+
+    """
+
+    w0 = start - vertex
+    w1 = stop - vertex
+    turn = np.sign(_cross(normal1, normal2))
+    s0 = np.zeros(start.shape[0])
+    s1 = np.ones(start.shape[0])
+    is_outside = np.zeros(start.shape[0], dtype=np.bool_)
+    # clip the parameter of the segment to the sides of the wedge
+    for f0, f1 in ((turn * _cross(normal1, w0), turn * _cross(normal1, w1)),
+                   (turn * _cross(w0, normal2), turn * _cross(w1, normal2))):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            root = f0 / (f0 - f1)
+        s0 = np.where((f0 < 0) & (f1 >= 0), np.maximum(s0, root), s0)
+        s1 = np.where((f0 >= 0) & (f1 < 0), np.minimum(s1, root), s1)
+        is_outside |= (f0 < 0) & (f1 < 0)
+    bisector = normal1 + normal2
+    norm = _norm(bisector)
+    # a u-turn is not tested
+    is_outside |= (s0 > s1) | (norm <= 1e-12)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bisector /= norm[:,np.newaxis]
+    # the distances are convex along the segment, the minimum of a miter can be on the bisector
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s2 = np.minimum(np.fmax(_dot(w0, normal2 - normal1) / _dot(w1 - w0, normal1 - normal2), s0), s1)
+    distances = np.full(start.shape[0], np.inf)
+    for s in (s0, s1, s2):
+        w = w0 + (w1 - w0) * s[:,np.newaxis]
+        distances = np.minimum(distances, np.where(is_miter, np.maximum(_dot(w, normal1), _dot(w, normal2)),
+                                                   _dot(w, bisector)))
+    distances[is_outside] = np.inf
+    return distances
+
+####################################################################################################
+
+def _self_intersections(points, rings, closed):
+
+    """Find the intersections of the non adjacent segments of each polyline.
+
+    The segments are bucketed in a uniform grid, so only the segments which share a cell are tested.
+    Return the arrays *i*, *j* of the segments, *i* < *j*, and the intersection points.
+
+    """
+
+    _, next_ = _neighbours(rings, closed)
+    segments = np.nonzero(next_ >= 0)[0]
+    start = points.take(segments, axis=0)
+    stop = points.take(next_[segments], axis=0)
+    empty = np.zeros(0, dtype=np.int64)
+    if segments.size < 3:
+        return empty, empty, np.zeros((0, 2))
+
+    # the cell size is the mean length of the segments
+    lower = np.minimum(start, stop)
+    upper = np.maximum(start, stop)
+    cell_size = np.mean(_norm(stop - start))
+    i, j = _overlapping_pairs(lower, upper, rings[segments], cell_size)
+    i, j = segments[i], segments[j]
+
+    # exclude the adjacent segments
+    is_candidate = (next_[i] != j) & (next_[j] != i)
+    i, j = i[is_candidate], j[is_candidate]
+
+    p0, p1 = points.take(i, axis=0), points.take(next_[i], axis=0)
+    q0, q1 = points.take(j, axis=0), points.take(next_[j], axis=0)
+    dp = p1 - p0
+    dq = q1 - q0
+    denominator = _cross(dp, dq)
+    offset = q0 - p0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = _cross(offset, dq) / denominator
+        r = _cross(offset, dp) / denominator
+    is_intersecting = (denominator != 0) & (s >= 0) & (s <= 1) & (r >= 0) & (r <= 1)
+    # collinear overlapping segments
+    is_collinear = (denominator == 0) & (_cross(offset, dp) == 0)
+    if np.any(is_collinear):
+        length_square = np.maximum(_dot(dp, dp), 1e-300)
+        s0 = _dot(offset, dp) / length_square
+        s1 = _dot(q1 - p0, dp) / length_square
+        is_collinear &= (np.maximum(s0, s1) >= 0) & (np.minimum(s0, s1) <= 1)
+        s = np.where(is_collinear, np.clip(np.minimum(s0, s1), 0, 1), s)
+        is_intersecting |= is_collinear
+
+    s = s[is_intersecting]
+    return i[is_intersecting], j[is_intersecting], p0[is_intersecting] + dp[is_intersecting] * s[:,np.newaxis]
+
+####################################################################################################
+
+def _cut_loops(points, i, j, intersections):
+
+    """Cut the loops of an open polyline at its self-intersections"""
+
+    order = np.argsort(i, kind='stable')
+    parts = []
+    start = 0
+    last_j = -1
+    for k in order:
+        if i[k] < last_j:
+            # nested loop
+            continue
+        parts.append(points[start:i[k]+1])
+        parts.append(intersections[k:k+1])
+        start = j[k] + 1
+        last_j = j[k]
+    parts.append(points[start:])
+    points = np.concatenate(parts)
+    # an intersection can be a vertex
+    is_duplicated = np.all(points[1:] == points[:-1], axis=1)
+    return points[np.insert(~is_duplicated, 0, True)]
+
+####################################################################################################
+
+def _resolve_rings(points, rings, selected, distances, join, miter_limit, tolerance):
+
+    """Offset the *selected* closed polylines and resolve their loops exactly.
+
+    The offset edges are connected through the vertices of the inner corners, then the loops are
+    removed by a boolean union with the positive winding rule.  Return a dictionary which maps the
+    polylines to a list of N×2 arrays.
+
+    """
+
+    from .BooleanOperation import union
+
+    is_selected = np.isin(rings, selected)
+    points = points[is_selected]
+    rings = rings[is_selected]
+    offset_points, offset_rings, _ = _offset(points, rings, distances, join, miter_limit, tolerance,
+                                             closed=True, through_vertex=True)
+    bounds = np.searchsorted(offset_rings, selected), np.searchsorted(offset_rings, selected, side='right')
+    input_bounds = np.searchsorted(rings, selected), np.searchsorted(rings, selected, side='right')
+
+    results = {}
+    for ring, lower, upper, input_lower, input_upper in zip(selected, *bounds, *input_bounds):
+        polyline = offset_points[lower:upper]
+        vertices = points[input_lower:input_upper]
+        # counterclockwise orientation for the positive winding rule
+        is_clockwise = np.sum(_cross(vertices, np.roll(vertices, -1, axis=0))) < 0
+        if is_clockwise:
+            polyline = polyline[::-1]
+        parts = [polygon.point2d_array.array for polygon in union(polyline, [], 'positive')]
+        if is_clockwise:
+            parts = [part[::-1] for part in parts]
+        results[ring] = parts
+    return results
+
+####################################################################################################
+
+def _offset(points, rings, distances, join, miter_limit, tolerance, closed, through_vertex=False):
+
+    """Offset a set of polylines to the left.
+
+    *points* is a N×2 array of the concatenated vertices, *rings* the index of the polyline of each
+    vertex and *distances* the offset distance of each polyline.  The consecutive vertices must be
+    distinct.
+
+    The offset edges of an inner corner are cut at their intersection, then the reversed segments are
+    removed.  If *through_vertex* is set, they are instead connected through the vertex, like in
+    the Clipper library, thus the loops can be resolved exactly by a positive winding union.
+
+    Return the array of the offset vertices, the index of their polylines and a boolean array which
+    tells if the pruning of a polyline is valid.
+
+    """
+
+    _, next_vertex = _neighbours(rings, closed)
+    edges = np.nonzero(next_vertex >= 0)[0]
+    number_of_edges = edges.size
+    edge_rings = rings[edges]
+    # the rows of the N×2 arrays are gathered by take which is much faster than fancy indexing
+    start = points.take(edges, axis=0)
+    stop = points.take(next_vertex[edges], axis=0)
+    tangent = stop - start
+    tangent /= _norm(tangent)[:,np.newaxis]
+    normal = np.stack((-tangent[:,1], tangent[:,0]), axis=1)
+    distance = distances[edge_rings]
+    normal_offset = normal * distance[:,np.newaxis]
+    previous_edge, next_edge = _neighbours(edge_rings, closed)
+
+    # join at the start vertex of each edge
+    joined = np.nonzero(previous_edge >= 0)[0]
+    p = previous_edge[joined]
+    previous_tangent = tangent.take(p, axis=0)
+    joined_tangent = tangent.take(joined, axis=0)
+    cross = _cross(previous_tangent, joined_tangent)
+    dot = _dot(previous_tangent, joined_tangent)
+    is_straight = np.abs(cross) <= 1e-12
+    is_u_turn = is_straight & (dot < 0)
+    # the outer side of the corner is the offset side
+    is_outer = (cross * distance[joined] < 0) | is_u_turn
+    is_point = ~is_outer
+    if join == 'miter':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            is_point |= ~is_u_turn & (np.sqrt(2 / (1 + dot)) <= miter_limit)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # intersection of the offset edges
+        miter = (start.take(joined, axis=0) +
+                 (normal_offset.take(p, axis=0) + normal_offset.take(joined, axis=0)) / (1 + dot)[:,np.newaxis])
+    is_vertex = ~is_outer & ~is_straight if through_vertex else np.zeros(joined.size, dtype=np.bool_)
+    is_point &= ~is_vertex
+
+    # number of steps of the joins: 0 for a point, 2 through the vertex, else arcs and a bevel is an
+    # arc with one step
+    number_of_steps = np.zeros(number_of_edges, dtype=np.int64)
+    steps = np.ones(joined.size, dtype=np.int64)
+    if join == 'round':
+        radius = np.abs(distance[joined])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = 2 * np.arccos(np.clip(1 - tolerance / radius, -1, 1))
+            sweep = np.abs(np.arctan2(cross, dot))
+            steps = np.maximum(np.ceil(sweep / np.maximum(step, 1e-3)), 1).astype(np.int64)
+    steps[is_point] = 0
+    steps[is_vertex] = 2
+    number_of_steps[joined] = steps
+
+    # raw offset polyline: the points of the join at the start of each edge, the last point of a join
+    # is the start of the offset edge
+    counts = number_of_steps + 1
+    owner = np.repeat(np.arange(number_of_edges), counts)
+    step_index = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    is_last_of_join = step_index == number_of_steps[owner]
+    offset_start = start + normal_offset
+    miter_of_edge = offset_start.copy()
+    point_joins = np.flatnonzero(is_point)
+    miter_of_edge[joined[point_joins]] = miter.take(point_joins, axis=0)
+    raw_points = miter_of_edge.take(owner, axis=0)
+
+    is_arc = is_outer & ~is_point
+    join_kind = np.zeros(number_of_edges, dtype=np.int64) # 0 for a point, 1 for an arc, 2 for a vertex
+    join_kind[joined[is_arc]] = 1
+    join_kind[joined[is_vertex]] = 2
+    kind = join_kind[owner]
+
+    # arcs from the previous offset edge to the offset edge, around the vertex, the sweep of the
+    # normals is the one of the tangents
+    arcs = joined[is_arc]
+    arc_previous = previous_edge[arcs]
+    arc_sweep = np.arctan2(cross[is_arc], dot[is_arc])
+    # the chords of the arcs are closer to the vertex than the distance by this factor
+    vertex_factor = np.ones(number_of_edges)
+    vertex_factor[arcs] = np.cos(arc_sweep / number_of_steps[arcs] / 2)
+    is_inner_arc_point = (kind == 1) & (step_index > 0) & ~is_last_of_join
+    if np.any(is_inner_arc_point):
+        angle_start = np.arctan2(normal[arc_previous,1], normal[arc_previous,0])
+        angle_start[distance[arcs] < 0] += math.pi
+        arc_index = np.zeros(number_of_edges, dtype=np.int64)
+        arc_index[arcs] = np.arange(arcs.size)
+        arc_owner = owner[is_inner_arc_point]
+        arc = arc_index[arc_owner]
+        fraction = step_index[is_inner_arc_point] / number_of_steps[arc_owner]
+        raw_points[is_inner_arc_point] = start[arc_owner] + _polar(np.abs(distance[arc_owner]),
+                                                                   angle_start[arc] + arc_sweep[arc] * fraction)
+
+    is_miter = np.zeros(number_of_edges, dtype=np.bool_)
+    is_miter[joined[is_outer & is_point]] = True
+
+    # use the exact start points of the arcs and the path through the vertex
+    first_of_joins = np.flatnonzero((step_index == 0) & (kind != 0))
+    first_owner = owner[first_of_joins]
+    raw_points[first_of_joins] = (start.take(first_owner, axis=0) +
+                                  normal_offset.take(previous_edge[first_owner], axis=0))
+    is_middle_of_vertex = (kind == 2) & (step_index == 1)
+    raw_points[is_middle_of_vertex] = start[owner[is_middle_of_vertex]]
+
+    raw_rings = edge_rings[owner]
+    if not closed:
+        # append the stop point of the polylines
+        is_last_edge = np.ones(number_of_edges, dtype=np.bool_)
+        is_last_edge[:-1] = edge_rings[1:] != edge_rings[:-1]
+        last_edges = np.nonzero(is_last_edge)[0]
+        insert_at = np.cumsum(counts)[last_edges]
+        stops = points[next_vertex[edges[last_edges]]] + normal_offset[last_edges]
+        raw_points = np.insert(raw_points, insert_at, stops, axis=0)
+        raw_rings = np.insert(raw_rings, insert_at, edge_rings[last_edges])
+        owner = np.insert(owner, insert_at, last_edges)
+        is_last_of_join = np.insert(is_last_of_join, insert_at, True)
+
+    # remove the null segments
+    _, next_raw = _neighbours(raw_rings, closed)
+    delta = raw_points.take(next_raw, axis=0) - raw_points
+    is_null = (delta[:,0] == 0) & (delta[:,1] == 0) & (next_raw >= 0)
+    is_null &= ~is_last_of_join | np.insert(is_last_of_join, 0, False)[:-1]
+    raw_points = raw_points.compress(~is_null, axis=0)
+    raw_rings = raw_rings[~is_null]
+    owner = owner[~is_null]
+    is_last_of_join = is_last_of_join[~is_null]
+
+    # the direction of a segment which follows a join is the edge tangent, else it is a chord of the
+    # join
+    number_of_segments = raw_points.shape[0]
+    previous, next_ = _neighbours(raw_rings, closed)
+    has_next = next_ >= 0
+    join_start = raw_points.copy()
+    # the last segment of an open polyline is a point
+    join_stop = raw_points.take(np.where(has_next, next_, np.arange(number_of_segments)), axis=0)
+    raw_stop = join_stop.copy()
+    direction = join_stop - join_start
+    last_of_joins = np.flatnonzero(is_last_of_join)
+    direction[last_of_joins] = tangent.take(owner[last_of_joins], axis=0)
+
+    is_reversed = (_dot(join_stop - join_start, direction) < 0) & has_next
+    is_pruned = np.zeros(number_of_segments, dtype=np.bool_)
+
+    # remove the reversed segments and join their neighbours
+    is_active = np.ones(number_of_segments, dtype=np.bool_)
+    # the end points of an open polyline are kept
+    is_fixed = (previous < 0) | ~has_next
+    is_fixed[has_next] |= next_[next_[has_next]] < 0
+    # only the neighbours of the removed segments change, they are found by following the links
+    candidates = np.arange(0 if through_vertex else number_of_segments)
+    slots = np.empty(number_of_segments, dtype=np.int64)
+    while candidates.size:
+        removed = candidates[is_reversed[candidates] & is_active[candidates] & ~is_fixed[candidates]]
+        if not removed.size:
+            break
+        is_active[removed] = False
+        p = previous[removed]
+        c = next_[removed]
+        for step in range(removed.size):
+            is_moving_p = (p >= 0) & ~is_active[p]
+            is_moving_c = (c >= 0) & ~is_active[c]
+            if not (is_moving_p.any() or is_moving_c.any()):
+                break
+            p[is_moving_p] = previous[p[is_moving_p]]
+            c[is_moving_c] = next_[c[is_moving_c]]
+        previous[removed] = p
+        next_[removed] = c
+        # a polyline can be completely removed
+        is_joined = (p >= 0) & (c >= 0)
+        is_joined[is_joined] = is_active[p[is_joined]] & is_active[c[is_joined]]
+        # the segments removed in a row have the same neighbours
+        p = p[is_joined]
+        c = c[is_joined]
+        is_unique = _is_last_occurrence(c, slots)
+        p = p[is_unique]
+        c = c[is_unique]
+        previous[c] = p
+        next_[p] = c
+        intersections = _intersect_lines(raw_points.take(p, axis=0), direction.take(p, axis=0),
+                                         raw_points.take(c, axis=0), direction.take(c, axis=0),
+                                         (join_stop.take(p, axis=0) + join_start.take(c, axis=0)) / 2)
+        join_start[c] = intersections
+        join_stop[p] = intersections
+        is_pruned[c] = True
+        candidates = np.concatenate((p, c))
+        candidates = candidates[_is_last_occurrence(candidates, slots)]
+        is_reversed[candidates] = _dot(join_stop.take(candidates, axis=0) - join_start.take(candidates, axis=0),
+                                       direction.take(candidates, axis=0)) < 0
+
+    # drop the collapsed polylines
+    segments = np.nonzero(is_active)[0]
+    minimum_number_of_segments = 3 if closed else 1
+    counts = np.bincount(raw_rings[segments], minlength=distances.size)
+    segments = segments[counts[raw_rings[segments]] >= minimum_number_of_segments]
+
+    # the pruning is wrong if a segment next to a new join is closer to the interior of an edge than
+    # the distance, or closer to a vertex than its join, or if a join extends its segments away from
+    # the offset, or if the start or middle of a segment are farther for a round join.  The segments
+    # are only tested against the edges from the one before the previous segment to the one after the
+    # next segment, i.e. the removed edges and their neighbours, a wrong join which goes farther is
+    # found by the self-intersection test.
+    is_valid = np.ones(distances.size, dtype=np.bool_)
+    pruned = segments[is_pruned[segments]]
+    if pruned.size:
+        absolute_distances = np.abs(distances)
+        margins = absolute_distances * (1 - 1e-9) - tolerance
+        ring_ids = np.arange(distances.size)
+        first_edges = np.searchsorted(edge_rings, ring_ids)
+        number_of_ring_edges = np.searchsorted(edge_rings, ring_ids, side='right') - first_edges
+
+        adjacent = np.concatenate((previous[pruned], pruned))
+        first_edge = owner[previous[pruned]] - 1
+        last_edge = owner[pruned] + 1
+        rings_of_joins = raw_rings[pruned]
+        ring_first_edge = first_edges[rings_of_joins]
+        ring_size = number_of_ring_edges[rings_of_joins]
+        if closed:
+            lengths = np.minimum((last_edge - first_edge) % ring_size + 1, ring_size)
+        else:
+            first_edge = np.maximum(first_edge, ring_first_edge)
+            last_edge = np.minimum(last_edge, ring_first_edge + ring_size - 1)
+            lengths = last_edge - first_edge + 1
+        lengths = np.tile(lengths, 2)
+        segment_index = np.repeat(np.arange(adjacent.size), lengths)
+        local_edge = (np.tile(first_edge - ring_first_edge, 2)[segment_index] +
+                      np.arange(segment_index.size) - np.repeat(np.cumsum(lengths) - lengths, lengths))
+        ring_first_edge = np.tile(ring_first_edge, 2)[segment_index]
+        ring_size = np.tile(ring_size, 2)[segment_index]
+        j = ring_first_edge + local_edge % ring_size
+        i = adjacent[segment_index]
+        margins_of_pairs = margins[raw_rings[i]]
+        # the coordinates of the pairs are gathered once
+        segment_start = join_start.take(i, axis=0)
+        segment_stop = join_stop.take(i, axis=0)
+        edge_start = start.take(j, axis=0)
+        edge_stop = stop.take(j, axis=0)
+
+        # the start vertex of an edge is the vertex of its join, the part of a segment in the wedge of
+        # a bevel or a miter must be beyond the join, else the segment must be farther than the
+        # chords of the join
+        vertex_distances = _distances_to_segments(edge_start[:,np.newaxis], segment_start, segment_stop)[:,0]
+        is_wedge = (number_of_steps[j] == 1) | is_miter[j]
+        if np.any(is_wedge):
+            w = np.flatnonzero(is_wedge)
+            wedge_edges = j[w]
+            side = np.sign(distance[wedge_edges])[:,np.newaxis]
+            vertex_distances[w] = _distances_in_wedges(segment_start.take(w, axis=0), segment_stop.take(w, axis=0),
+                                                       edge_start.take(w, axis=0),
+                                                       normal.take(previous_edge[wedge_edges], axis=0) * side,
+                                                       normal.take(wedge_edges, axis=0) * side,
+                                                       is_miter[wedge_edges])
+        is_close = ((_distances_to_slabs(segment_start, segment_stop, edge_start, edge_stop) < margins_of_pairs) |
+                    (vertex_distances < margins_of_pairs * vertex_factor[j]))
+        # the end of an open polyline
+        is_end = next_edge[j] < 0
+        if np.any(is_end):
+            e = np.flatnonzero(is_end)
+            is_close[e] |= (_distances_to_segments(edge_stop[e][:,np.newaxis], segment_start[e], segment_stop[e])[:,0] <
+                            margins_of_pairs[e])
+        is_valid[raw_rings[i[is_close]]] = False
+
+        # a join which extends its segments must follow the offset, else a segment is missing
+        # between them
+        p = previous[pruned]
+        extension_start = _nearest_points_on_segments(join_start[pruned], raw_points[pruned], raw_stop[pruned])
+        extension_stop = _nearest_points_on_segments(join_stop[p], raw_points[p], raw_stop[p])
+        start_extensions = join_start[pruned] - extension_start
+        stop_extensions = join_stop[p] - extension_stop
+        is_extended = ((_norm(start_extensions) > tolerance) |
+                       (_norm(stop_extensions) > tolerance))
+        if np.any(is_extended):
+            number_of_joins = pruned.size
+            is_tested = np.tile(is_extended, 2)[segment_index] & (segment_index >= number_of_joins)
+            tested_joins = segment_index[is_tested] - number_of_joins
+            first_tested = np.flatnonzero(np.diff(tested_joins, prepend=-1))
+            extended = tested_joins[first_tested]
+            rings_of_extended = rings_of_joins[extended]
+            threshold = absolute_distances[rings_of_extended] + tolerance
+            tested_edges = j[is_tested]
+            side = np.sign(distance[tested_edges])[:,np.newaxis]
+            tested = (edge_start.compress(is_tested, axis=0), edge_stop.compress(is_tested, axis=0),
+                      normal.take(previous_edge[tested_edges], axis=0) * side,
+                      normal.take(tested_edges, axis=0) * side,
+                      number_of_steps[tested_edges], vertex_factor[tested_edges],
+                      is_miter[tested_edges], next_edge[tested_edges] < 0)
+            for probes in (join_start[pruned], (join_start[pruned] + extension_start) / 2,
+                           (join_stop[p] + extension_stop) / 2):
+                probe_distances = _offset_distances(probes.take(tested_joins, axis=0), *tested)
+                is_far = np.minimum.reduceat(probe_distances, first_tested) > threshold
+                is_valid[rings_of_extended[is_far]] = False
+
+        if join == 'round':
+            first_pairs = np.cumsum(lengths) - lengths
+            rings_of_adjacent = raw_rings[adjacent]
+            threshold = 2*absolute_distances[rings_of_adjacent] - margins[rings_of_adjacent]
+            for probes in (segment_start, (segment_start + segment_stop) / 2):
+                probe_distances = _distances_to_segments(probes[:,np.newaxis], edge_start, edge_stop)[:,0]
+                is_far = np.minimum.reduceat(probe_distances, first_pairs) > threshold
+                is_valid[rings_of_adjacent[is_far]] = False
+
+    return join_start[segments], raw_rings[segments], is_valid
+
+####################################################################################################
+
+def _to_array(polyline):
+    if hasattr(polyline, 'point2d_array'):
+        polyline = polyline.point2d_array
+    return np.asarray(Point2DArray._to_array(polyline), dtype=np.float64)
+
+####################################################################################################
+
+def offset_polylines(polylines, distance, join='miter', miter_limit=MITER_LIMIT, tolerance=None,
+                     closed=False, remove_loops=True):
+
+    """Offset a list of polylines to the left for a positive *distance*.
+
+    *polylines* is a list of :class:`Polyline2D`, :class:`Polygon2D`, :class:`Point2DArray` or N×2
+    arrays.  *distance* is a number or an array of distances per polyline.  *join* is ``miter``,
+    ``round`` or ``bevel``, *tolerance* is the chord tolerance of the round joins.  If *closed* is
+    set, the polylines are closed.
+
+    Return for each polyline a list of N×2 arrays, it is empty if the polyline collapsed.  An open
+    polyline gives one polyline, a closed one can be split in several rings.
+
+    """
+
+    if join not in JOINS:
+        raise ValueError('Unknown join {}'.format(join))
+    if tolerance is None:
+        tolerance = FlatteningMixin.FlatteningTolerance
+
+    arrays = [_to_array(polyline) for polyline in polylines]
+    if not arrays:
+        return []
+    distances = np.broadcast_to(np.asarray(distance, dtype=np.float64), (len(arrays),))
+
+    # remove the consecutive duplicated vertices
+    lengths = [array.shape[0] for array in arrays]
+    points = np.concatenate(arrays)
+    rings = np.repeat(np.arange(len(arrays)), lengths)
+    _, next_ = _neighbours(rings, True)
+    delta = points.take(next_, axis=0) - points
+    is_duplicated = (delta[:,0] == 0) & (delta[:,1] == 0)
+    if not closed:
+        is_duplicated[np.cumsum(lengths) - 1] = False
+    points = points.compress(~is_duplicated, axis=0)
+    rings = rings[~is_duplicated]
+    minimum_number_of_points = 3 if closed else 2
+    is_valid = np.bincount(rings, minlength=len(arrays))[rings] >= minimum_number_of_points
+    points = points.compress(is_valid, axis=0)
+    rings = rings[is_valid]
+
+    offset_points, offset_rings, is_valid = _offset(points, rings, distances, join, miter_limit,
+                                                        tolerance, closed)
+    bounds = np.searchsorted(offset_rings, np.arange(len(arrays) + 1))
+    results = [[offset_points[lower:upper]] if upper > lower else []
+               for lower, upper in zip(bounds[:-1], bounds[1:])]
+    if not remove_loops:
+        return results
+
+    i, j, intersections = _self_intersections(offset_points, offset_rings, closed)
+    if closed:
+        selected = np.union1d(offset_rings[i], np.nonzero(~is_valid)[0])
+        if selected.size:
+            for ring, parts in _resolve_rings(points, rings, selected, distances,
+                                              join, miter_limit, tolerance).items():
+                results[ring] = parts
+    else:
+        for ring in np.unique(offset_rings[i]):
+            is_ring = offset_rings[i] == ring
+            offset = bounds[ring]
+            results[ring] = [_cut_loops(results[ring][0], i[is_ring] - offset, j[is_ring] - offset,
+                                        intersections[is_ring])]
+
+    return results
+
+####################################################################################################
+
+def offset_polyline(polyline, distance, **kwargs):
+    """Offset a polyline, see :func:`offset_polylines`"""
+    return offset_polylines([polyline], distance, **kwargs)[0]
+
+####################################################################################################
+
+def offset_polygons(polygons, distance, join='miter', miter_limit=MITER_LIMIT, tolerance=None,
+                    remove_loops=True):
+
+    """Offset a list of polygons outward for a positive *distance*, e.g. to compute seam allowances.
+
+    See :func:`offset_polylines` for the parameters.  Return for each polygon a list of
+    counterclockwise N×2 arrays.
+
+    """
+
+    arrays = [_to_array(polygon) for polygon in polygons]
+    if not arrays:
+        return []
+    lengths = np.array([array.shape[0] for array in arrays])
+    points = np.concatenate(arrays)
+    # an empty polygon has no vertex to sum, it gives an empty result
+    starts = (np.cumsum(lengths) - lengths)[lengths > 0]
+    signed_areas = np.zeros(len(arrays))
+    if starts.size:
+        next_points = np.roll(points, -1, axis=0)
+        next_points[np.cumsum(lengths)[lengths > 0] - 1] = points[starts]
+        signed_areas[lengths > 0] = np.add.reduceat(_cross(points, next_points), starts)
+    arrays = [array if area >= 0 else array[::-1] for array, area in zip(arrays, signed_areas)]
+
+    # outward is on the right of a counterclockwise ring
+    return offset_polylines(arrays, -np.asarray(distance), join, miter_limit, tolerance,
+                            closed=True, remove_loops=remove_loops)
+
+####################################################################################################
+
+def _unit_tangents(points, derivatives):
+
+    """Return the unit tangents of a M×K×2 array of samples, a null derivative, e.g. at a cusp, is
+    replaced by the chord of the neighbour samples.
+
+    """
+
+    norms = np.hypot(derivatives[...,0], derivatives[...,1])
+    is_null = norms <= 1e-12 * max(np.max(norms, initial=0), 1e-300)
+    if np.any(is_null):
+        chords = np.empty_like(points)
+        chords[:,1:-1] = points[:,2:] - points[:,:-2]
+        chords[:,0] = points[:,1] - points[:,0]
+        chords[:,-1] = points[:,-1] - points[:,-2]
+        derivatives = np.where(is_null[...,np.newaxis], chords, derivatives)
+        norms = np.hypot(derivatives[...,0], derivatives[...,1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return derivatives / norms[...,np.newaxis]
+
+####################################################################################################
+
+def _bernstein(u):
+    v = 1 - u
+    return np.stack((v**3, 3*v**2*u, 3*v*u**2, u**3), axis=-1)
+
+def _chord_parameters(targets):
+
+    """Return the chord length parameters of a M×K×2 array of points"""
+
+    chords = np.hypot(*np.diff(targets, axis=1).transpose(2, 0, 1))
+    u = np.concatenate((np.zeros((targets.shape[0], 1)), np.cumsum(chords, axis=1)), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(u[:,-1:] > 0, u / u[:,-1:], np.linspace(0, 1, targets.shape[1]))
+
+def _fit_cubic(targets, tangents):
+
+    """Fit cubic Bézier curves to a M×K×2 array of target points.
+
+    The end points are the first and last targets and the end tangents are given.  The inner control
+    points are placed on the end tangents by a least squares fit, the targets being parametrised by
+    chord length.  Return the M×4×2 control points.
+
+    """
+
+    start = targets[:,0]
+    stop = targets[:,-1]
+    tangent0 = tangents[:,0]
+    tangent1 = tangents[:,-1]
+    u = _chord_parameters(targets)
+
+    # least squares on the lengths of the handles: targets - ends ≈ a b1 tangent0 - b b2 tangent1
+    basis = _bernstein(u)
+    residuals = (targets -
+                 (basis[...,0] + basis[...,1])[...,np.newaxis] * start[:,np.newaxis] -
+                 (basis[...,2] + basis[...,3])[...,np.newaxis] * stop[:,np.newaxis])
+    x = basis[...,1,np.newaxis] * tangent0[:,np.newaxis]
+    y = -basis[...,2,np.newaxis] * tangent1[:,np.newaxis]
+    xx = np.sum(x*x, axis=(1, 2))
+    xy = np.sum(x*y, axis=(1, 2))
+    yy = np.sum(y*y, axis=(1, 2))
+    xr = np.sum(x*residuals, axis=(1, 2))
+    yr = np.sum(y*residuals, axis=(1, 2))
+    determinant = xx*yy - xy**2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = (xr*yy - yr*xy) / determinant
+        b = (yr*xx - xr*xy) / determinant
+    # parallel tangents or reversed handles
+    default = np.hypot(*(stop - start).T) / 3
+    is_degenerated = ~(np.abs(determinant) > 1e-12 * xx * yy) | ~(a > 0) | ~(b > 0)
+    a = np.where(is_degenerated, default, a)
+    b = np.where(is_degenerated, default, b)
+
+    return np.stack((start, start + tangent0 * a[:,np.newaxis],
+                     stop - tangent1 * b[:,np.newaxis], stop), axis=1)
+
+def _fit_errors(control_points, targets):
+
+    """Return the maximum distance of a M×K×2 array of target points to the cubic Bézier curves.  The
+    targets are parametrised by chord length, then their parameters are corrected by a Newton step,
+    thus the distance is an upper bound.
+
+    """
+
+    u = _chord_parameters(targets)
+    basis = _bernstein(u)
+    derivative_basis = np.stack((-3*(1 - u)**2, 3*(1 - u)*(1 - 3*u), 3*u*(2 - 3*u), 3*u**2), axis=-1)
+    points = np.einsum('mkj,mjd->mkd', basis, control_points)
+    derivatives = np.einsum('mkj,mjd->mkd', derivative_basis, control_points)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        step = np.sum((targets - points) * derivatives, axis=2) / np.sum(derivatives**2, axis=2)
+    u = np.clip(u + np.nan_to_num(step), 0, 1)
+    points = np.einsum('mkj,mjd->mkd', _bernstein(u), control_points)
+    return np.max(np.hypot(*(targets - points).transpose(2, 0, 1)), axis=1)
+
+####################################################################################################
+
+def _offset_speeds(function, derivative, t, h, distance):
+
+    """Return the projection of the derivative of the offset on the tangent of the curve for an array
+    of parameters, it is proportional to 1 - curvature × distance.  The derivative is a central
+    difference of step *h*.
+
+    """
+
+    def offset_points(t):
+        tangents = _unit_tangents(function(t)[np.newaxis], derivative(t)[np.newaxis])[0]
+        return function(t) + np.stack((-tangents[:,1], tangents[:,0]), axis=1) * distance
+
+    tangents = _unit_tangents(function(t)[np.newaxis], derivative(t)[np.newaxis])[0]
+    return _dot(offset_points(t + h) - offset_points(t - h), tangents)
+
+def _cusp_parameters(function, derivative, t, distance):
+
+    """Return the parameters where the offset of a curve has a cusp, i.e. where the radius of
+    curvature is equal to the distance on the side of the offset.  The sign changes of the offset
+    speed are found on samples of the intervals of *t*, then they are refined by bisection.
+
+    """
+
+    t0 = t[:-1]
+    t1 = t[1:]
+    samples = np.linspace(0, 1, NUMBER_OF_CUSP_SAMPLES + 1)
+    sample_t = t0[:,np.newaxis] + (t1 - t0)[:,np.newaxis] * samples
+    h = np.repeat((t1 - t0) * 1e-6, samples.size)
+    # the end points of the intervals are not evaluated outside the curve
+    sample_t[:,0] += (t1 - t0) * 1e-6
+    sample_t[:,-1] -= (t1 - t0) * 1e-6
+    speeds = _offset_speeds(function, derivative, sample_t.ravel(), h, distance).reshape(sample_t.shape)
+    interval, k = np.nonzero(speeds[:,:-1] * speeds[:,1:] < 0)
+    lower = sample_t[interval, k]
+    upper = sample_t[interval, k + 1]
+    lower_speeds = speeds[interval, k]
+    h = h[interval]
+    for i in range(MAXIMUM_DEPTH * 3):
+        middle = (lower + upper) / 2
+        middle_speeds = _offset_speeds(function, derivative, middle, h, distance)
+        is_lower = middle_speeds * lower_speeds > 0
+        lower = np.where(is_lower, middle, lower)
+        lower_speeds = np.where(is_lower, middle_speeds, lower_speeds)
+        upper = np.where(is_lower, upper, middle)
+    return (lower + upper) / 2
+
+####################################################################################################
+
+def offset_parametric(function, derivative, t, distance, tolerance):
+
+    """Approximate the offset of a parametric curve by cubic Bézier curves, return a M×4×2 array of
+    control points.
+
+    *function* and *derivative* evaluate the curve and its derivative for an array of parameters and
+    return a N×2 array.  *t* is the array of initial parameters, which must include the parameters
+    of the discontinuities.  A positive *distance* is on the left of the curve.
+
+    The offset has a cusp where the radius of curvature is equal to the distance, and it runs
+    backward where the radius is smaller.  These parameters are found first and added to *t*, thus
+    each interval is smooth.
+
+    Each interval is approximated by a cubic whose end points and end tangents are the ones of the
+    true offset, and whose handles are fitted to samples of the true offset.  The interval is split
+    at its middle until the distance to the cubic of the samples and of the points of the true
+    offset at their middle parameters is lower than *tolerance*.  The intervals of a subdivision
+    level are processed at once.
+
+    """
+
+    t = np.asarray(t, dtype=np.float64)
+    t = np.union1d(t, _cusp_parameters(function, derivative, t, distance))
+    t0 = t[:-1]
+    t1 = t[1:]
+    # the fit samples are the even ones
+    samples = np.linspace(0, 1, 2*NUMBER_OF_SAMPLES - 1)
+
+    curves = []
+    curve_t = []
+    for depth in range(MAXIMUM_DEPTH + 1):
+        sample_t = t0[:,np.newaxis] + (t1 - t0)[:,np.newaxis] * samples
+        shape = sample_t.shape + (2,)
+        points = function(sample_t.ravel()).reshape(shape)
+        tangents = _unit_tangents(points, derivative(sample_t.ravel()).reshape(shape))
+        normals = np.stack((-tangents[...,1], tangents[...,0]), axis=-1)
+        targets = points + normals * distance
+        # the offset runs backward inside the cusps
+        is_backward = np.sum(_dot(np.diff(targets, axis=1), tangents[:,:-1] + tangents[:,1:]), axis=1) < 0
+        tangents[is_backward] *= -1
+        control_points = _fit_cubic(targets[:,::2], tangents[:,::2])
+        errors = _fit_errors(control_points, targets)
+        if depth < MAXIMUM_DEPTH:
+            is_fitted = errors <= tolerance
+        else:
+            is_fitted = np.ones(t0.shape, dtype=np.bool_)
+        curves.append(control_points[is_fitted])
+        curve_t.append(t0[is_fitted])
+        if np.all(is_fitted):
+            break
+        t0 = t0[~is_fitted]
+        t1 = t1[~is_fitted]
+        middle = (t0 + t1) / 2
+        t0, t1 = np.concatenate((t0, middle)), np.concatenate((middle, t1))
+
+    order = np.argsort(np.concatenate(curve_t), kind='stable')
+    return np.concatenate(curves)[order]
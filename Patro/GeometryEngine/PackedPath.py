@@ -0,0 +1,407 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""Module to implement a packed representation of paths.
+
+A :class:`Path2D` stores a list of part objects, which is convenient to build and edit a path but
+expensive in memory and slow to transform for large paths, e.g. imported from a SVG file.  A
+:class:`PackedPath2D` stores one or several paths as Numpy arrays, like the *Path* class of
+Matplotlib:
+
+* a uint8 array of commands: ``MOVE_TO``, ``LINE_TO``, ``QUADRATIC_TO``, ``CUBIC_TO``, ``ARC_TO`` and
+  ``CLOSE``, a ``MOVE_TO`` starts a path,
+* a N×2 array of the absolute coordinates of the points of the commands, one point for a move, a line,
+  an arc and a close, two points for a quadratic Bézier curve and three for a cubic one,
+* an array of the bulge radii of the linear segments at their start point, NaN for none, a radius on
+  the first segment of a closed path is the bulge at the closure,
+* a M×5 array of the parameters of the SVG arcs: radius x, radius y, angle, large arc and sweep flags.
+
+The conversion to and from :class:`Path2D` keeps the geometry, the relative and directional
+segments are converted to absolute ones.
+
+Example of usage::
+
+  packed_path = PackedPath2D.from_paths(paths)
+  packed_path.apply_transformation(transformation)
+  paths = packed_path.to_paths()
+
+"""
+
+####################################################################################################
+
+__all__ = [
+    'PackedPath2D',
+]
+
+####################################################################################################
+
+import math
+
+import numpy as np
+
+from IntervalArithmetic import Interval2D
+
+from .Bezier import _bezier_extrema
+from .Conic import Ellipse2D
+from .Path import (
+    Path2D,
+    ArcSegment, CubicBezierSegment, QuadraticBezierSegment,
+    AbsoluteHorizontalSegment, AbsoluteVerticalSegment, DirectionalSegment, LinearSegment,
+)
+from .Vector import Vector2D
+
+####################################################################################################
+
+MOVE_TO = 0
+LINE_TO = 1
+QUADRATIC_TO = 2
+CUBIC_TO = 3
+ARC_TO = 4
+CLOSE = 5
+
+# number of points per command
+NUMBER_OF_POINTS = np.array((1, 1, 2, 3, 1, 1))
+
+####################################################################################################
+
+class PackedPath2D:
+
+    """Class to store paths as arrays of commands and coordinates."""
+
+    ##############################################
+
+    def __init__(self, commands, coordinates, radii=None, arcs=None):
+
+        self._commands = np.array(commands, dtype=np.uint8)
+        self._coordinates = np.array(coordinates, dtype=np.float64).reshape(-1, 2)
+        if radii is None:
+            radii = np.full(self._commands.shape, np.nan)
+        self._radii = np.array(radii, dtype=np.float64)
+        if arcs is None:
+            arcs = np.zeros((0, 5))
+        self._arcs = np.array(arcs, dtype=np.float64).reshape(-1, 5)
+
+        if self._commands.size and self._commands[0] != MOVE_TO:
+            raise ValueError('A path must start by a move')
+        if np.sum(NUMBER_OF_POINTS[self._commands]) != self._coordinates.shape[0]:
+            raise ValueError('Inconsistent number of coordinates')
+        if self._radii.shape != self._commands.shape:
+            raise ValueError('Inconsistent number of radii')
+        if np.count_nonzero(self._commands == ARC_TO) != self._arcs.shape[0]:
+            raise ValueError('Inconsistent number of arcs')
+
+    ##############################################
+
+    def clone(self):
+        return self.__class__(self._commands, self._coordinates, self._radii, self._arcs)
+
+    ##############################################
+
+    def __repr__(self):
+        return '{0}({1} commands, {2} points)'.format(self.__class__.__name__, len(self), self._coordinates.shape[0])
+
+    ##############################################
+
+    def __len__(self):
+        return self._commands.shape[0]
+
+    ##############################################
+
+    @property
+    def commands(self):
+        return self._commands
+
+    @property
+    def coordinates(self):
+        return self._coordinates
+
+    @property
+    def radii(self):
+        return self._radii
+
+    @property
+    def arcs(self):
+        return self._arcs
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self._commands, self._coordinates, self._radii, self._arcs))
+
+    ##############################################
+
+    @property
+    def number_of_paths(self):
+        return int(np.count_nonzero(self._commands == MOVE_TO))
+
+    ##############################################
+
+    def _command_slices(self):
+
+        """Return the arrays of the first command, coordinate and arc of each path"""
+
+        commands = self._commands
+        starts = np.nonzero(commands == MOVE_TO)[0]
+        coordinate_starts = np.concatenate(((0,), np.cumsum(NUMBER_OF_POINTS[commands])))[starts]
+        arc_starts = np.concatenate(((0,), np.cumsum(commands == ARC_TO)))[starts]
+        return starts, coordinate_starts, arc_starts
+
+    ##############################################
+
+    @classmethod
+    def from_paths(cls, paths):
+
+        """Pack a :class:`Path2D` or a list of them"""
+
+        if isinstance(paths, Path2D):
+            paths = (paths,)
+
+        commands = []
+        coordinates = []
+        radii = []
+        arcs = []
+        for path in paths:
+            x, y = path.p0
+            commands.append(MOVE_TO)
+            coordinates.append((x, y))
+            radii.append(math.nan)
+            number_of_parts = len(path)
+            for i, part in enumerate(path):
+                # track the current point, since the start point of a part is computed recursively
+                if isinstance(part, LinearSegment):
+                    if isinstance(part, DirectionalSegment):
+                        dx, dy = part.offset
+                        x, y = x + dx, y + dy
+                    elif isinstance(part, AbsoluteHorizontalSegment):
+                        x = part.x
+                    elif isinstance(part, AbsoluteVerticalSegment):
+                        y = part.y
+                    else:
+                        dx, dy = part._point
+                        if not part._absolute:
+                            dx, dy = x + dx, y + dy
+                        x, y = dx, dy
+                    if path.is_closed and i == number_of_parts -1:
+                        commands.append(CLOSE)
+                    else:
+                        commands.append(LINE_TO)
+                    coordinates.append((x, y))
+                    radius = part.radius
+                    radii.append(math.nan if radius is None else radius)
+                else:
+                    if isinstance(part, QuadraticBezierSegment):
+                        commands.append(QUADRATIC_TO)
+                        points = (part._point1, part._point2)
+                    elif isinstance(part, CubicBezierSegment):
+                        commands.append(CUBIC_TO)
+                        points = (part._point1, part._point2, part._point3)
+                    elif isinstance(part, ArcSegment):
+                        commands.append(ARC_TO)
+                        points = (part._point,)
+                        arcs.append((part._radius_x, part._radius_y, part._angle, part._large_arc, part._sweep))
+                    else:
+                        raise NotImplementedError('{} cannot be packed'.format(part.__class__.__name__))
+                    points = [tuple(point) for point in points]
+                    if not part._absolute:
+                        points = [(x + px, y + py) for px, py in points]
+                    coordinates.extend(points)
+                    x, y = points[-1]
+                    radii.append(math.nan)
+
+        return cls(commands, coordinates, radii, arcs)
+
+    ##############################################
+
+    def to_paths(self):
+
+        """Return the list of :class:`Path2D`"""
+
+        paths = []
+        points = [Vector2D(xy) for xy in self._coordinates]
+        radii = [None if math.isnan(radius) else radius for radius in self._radii.tolist()]
+        arcs = iter(self._arcs.tolist())
+        i = 0
+        path = None
+        for command, radius in zip(self._commands.tolist(), radii):
+            if command == MOVE_TO:
+                path = Path2D(points[i])
+                paths.append(path)
+                first_radius = None
+            elif command == LINE_TO:
+                if not len(path) and radius is not None:
+                    # bulge at the closure
+                    first_radius, radius = radius, None
+                path.line_to(points[i], radius, absolute=True)
+            elif command == QUADRATIC_TO:
+                path.quadratic_to(*points[i:i+2], absolute=True)
+            elif command == CUBIC_TO:
+                path.cubic_to(*points[i:i+3], absolute=True)
+            elif command == ARC_TO:
+                radius_x, radius_y, angle, large_arc, sweep = next(arcs)
+                path.arc_to(points[i], radius_x, radius_y, angle, bool(large_arc), bool(sweep), absolute=True)
+            elif command == CLOSE:
+                path.close(radius, first_radius)
+            i += NUMBER_OF_POINTS[command]
+
+        return paths
+
+    ##############################################
+
+    def apply_transformation(self, transformation):
+
+        """Apply a transformation to the coordinates, the bulge radii and the arcs.
+
+        An arc is mapped to the ellipse whose axes are given by the singular value decomposition of
+        the transformed ellipse matrix, its sweep flag is inverted if the transformation is a
+        reflection.
+
+        """
+
+        self._coordinates = transformation.apply_to_array(self._coordinates)
+
+        has_radius = ~np.isnan(self._radii)
+        if np.any(has_radius):
+            self._radii[has_radius] = self._radii[has_radius] * (transformation * 1.)
+
+        if self._arcs.shape[0]:
+            matrix = transformation.matrix_part[:2,:2]
+            radius_x, radius_y, angle, large_arc, sweep = self._arcs.T
+            angle = np.radians(angle)
+            cos, sin = np.cos(angle), np.sin(angle)
+            # columns are the axes of the ellipse
+            axes = np.empty((angle.shape[0], 2, 2))
+            axes[:,0,0] = cos * radius_x
+            axes[:,1,0] = sin * radius_x
+            axes[:,0,1] = -sin * radius_y
+            axes[:,1,1] = cos * radius_y
+            u, s, _ = np.linalg.svd(np.matmul(matrix, axes))
+            self._arcs[:,0] = s[:,0]
+            self._arcs[:,1] = s[:,1]
+            self._arcs[:,2] = np.degrees(np.arctan2(u[:,1,0], u[:,0,0]))
+            if np.linalg.det(matrix) < 0:
+                self._arcs[:,4] = 1 - sweep
+
+    ##############################################
+
+    def transform(self, transformation, clone=False):
+        obj = self.clone() if clone else self
+        if not transformation.is_identity:
+            obj.apply_transformation(transformation)
+        return obj
+
+    ##############################################
+
+    @property
+    def bounding_box(self):
+
+        """Bounding box of the paths, the Bézier curves are bounded by their extrema and the bulges
+        by their vertex.
+
+        """
+
+        if not self._coordinates.size:
+            return None
+
+        points = self._coordinates
+        commands = self._commands
+        stop = np.cumsum(NUMBER_OF_POINTS[commands]) - 1
+
+        # replace the control points of the Bézier curves by their extrema
+        is_control_point = np.zeros(points.shape[0], dtype=np.bool_)
+        arrays = []
+        for command in (QUADRATIC_TO, CUBIC_TO):
+            command_index = np.nonzero(commands == command)[0]
+            if command_index.size:
+                # start point is the last point of the previous command
+                offsets = np.arange(-NUMBER_OF_POINTS[command], 1)
+                point_index = stop[command_index,np.newaxis] + offsets
+                is_control_point[point_index[:,1:-1]] = True
+                arrays.extend(_bezier_extrema(points[point_index]))
+        array = np.concatenate([points[~is_control_point]] + arrays)
+        x_min, y_min = array.min(axis=0)
+        x_max, y_max = array.max(axis=0)
+        bounding_box = Interval2D((x_min, x_max), (y_min, y_max))
+
+        if self._arcs.shape[0]:
+            # start point is the last point of the previous command
+            arc_index = np.nonzero(commands == ARC_TO)[0]
+            for i, (radius_x, radius_y, angle, large_arc, sweep) in zip(arc_index, self._arcs.tolist()):
+                geometry = Ellipse2D.svg_arc(
+                    Vector2D(points[stop[i-1]]), Vector2D(points[stop[i]]),
+                    radius_x, radius_y, angle, bool(large_arc), bool(sweep),
+                )
+                bounding_box |= geometry.bounding_box
+
+        return bounding_box
+
+    ##############################################
+
+    def reversed(self):
+
+        """Return the packed path where each path is reversed.
+
+        The points of a path are simply reversed, the sweep flags of the arcs are inverted and the
+        bulge radii are moved to the other end of the segments.  The closing segment of a closed path
+        becomes its first segment.
+
+        """
+
+        commands = []
+        coordinates = []
+        radii = []
+        arcs = []
+        starts, coordinate_starts, arc_starts = self._command_slices()
+        stops = np.append(starts[1:], len(self))
+        coordinate_stops = np.append(coordinate_starts[1:], self._coordinates.shape[0])
+        arc_stops = np.append(arc_starts[1:], self._arcs.shape[0])
+        for start, stop, coordinate_start, coordinate_stop, arc_start, arc_stop in zip(
+                starts, stops, coordinate_starts, coordinate_stops, arc_starts, arc_stops):
+
+            path_commands = self._commands[start+1:stop][::-1].copy()
+            path_coordinates = self._coordinates[coordinate_start:coordinate_stop][::-1]
+            path_radii = self._radii[start+1:stop]
+            is_closed = path_commands.size and path_commands[0] == CLOSE
+            # the radius of a segment is moved to the previous one
+            path_radii = np.concatenate(((math.nan,), path_radii[:0:-1]))
+            if is_closed:
+                path_commands[0] = LINE_TO
+                path_radii[0] = self._radii[start+1]
+                if path_commands[-1] == LINE_TO:
+                    path_commands[-1] = CLOSE
+                else:
+                    path_commands = np.append(path_commands, CLOSE)
+                    path_coordinates = np.concatenate((path_coordinates, path_coordinates[:1]))
+                    path_radii = np.append(path_radii, math.nan)
+
+            path_arcs = self._arcs[arc_start:arc_stop][::-1].copy()
+            path_arcs[:,4] = 1 - path_arcs[:,4]
+
+            commands.extend(((MOVE_TO,), path_commands))
+            coordinates.append(path_coordinates)
+            radii.extend(((math.nan,), path_radii))
+            arcs.append(path_arcs)
+
+        if not commands:
+            return self.clone()
+        return self.__class__(
+            np.concatenate(commands),
+            np.concatenate(coordinates),
+            np.concatenate(radii),
+            np.concatenate(arcs),
+        )
@@ -38,10 +38,14 @@ __all__ = [
 import logging
 import math
 
+import numpy as np
+
 from Patro.Common.Math.Functions import sign
 from .Primitive import Primitive1P, Primitive2DMixin
 from .Bezier import QuadraticBezier2D, CubicBezier2D
 from .Conic import AngularDomain, Circle2D, Ellipse2D
+from .Flattening import FlatteningMixin, flatten_bezier
+from .PointArray import Point2DArray
 from .Segment import Segment2D
 from .Vector import Vector2D
 
@@ -67,6 +71,12 @@ class PathPart:
 
     ##############################################
 
+    def _invalidate(self):
+        """Invalidate the derived properties of the path when the part is edited"""
+        self._path._invalidate_cache(self)
+
+    ##############################################
+
     def clone(self, path):
         raise NotImplementedError
 
@@ -137,10 +147,19 @@ class PathPart:
     def bounding_box(self):
         return self.geometry.bounding_box
 
+    ##############################################
+
+    def _transform_parameters(self, transformation):
+        """Transform the parameters which are not points, e.g. a radius."""
+        pass
+
 ####################################################################################################
 
 class OnePointMixin:
 
+    # attributes which are transformed by Path2D.apply_transformation
+    __point_attributes__ = ('_point',)
+
     ##############################################
 
     @property
@@ -150,6 +169,7 @@ class OnePointMixin:
     @point.setter
     def point(self, value):
         self._point = Vector2D(value) # self._path.__vector_cls__
+        self._invalidate()
 
     ##############################################
 
@@ -167,6 +187,8 @@ class OnePointMixin:
 
 class TwoPointMixin:
 
+    __point_attributes__ = ('_point1', '_point2')
+
     ##############################################
 
     @property
@@ -176,6 +198,7 @@ class TwoPointMixin:
     @point1.setter
     def point1(self, value):
         self._point1 = Vector2D(value) # self._path.__vector_cls__
+        self._invalidate()
 
     ##############################################
 
@@ -186,6 +209,7 @@ class TwoPointMixin:
     @point2.setter
     def point2(self, value):
         self._point2 = Vector2D(value)
+        self._invalidate()
 
     ##############################################
 
@@ -198,6 +222,8 @@ class TwoPointMixin:
 
 class ThreePointMixin(TwoPointMixin):
 
+    __point_attributes__ = ('_point1', '_point2', '_point3')
+
     ##############################################
 
     @property
@@ -207,6 +233,7 @@ class ThreePointMixin(TwoPointMixin):
     @point3.setter
     def point3(self, value):
         self._point3 = Vector2D(value) # self._path.__vector_cls__
+        self._invalidate()
 
     ##############################################
 
@@ -251,6 +278,9 @@ class LinearSegment(PathPart):
 
     def _reset_cache(self):
 
+        self._bissector = None
+        self._direction = None
+
         self._bulge_angle = None
         self._bulge_center = None
         self._start_bulge_point = None
@@ -312,6 +342,7 @@ class LinearSegment(PathPart):
             if value == 0:
                 radius = None
         self._radius = value
+        self._invalidate()
 
     ##############################################
 
@@ -392,6 +423,9 @@ class LinearSegment(PathPart):
                                    for point in (self.bulge_start_point, self.bulge_stop_point)]
         if self.bulge_angle < 0:
             start_angle, stop_angle = stop_angle, start_angle
+        # the arc is counterclockwise
+        if stop_angle < start_angle:
+            stop_angle += 360
         arc.domain = AngularDomain(start_angle, stop_angle)
         # self._dump_bulge(arc)
         return arc
@@ -440,6 +474,12 @@ class PathSegment(OnePointMixin, LinearSegment):
 
     def apply_transformation(self, transformation):
         OnePointMixin.apply_transformation(self, transformation)
+        self._transform_parameters(transformation)
+
+    ##############################################
+
+    def _transform_parameters(self, transformation):
+        self._reset_cache()
         if self._radius is not None:
             self._radius = transformation * self._radius
 
@@ -522,6 +562,7 @@ class AbsoluteHorizontalSegment(AbsoluteHVSegment):
     @x.setter
     def x(self, value):
         self._x = float(value)
+        self._invalidate()
 
     ##############################################
 
@@ -560,6 +601,7 @@ class AbsoluteVerticalSegment(AbsoluteHVSegment):
     @y.setter
     def y(self, value):
         self._y = float(value)
+        self._invalidate()
 
     ##############################################
 
@@ -598,6 +640,7 @@ class DirectionalSegment(DirectionalSegmentMixin):
     @length.setter
     def length(self, value):
         self._length = float(value)
+        self._invalidate()
 
     ##############################################
 
@@ -868,9 +911,15 @@ class ArcSegment(OnePointMixin, PathPart):
 
 ####################################################################################################
 
-class Path2D(Primitive2DMixin, Primitive1P):
+class Path2D(FlatteningMixin, Primitive2DMixin, Primitive1P):
+
+    """Class to implements 2D Path.
 
-    """Class to implements 2D Path."""
+    The derived properties, i.e. the bounding box, the lengths and the flattened polyline, are
+    cached until the path is edited through its methods, the setters of its parts or a
+    transformation.
+
+    """
 
     _logger = _module_logger.getChild('Path2D')
 
@@ -878,11 +927,14 @@ class Path2D(Primitive2DMixin, Primitive1P):
 
     def __init__(self, start_point):
 
-        Primitive1P.__init__(self, start_point)
-
         self._parts = [] # Fixme: segment ???
         self._is_closed = False
 
+        self._cache = {}
+        self._version = 0
+
+        Primitive1P.__init__(self, start_point)
+
     ##############################################
 
     def clone(self):
@@ -922,6 +974,17 @@ class Path2D(Primitive2DMixin, Primitive1P):
 
     ##############################################
 
+    @property
+    def p0(self):
+        return self._p0
+
+    @p0.setter
+    def p0(self, value):
+        self._p0 = self.__vector_cls__(value)
+        self._invalidate_cache()
+
+    ##############################################
+
     @property
     def start_segment(self):
         # Fixme: start_part ???
@@ -943,53 +1006,465 @@ class Path2D(Primitive2DMixin, Primitive1P):
         if not self._is_closed:
             obj = part_cls(self, len(self._parts), *args, **kwargs)
             self._parts.append(obj)
+            self._invalidate_cache(obj)
             return obj
 
     ##############################################
 
-    def apply_transformation(self, transformation):
+    def _invalidate_cache(self, part=None):
 
-        # self._logger.info(str(self) + '\n' + str(transformation.type) + '\n' + str(transformation) )
+        """Invalidate the derived properties, *part* is the edited part, else all the parts are
+        concerned, e.g. the start point was moved.
 
-        for part in self._parts:
-            # print(part)
-            if isinstance(part, PathSegment):
+        Since the start point of a part is the stop point of the previous one, the bulge caches of
+        the linear segments are reset from the edited part up to the end of the path.
+
+        """
+
+        self._cache = {}
+        self._version += 1
+
+        if part is None:
+            index = 0
+        elif self[part.index] is part:
+            index = part.index
+        else:
+            # the part is under construction
+            return
+
+        for part in self._parts[index:]:
+            if isinstance(part, LinearSegment):
                 part._reset_cache()
+        # the closing bulge depends on the stop segment
+        if index and self._is_closed and isinstance(self._parts[0], LinearSegment):
+            self._parts[0]._reset_cache()
+
+    ##############################################
+
+    def _cached(self, name, function):
+        """Return the derived property *name*, it is computed by *function* if the cache is invalid"""
+        try:
+            return self._cache[name]
+        except KeyError:
+            value = function()
+            self._cache[name] = value
+            return value
+
+    ##############################################
+
+    def _to_absolute_parts(self):
+
+        for part in self._parts:
             if isinstance(part, DirectionalSegmentMixin):
                 # Since a rotation will change the direction
                 # DirectionalSegment must be casted to PathSegment
                 part = part.to_path_segment()
                 self._parts[part.index] = part
             if part._absolute is False:
-                # print('incremental', part, part.points)
                 part.to_absolute()
-                # print('->', part.points)
 
-        # print()
-        self._p0 = transformation * self._p0
-        # print('p0', self._p0)
+    ##############################################
+
+    def _array_to_transform(self):
+
+        # Relative points cannot be transformed
+        self._to_absolute_parts()
+
+        points = [self._p0]
         for part in self._parts:
-            # print(part)
-            part.apply_transformation(transformation)
-            # print('->', part.points)
+            points.extend([getattr(part, name) for name in part.__point_attributes__])
+        return Point2DArray(points).array
+
+    ##############################################
+
+    def _set_transformed_array(self, array, transformation):
+
+        self._p0 = self.__vector_cls__(array[0])
+        i = 1
+        for part in self._parts:
+            for name in part.__point_attributes__:
+                setattr(part, name, self.__vector_cls__(array[i]))
+                i += 1
+            part._transform_parameters(transformation)
+        self._invalidate_cache()
+
+    ##############################################
+
+    @property
+    def _geometries(self):
+        # the arc length tables of the Bézier curves are cached by their geometry
+        return self._cached('geometries', lambda: [part.geometry for part in self._parts])
+
+    ##############################################
+
+    def _closing_bulge_segment(self):
+        """Return the start segment if the path has a bulge at the closure, else None"""
+        start_segment = self._parts[0] if self._parts else None
+        if isinstance(start_segment, LinearSegment) and start_segment._start_bulge:
+            return start_segment
+        else:
+            return None
 
     ##############################################
 
     @property
     def bounding_box(self):
+        bounding_box = self._cached('bounding_box', self._bounding_box)
+        if bounding_box is not None:
+            # the caller can enlarge it in place
+            bounding_box = bounding_box.copy()
+        return bounding_box
 
-        # Fixme: cache
+    def _bounding_box(self):
         bounding_box = None
-        for item in self._parts:
-            interval = item.geometry.bounding_box
-            if bounding_box is None:
-                bounding_box = interval
-            else:
-                bounding_box |= interval
+        for part, geometry in zip(self._parts, self._geometries):
+            intervals = [geometry.bounding_box]
+            if isinstance(part, LinearSegment) and part.radius is not None:
+                intervals.append(part.bulge_geometry.bounding_box)
+            for interval in intervals:
+                if bounding_box is None:
+                    bounding_box = interval
+                else:
+                    bounding_box |= interval
         return bounding_box
 
     ##############################################
 
+    @property
+    def length(self):
+        """Return the length of the path"""
+        return float(self.cumulative_lengths[-1])
+
+    @property
+    def cumulative_lengths(self):
+        """Return a read-only array of the lengths of the path at the start of each part, followed by
+        the length of the path.
+
+        """
+        return self._cached('cumulative_lengths', self._cumulative_lengths)
+
+    def _cumulative_lengths(self):
+        lengths = np.zeros(len(self._parts) + 1)
+        np.cumsum([self._part_length(i) for i in range(len(self._parts))], out=lengths[1:])
+        closing_segment = self._closing_bulge_segment()
+        if closing_segment is not None:
+            # the path stops at the end of the closing bulge
+            lengths[-1] += self._bulge_length(closing_segment)
+        lengths.setflags(write=False)
+        return lengths
+
+    ##############################################
+
+    @staticmethod
+    def _bulge_length(segment):
+        return segment.radius * (math.pi - abs(segment.bulge_angle_rad))
+
+    @staticmethod
+    def _bulge_turn(segment):
+        """Return 1 if the bulge turns counterclockwise, else -1"""
+        return 1 if segment.prev_part.direction.cross(segment.direction) >= 0 else -1
+
+    ##############################################
+
+    def _part_length(self, index):
+
+        """Return the length of a part, the length of a linear segment includes its bulge except the
+        closing bulge.
+
+        """
+
+        part = self._parts[index]
+        if isinstance(part, LinearSegment):
+            start_point, stop_point = part.points
+            length = (stop_point - start_point).magnitude
+            if part.radius is not None and not part._start_bulge:
+                length += self._bulge_length(part)
+            return length
+        else:
+            return self._geometries[index].length
+
+    ##############################################
+
+    def _locate_lengths(self, lengths, precision=1e-6):
+
+        """Return the indexes of the parts and the lengths from their start for an array of
+        *lengths*.  The parts are found by a binary search in the cumulative lengths.
+
+        """
+
+        if not self._parts:
+            raise ValueError('Empty path')
+        cumulative_lengths = self.cumulative_lengths
+        if np.any(lengths < 0) or np.any(lengths - cumulative_lengths[-1] > precision):
+            raise ValueError('Out of length')
+        indexes = np.searchsorted(cumulative_lengths, lengths, side='right') - 1
+        indexes = np.clip(indexes, 0, len(self._parts) - 1)
+        part_lengths = np.diff(cumulative_lengths)
+        lengths = np.clip(lengths - cumulative_lengths[indexes], 0, part_lengths[indexes])
+        return indexes, lengths
+
+    ##############################################
+
+    @staticmethod
+    def _line_points_at_lengths(start_point, stop_point, lengths):
+        start_point = np.array(tuple(start_point))
+        vector = np.array(tuple(stop_point)) - start_point
+        length = np.hypot(*vector)
+        direction = vector / length if length else vector
+        points = start_point + lengths[:,np.newaxis] * direction
+        tangents = np.tile(direction, (lengths.shape[0], 1))
+        return points, tangents
+
+    ##############################################
+
+    def _bulge_points_at_lengths(self, segment, lengths):
+        center = np.array(tuple(segment.bulge_center))
+        radius = segment.radius
+        x, y = np.array(tuple(segment.bulge_start_point)) - center
+        turn = self._bulge_turn(segment)
+        angles = math.atan2(y, x) + turn * lengths / radius
+        cos, sin = np.cos(angles), np.sin(angles)
+        points = center + radius * np.stack((cos, sin), axis=1)
+        tangents = turn * np.stack((-sin, cos), axis=1)
+        return points, tangents
+
+    ##############################################
+
+    def _part_points_at_lengths(self, index, lengths):
+
+        """Return the points and the unit tangents of a part at an array of *lengths* from its start
+        as two N×2 arrays.
+
+        A linear segment is made of its bulge, the line and the closing bulge for the stop segment.
+
+        """
+
+        part = self._parts[index]
+        geometry = self._geometries[index]
+
+        if isinstance(part, LinearSegment):
+            points = np.empty((lengths.shape[0], 2))
+            tangents = np.empty(points.shape)
+            if part.radius is not None and not part._start_bulge:
+                bulge_length = self._bulge_length(part)
+                is_bulge = lengths < bulge_length
+                points[is_bulge], tangents[is_bulge] = self._bulge_points_at_lengths(
+                    part, lengths[is_bulge])
+                lengths = lengths - bulge_length
+            else:
+                is_bulge = np.zeros(lengths.shape, dtype=bool)
+            start_point, stop_point = part.points
+            line_length = (stop_point - start_point).magnitude
+            closing_segment = self._closing_bulge_segment()
+            if closing_segment is not None and index == len(self._parts) -1:
+                is_closing = ~is_bulge & (lengths > line_length)
+                points[is_closing], tangents[is_closing] = self._bulge_points_at_lengths(
+                    closing_segment, lengths[is_closing] - line_length)
+            else:
+                is_closing = np.zeros(lengths.shape, dtype=bool)
+            is_line = ~(is_bulge | is_closing)
+            points[is_line], tangents[is_line] = self._line_points_at_lengths(
+                start_point, stop_point, lengths[is_line])
+            return points, tangents
+
+        elif isinstance(geometry, Ellipse2D):
+            angles = geometry._angles_at_lengths(lengths)
+            points = geometry._points_at_angles(angles)
+            tangents = geometry._tangents_at_angles(angles)
+        elif isinstance(geometry, Segment2D):
+            return self._line_points_at_lengths(geometry.p0, geometry.p1, lengths)
+        else:
+            t = geometry.t_at_length(lengths)
+            points = geometry._points_at_t(t)
+            tangents = geometry._points_at_t(t, derivative=True)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tangents /= np.hypot(tangents[:,0], tangents[:,1])[:,np.newaxis]
+        return points, tangents
+
+    ##############################################
+
+    def _points_at_lengths(self, lengths):
+
+        """Return the points and the unit tangents at an array of *lengths* as two N×2 arrays"""
+
+        lengths = np.atleast_1d(np.asarray(lengths, dtype=np.float64))
+        indexes, lengths = self._locate_lengths(lengths)
+        points = np.empty((lengths.shape[0], 2))
+        tangents = np.empty(points.shape)
+        # evaluate the lengths part by part
+        order = np.argsort(indexes, kind='stable')
+        part_indexes, starts = np.unique(indexes[order], return_index=True)
+        for index, group in zip(part_indexes, np.split(order, starts[1:])):
+            points[group], tangents[group] = self._part_points_at_lengths(index, lengths[group])
+        return points, tangents
+
+    ##############################################
+
+    def point_at_length(self, length):
+
+        """Return the point at *length* from the start of the path.
+
+        *length* can be a scalar or an array, then a N×2 array is returned.
+
+        """
+
+        points = self._points_at_lengths(length)[0]
+        if np.ndim(length):
+            return points
+        else:
+            return self.__vector_cls__(points[0])
+
+    ##############################################
+
+    def tangent_at_length(self, length):
+
+        """Return the unit tangent at *length* from the start of the path.
+
+        *length* can be a scalar or an array, then a N×2 array is returned.
+
+        """
+
+        tangents = self._points_at_lengths(length)[1]
+        if np.ndim(length):
+            return tangents
+        else:
+            return self.__vector_cls__(tangents[0])
+
+    ##############################################
+
+    def split_at_length(self, length):
+
+        """Split the path at *length* from its start, return a tuple of two paths.
+
+        If *length* is an array, the path is split at each length and the list of the paths is
+        returned.  The parts of the new paths are absolute and the bulges are converted to arcs.
+
+        """
+
+        lengths = np.sort(np.atleast_1d(np.asarray(length, dtype=np.float64)))
+        bounds = np.concatenate(((0,), lengths, (self.length,)))
+        paths = [self._sub_path(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+        if np.ndim(length):
+            return paths
+        else:
+            return tuple(paths)
+
+    ##############################################
+
+    def _sub_path(self, start, stop):
+
+        """Return the path from the length *start* to *stop*"""
+
+        indexes, lengths = self._locate_lengths(np.array((start, stop)))
+        (start_index, stop_index), (start_length, stop_length) = indexes, lengths
+        part_lengths = np.diff(self.cumulative_lengths)
+        path = self.__class__(self.point_at_length(start))
+        for index in range(start_index, stop_index + 1):
+            lower = start_length if index == start_index else 0
+            upper = stop_length if index == stop_index else part_lengths[index]
+            if upper > lower:
+                self._append_sub_part(path, index, lower, upper)
+        return path
+
+    ##############################################
+
+    def _append_sub_part(self, path, index, start, stop):
+
+        """Append to *path* the part *index* from the length *start* to *stop*"""
+
+        part = self._parts[index]
+        geometry = self._geometries[index]
+        Vector2D = self.__vector_cls__
+
+        def point_at(length):
+            return Vector2D(self._part_points_at_lengths(index, np.array((length,)))[0][0])
+
+        if isinstance(part, LinearSegment):
+            pieces = []
+            if part.radius is not None and not part._start_bulge:
+                pieces.append((part, self._bulge_length(part)))
+            start_point, stop_point = part.points
+            pieces.append((None, (stop_point - start_point).magnitude))
+            closing_segment = self._closing_bulge_segment()
+            if closing_segment is not None and index == len(self._parts) -1:
+                pieces.append((closing_segment, self._bulge_length(closing_segment)))
+            offset = 0
+            for segment, length in pieces:
+                lower, upper = max(start, offset), min(stop, offset + length)
+                if upper > lower:
+                    if segment is None:
+                        path.line_to(point_at(upper), absolute=True)
+                    else:
+                        radius = segment.radius
+                        sweep = self._bulge_turn(segment) > 0
+                        path.arc_to(point_at(upper), radius, radius, 0, False, sweep, absolute=True)
+                offset += length
+
+        elif isinstance(geometry, Ellipse2D):
+            angles = geometry._angles_at_lengths(np.array((start, stop)))
+            large_arc = abs(angles[1] - angles[0]) > 180
+            path.arc_to(point_at(stop), geometry.radius_x, geometry.radius_y, geometry.angle,
+                        large_arc, part._sweep, absolute=True)
+        elif isinstance(geometry, Segment2D):
+            path.line_to(point_at(stop), absolute=True)
+        else:
+            t1, t2 = geometry.t_at_length(np.array((start, stop)))
+            curve = geometry.split_at_two_t(t1, t2)
+            if isinstance(curve, QuadraticBezier2D):
+                path.quadratic_to(curve.p1, curve.p2, absolute=True)
+            else:
+                path.cubic_to(curve.p1, curve.p2, curve.p3, absolute=True)
+
+    ##############################################
+
+    def _flattening_key(self):
+        # the version is incremented each time the cache is invalidated
+        return self._version
+
+    ##############################################
+
+    def _flatten(self, tolerance):
+
+        def add_bulge(segment):
+            arc = segment.bulge_geometry._flatten(tolerance)
+            if segment.bulge_angle < 0:
+                arc = arc[::-1]
+            polylines.append(arc[1:])
+
+        start_segment = self._closing_bulge_segment()
+        has_closing_bulge = start_segment is not None
+        if has_closing_bulge:
+            start_point = start_segment.points[0]
+        else:
+            start_point = self._p0
+        polylines = [np.array((tuple(start_point),))]
+
+        for part in self._parts:
+            if isinstance(part, LinearSegment):
+                if part.radius is not None and not part._start_bulge:
+                    add_bulge(part)
+                polylines.append(np.array((tuple(part.points[1]),)))
+            elif isinstance(part, (QuadraticBezierSegment, CubicBezierSegment)):
+                control_points = np.array([tuple(point) for point in part.points])
+                polylines.append(flatten_bezier(control_points, tolerance)[1:])
+            elif isinstance(part, ArcSegment):
+                geometry = part.geometry
+                if isinstance(geometry, Ellipse2D):
+                    polylines.append(geometry._flatten(tolerance)[1:])
+                else:
+                    polylines.append(np.array((tuple(part.stop_point),)))
+            else:
+                # Fixme: stringed Bézier segments are not implemented
+                polylines.append(np.array((tuple(part.stop_point),)))
+
+        if has_closing_bulge:
+            add_bulge(start_segment)
+
+        return np.concatenate(polylines)
+
+    ##############################################
+
     def move_to(self, point):
         self.p0 = point
 
@@ -0,0 +1,403 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""Module to implement an array of 2D points.
+
+A :class:`Point2DArray` stores N points as a contiguous N×2 float64 Numpy array and implements a
+vectorised version of the :class:`Patro.GeometryEngine.Vector.Vector2D` API, so an operation on a
+point set is done by one Numpy call instead of one Python object per point.
+
+Example of usage::
+
+  points = Point2DArray(((0, 0), (10, 0), (10, 10)))
+  points = Point2DArray(Vector2D(0, 0), Vector2D(10, 0))
+  points = Point2DArray(numpy_array) # shape (N, 2)
+
+  points.x, points.y
+  points[0] # Vector2D
+  points[1:] # Point2DArray
+
+  points + Vector2D(10, 20)
+  points * 2
+
+  points.magnitude
+  points.orientation
+  points.rotate(90)
+  points.dot(Vector2D(1, 0))
+
+"""
+
+####################################################################################################
+
+__all__ = [
+    'Point2DArray',
+]
+
+####################################################################################################
+
+import numpy as np
+
+from IntervalArithmetic import Interval2D
+
+####################################################################################################
+
+class Point2DArray:
+
+    """Class to implement an array of 2D points stored as a N×2 float64 Numpy array."""
+
+    __vector_cls__ = None # Fixme: due to import, done in module's __init__.py
+
+    __data_type__ = np.float64
+
+    ##############################################
+
+    @classmethod
+    def _to_array(cls, points):
+
+        if isinstance(points, Point2DArray):
+            return points._array
+        elif isinstance(points, np.ndarray):
+            return points
+        else:
+            points = list(points)
+            if not points:
+                return np.zeros((0, 2), dtype=cls.__data_type__)
+            # Vector2D exposes its Numpy array
+            return np.array([getattr(point, 'v', point)[:2] for point in points],
+                            dtype=cls.__data_type__)
+
+    ##############################################
+
+    def __init__(self, *args):
+
+        """Construct a point array from a N×2 array, an iterable of points or several points."""
+
+        if len(args) == 1:
+            points = args[0]
+        else:
+            points = args
+
+        array = np.array(self._to_array(points), dtype=self.__data_type__) # copy
+        if array.ndim != 2 or array.shape[1] != 2:
+            raise ValueError('Point array must have a (N, 2) shape, got {}'.format(array.shape))
+
+        self._array = array
+
+    ##############################################
+
+    @classmethod
+    def _from_array(cls, array):
+        """Make an instance which holds *array* without copy."""
+        obj = cls.__new__(cls)
+        obj._array = array
+        return obj
+
+    ##############################################
+
+    def clone(self):
+        return self._from_array(self._array.copy())
+
+    ##############################################
+
+    @property
+    def array(self):
+        """N×2 Numpy array"""
+        return self._array
+
+    @property
+    def x(self):
+        return self._array[:,0]
+
+    @property
+    def y(self):
+        return self._array[:,1]
+
+    ##############################################
+
+    def __repr__(self):
+        return self.__class__.__name__ + str(self._array.tolist())
+
+    ##############################################
+
+    def __len__(self):
+        return self._array.shape[0]
+
+    ##############################################
+
+    def __iter__(self):
+        Vector2D = self.__vector_cls__
+        for xy in self._array:
+            yield Vector2D(xy)
+
+    ##############################################
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._from_array(self._array[index])
+        else:
+            return self.__vector_cls__(self._array[index])
+
+    ##############################################
+
+    def __setitem__(self, index, value):
+        self._array[index] = self._other_array(value)
+
+    ##############################################
+
+    def to_vectors(self):
+        """Return a list of vectors"""
+        return list(self)
+
+    ##############################################
+
+    def vector_views(self):
+
+        """Return a list of vectors which share their storage with the array.
+
+        An in-place operation on a vector, like ``v += w``, thus updates the array.
+
+        """
+
+        Vector2D = self.__vector_cls__
+        vectors = []
+        for xy in self._array:
+            vector = Vector2D.__new__(Vector2D)
+            vector._v = xy
+            vectors.append(vector)
+        return vectors
+
+    ##############################################
+
+    @staticmethod
+    def _other_array(other):
+        if isinstance(other, Point2DArray):
+            return other._array
+        elif hasattr(other, 'v'):
+            # Vector2D, broadcasted
+            return other.v[:2]
+        else:
+            return np.asarray(other)
+
+    ##############################################
+
+    def __eq__(self, other):
+        return np.array_equal(self._array, self._other_array(other))
+
+    def almost_equal(self, other, rtol=1e-05, atol=1e-08, equal_nan=False):
+        return np.allclose(self._array, self._other_array(other), rtol, atol, equal_nan)
+
+    ##############################################
+
+    def __add__(self, other):
+        return self._from_array(self._array + self._other_array(other))
+
+    def __iadd__(self, other):
+        self._array += self._other_array(other)
+        return self
+
+    def __sub__(self, other):
+        return self._from_array(self._array - self._other_array(other))
+
+    def __isub__(self, other):
+        self._array -= self._other_array(other)
+        return self
+
+    def __neg__(self):
+        return self._from_array(-self._array)
+
+    ##############################################
+
+    @staticmethod
+    def _scale_array(scale):
+        # A (N,) scale array applies per point
+        scale = np.asarray(scale)
+        if scale.ndim == 1:
+            return scale[:,np.newaxis]
+        return scale
+
+    def __mul__(self, scale):
+        return self._from_array(self._array * self._scale_array(scale))
+
+    __rmul__ = __mul__
+
+    def __imul__(self, scale):
+        self._array *= self._scale_array(scale)
+        return self
+
+    def __truediv__(self, scale):
+        return self._from_array(self._array / self._scale_array(scale))
+
+    def __itruediv__(self, scale):
+        self._array /= self._scale_array(scale)
+        return self
+
+    ##############################################
+
+    @property
+    def bounding_box(self):
+        if not len(self):
+            return None
+        x_min, y_min = self._array.min(axis=0)
+        x_max, y_max = self._array.max(axis=0)
+        return Interval2D((x_min, x_max), (y_min, y_max))
+
+    ##############################################
+
+    @property
+    def barycenter(self):
+        return self.__vector_cls__(self._array.mean(axis=0))
+
+    ##############################################
+
+    @property
+    def magnitude_square(self):
+        """Return the square of the magnitude of the vectors"""
+        return np.einsum('ij,ij->i', self._array, self._array)
+
+    ##############################################
+
+    @property
+    def magnitude(self):
+        """Return the magnitude of the vectors"""
+        return np.hypot(self._array[:,0], self._array[:,1])
+
+    ##############################################
+
+    @property
+    def orientation(self):
+        """Return the orientations in degree, in the range ]-180, 180], null vectors give NaN"""
+        x, y = self._array[:,0], self._array[:,1]
+        orientation = np.degrees(np.arctan2(y, x))
+        orientation[(x == 0) & (y == 0)] = np.nan
+        return orientation
+
+    ##############################################
+
+    def rotate(self, angle, counter_clockwise=True):
+
+        """Return a new array equal to self rotated of angle degree in the counter clockwise direction.
+
+        *angle* can be a scalar or an array of N angles.
+
+        """
+
+        radians = np.radians(angle)
+        if not counter_clockwise:
+            radians = -radians
+        c = np.cos(radians)
+        s = np.sin(radians)
+
+        x, y = self._array[:,0], self._array[:,1]
+        return self._from_array(np.column_stack((c*x - s*y, s*x + c*y)))
+
+    ##############################################
+
+    @property
+    def normal(self):
+        """Return a new array rotated of 90 degree in the counter clockwise direction"""
+        return self._from_array(np.column_stack((-self._array[:,1], self._array[:,0])))
+
+    @property
+    def anti_normal(self):
+        """Return a new array rotated of 90 degree in the clockwise direction"""
+        return self._from_array(np.column_stack((self._array[:,1], -self._array[:,0])))
+
+    @property
+    def permute(self):
+        """Return a new array where x and y are permuted"""
+        return self._from_array(self._array[:,::-1].copy())
+
+    @property
+    def parity(self):
+        """Return a new array rotated of 180 degree"""
+        return -self
+
+    ##############################################
+
+    def normalise(self):
+        """Normalise the vectors"""
+        self._array /= self.magnitude[:,np.newaxis]
+        return self
+
+    def to_normalised(self):
+        """Return normalised vectors"""
+        return self._from_array(self._array / self.magnitude[:,np.newaxis])
+
+    ##############################################
+
+    def dot(self, other):
+        """Return the dot products of self with other, a vector or an array"""
+        other = np.broadcast_to(self._other_array(other), self._array.shape)
+        return np.einsum('ij,ij->i', self._array, other)
+
+    ##############################################
+
+    def cross(self, other):
+        """Return the cross products of self with other, a vector or an array"""
+        other = self._other_array(other)
+        if other.ndim == 1:
+            return self._array[:,0] * other[1] - self._array[:,1] * other[0]
+        else:
+            return self._array[:,0] * other[:,1] - self._array[:,1] * other[:,0]
+
+    perp_dot = cross
+
+    ##############################################
+
+    def _direction_cross(self, direction):
+        # direction x self
+        return - self.cross(direction)
+
+    ##############################################
+
+    def cos_with(self, direction):
+        """Return the cosinus of self with direction"""
+        cos = self.dot(direction) / (direction.magnitude * self.magnitude)
+        return np.clip(cos, -1., 1.)
+
+    ##############################################
+
+    def sin_with(self, direction):
+        """Return the sinus of self with direction"""
+        # turn from direction to self
+        sin = self._direction_cross(direction) / (direction.magnitude * self.magnitude)
+        return np.clip(sin, -1., 1.)
+
+    ##############################################
+
+    def projection_on(self, direction):
+        """Return the projection of self on direction"""
+        return self.dot(direction) / direction.magnitude
+
+    ##############################################
+
+    def deviation_with(self, direction):
+        """Return the deviation of self with direction"""
+        return self._direction_cross(direction) / direction.magnitude
+
+    ##############################################
+
+    def angle_with(self, direction):
+        """Return the angles of self on direction in degree"""
+        angle = np.arccos(self.cos_with(direction))
+        angle_sign = np.copysign(1., self.sin_with(direction))
+        return angle_sign * np.degrees(angle)
+
+    orientation_with = angle_with
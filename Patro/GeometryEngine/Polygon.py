@@ -26,7 +26,7 @@ For resources on polygon see :ref:`this section <polygon-geometry-ressources-pag
 
 ####################################################################################################
 
-__all__ = ['Polygon2D']
+__all__ = ['Polygon2D', 'PreparedPolygon', 'polygon_properties']
 
 ####################################################################################################
 
@@ -34,15 +34,122 @@ import math
 
 import numpy as np
 
-from Patro.Common.Math.Functions import sign
+from IntervalArithmetic import Interval2D
+
 from .Conic import Circle2D
+from .PointArray import Point2DArray
 from .Primitive import PrimitiveNP, ClosedPrimitiveMixin, PathMixin, Primitive2DMixin
 from .Segment import Segment2D
+from .SweepLine import segment_intersections
 from .Triangle import Triangle2D
 from .Vector import Vector2D
 
 ####################################################################################################
 
+def _polygon_properties(vertices, offsets):
+
+    """Compute the properties of a set of polygons using the shoelace formulae.
+
+    *vertices* is a N×2 array of the concatenated vertices of the polygons and *offsets* the index of
+    the first vertex of each polygon followed by N.
+
+    """
+
+    starts = offsets[:-1]
+    number_of_points = np.diff(offsets)
+    # index of the next vertex, the last vertex of a polygon is followed by the first one
+    next_index = np.arange(1, vertices.shape[0] + 1)
+    next_index[offsets[1:] - 1] = starts
+
+    def sum_(values):
+        return np.add.reduceat(values, starts)
+
+    # the sums are computed relative to the mean of the vertices of each polygon, else the second
+    # moments of a polygon far from the origin lose their precision by cancellation
+    mean = sum_(vertices) / number_of_points[:,np.newaxis]
+    centred = vertices - np.repeat(mean, number_of_points, axis=0)
+
+    xi, yi = centred.transpose()
+    xi1, yi1 = centred[next_index].transpose()
+    cross = xi * yi1 - xi1 * yi
+
+    perimeter = sum_(np.hypot(xi1 - xi, yi1 - yi))
+
+    # the signed area is positive if the vertices are arranged in counterclockwise order
+    signed_area = sum_(cross) / 2
+    is_null = signed_area == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = np.where(is_null, 0, 1 / (6 * signed_area))
+    barycenter = np.stack((factor * sum_((xi + xi1) * cross), factor * sum_((yi + yi1) * cross)), axis=1)
+
+    # second moments relative to the mean, then to the barycenter
+    factor *= .5
+    Ixx = factor * sum_((yi**2 + yi*yi1 + yi1**2) * cross)
+    Iyy = factor * sum_((xi**2 + xi*xi1 + xi1**2) * cross)
+    Ixy = factor * sum_((xi*yi1 + 2*(xi*yi + xi1*yi1) + xi1*yi) * cross) / 2
+    cx, cy = barycenter.transpose()
+    Ixx -= cy**2
+    Iyy -= cx**2
+    Ixy -= cx*cy
+
+    # a null area polygon falls back to the mean and the covariance of its vertices
+    if np.any(is_null):
+        Ixx = np.where(is_null, sum_(centred[:,1]**2) / number_of_points, Ixx)
+        Iyy = np.where(is_null, sum_(centred[:,0]**2) / number_of_points, Iyy)
+        Ixy = np.where(is_null, sum_(centred[:,0]*centred[:,1]) / number_of_points, Ixy)
+
+    barycenter += mean
+
+    # eigenvalues of the covariance matrix [[Iyy, Ixy], [Ixy, Ixx]] of x and y
+    half_sum = (Iyy + Ixx) / 2
+    radius = np.hypot((Iyy - Ixx) / 2, Ixy)
+    lambda1 = half_sum + radius
+    lambda2 = half_sum - radius
+    major_axis = 4 * np.sqrt(np.abs(lambda1))
+    minor_axis = 4 * np.sqrt(np.abs(lambda2))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        axis_ratio = np.where(minor_axis != 0, major_axis / minor_axis, 0)
+
+    return {
+        'area': np.abs(signed_area),
+        'signed_area': signed_area,
+        'barycenter': barycenter,
+        'perimeter': perimeter,
+        'inertia_moment': np.stack((Ixx, Iyy, Ixy), axis=1),
+        'major_axis_angle': np.degrees(np.arctan2(2*Ixy, Iyy - Ixx) / 2),
+        'major_axis': major_axis,
+        'minor_axis': minor_axis,
+        'axis_ratio': axis_ratio,
+    }
+
+####################################################################################################
+
+def polygon_properties(polygons):
+
+    """Compute the properties of a list of polygons at once.
+
+    *polygons* is a list of :class:`Polygon2D`, :class:`Point2DArray` or N×2 arrays.  Return a
+    dictionary of arrays indexed by polygon for the keys: *area*, *signed_area*, *barycenter*,
+    *perimeter*, *inertia_moment*, *major_axis_angle*, *major_axis*, *minor_axis* and *axis_ratio*.
+    See the properties of :class:`Polygon2D` for their definition.
+
+    The polygons are assumed to be simple, it is not checked.
+
+    """
+
+    arrays = []
+    for polygon in polygons:
+        if isinstance(polygon, Polygon2D):
+            arrays.append(polygon.point2d_array.array)
+        else:
+            arrays.append(np.asarray(Point2DArray._to_array(polygon), dtype=np.float64))
+    if not arrays:
+        raise ValueError('Empty list of polygons')
+    offsets = np.cumsum([0] + [array.shape[0] for array in arrays])
+    return _polygon_properties(np.concatenate(arrays), offsets)
+
+####################################################################################################
+
 class Polygon2D(Primitive2DMixin, ClosedPrimitiveMixin, PathMixin, PrimitiveNP):
 
     """Class to implements 2D Polygon."""
@@ -84,25 +191,35 @@ class Polygon2D(Primitive2DMixin, ClosedPrimitiveMixin, PathMixin, PrimitiveNP):
 
     def __init__(self, *points):
 
-        # Fixme: ctor for list of points
-
+        points = self.handle_points(points)
         if len(points) < 3:
             raise ValueError('Polygon require at least 3 vertexes')
 
         PrimitiveNP.__init__(self, points)
 
+    ##############################################
+
+    def _set_point2d_array(self, array):
+        PrimitiveNP._set_point2d_array(self, array)
+        self._reset_cache()
+
+    ##############################################
+
+    def _reset_cache(self):
+
         self._edges = None
+        self._prepared = None
         self._is_simple = None
         self._is_convex = None
 
+        # the properties are only computed for a simple polygon, else they are None
         self._area = None
-        # self._cross = None
-        # self._barycenter = None
-
-        # self._major_axis_angle = None
+        self._barycenter = None
+        self._inertia_moment = None
+        self._major_axis_angle = None
         self._major_axis = None
-        # self._minor_axis = None
-        # self._axis_ratio = None
+        self._minor_axis = None
+        self._axis_ratio = None
 
     ##############################################
 
@@ -134,29 +251,41 @@ class Polygon2D(Primitive2DMixin, ClosedPrimitiveMixin, PathMixin, PrimitiveNP):
 
     ##############################################
 
-    def _test_is_simple(self):
+    def iter_self_intersections(self):
 
-        edges = list(self.edges)
-        # intersections = []
-        # Test for edge intersection
-        for edge1 in edges:
-            for edge2 in edges:
-                if edge1 != edge2:
-                    # Fixme: recompute line for edge
-                    intersection, intersect = edge1.intersection(edge2)
-                    if intersect:
-                        common_vertex = edge1.share_vertex_with(edge2)
-                        if common_vertex is not None:
-                            if common_vertex == intersection:
-                                continue
-                            else:
-                                # degenerated case where a vertex lie on an edge
-                                return False
-                        else:
-                            # two edge intersect
-                            # intersections.append(intersection)
-                            return False
-        return True
+        """Yield the points where the edges intersect, excepted the vertices shared by two
+        consecutive edges.
+
+        A vertex which lies on an edge and collinear overlapping edges are reported.  The edges are
+        intersected using a sweep line, see :func:`Patro.GeometryEngine.SweepLine.segment_intersections`.
+
+        """
+
+        points = self.point_array.transpose()
+        N = points.shape[0]
+        segments = np.stack((points, np.roll(points, -1, axis=0)), axis=1)
+        for point, indexes in segment_intersections(segments):
+            if len(indexes) == 2:
+                i, j = indexes
+                # consecutive edges share the vertex j, or 0 for the closing edge
+                if j == i + 1 or (i == 0 and j == N - 1):
+                    vertex = points[j if j == i + 1 else 0]
+                    if vertex[0] == point[0] and vertex[1] == point[1]:
+                        continue
+            yield self.__vector_cls__(*point)
+
+    ##############################################
+
+    @property
+    def self_intersections(self):
+        """Return the list of the points where the edges intersect, see :meth:`iter_self_intersections`"""
+        return list(self.iter_self_intersections())
+
+    ##############################################
+
+    def _test_is_simple(self):
+        # stop at the first intersection
+        return next(self.iter_self_intersections(), None) is None
 
     ##############################################
 
@@ -168,14 +297,12 @@ class Polygon2D(Primitive2DMixin, ClosedPrimitiveMixin, PathMixin, PrimitiveNP):
         if not self.is_simple:
             return False
 
-        edges = list(self.edges)
         # a polygon is convex if all turns from one edge vector to the next have the same sense
-        # sign = edges[-1].perp_dot(edges[0])
-        sign0 = sign(edges[-1].cross(edges[0]))
-        for i in range(len(edges)):
-            if sign(edges[i].cross(edges[i+1])) != sign0:
-                return False
-        return True
+        points = self.point_array.transpose()
+        edges = np.roll(points, -1, axis=0) - points
+        next_edges = np.roll(edges, -1, axis=0)
+        crosses = edges[:,0]*next_edges[:,1] - edges[:,1]*next_edges[:,0]
+        return bool(np.all(crosses > 0) or np.all(crosses < 0))
 
     ##############################################
 
@@ -202,149 +329,38 @@ class Polygon2D(Primitive2DMixin, ClosedPrimitiveMixin, PathMixin, PrimitiveNP):
 
     @property
     def perimeter(self):
-        return sum([edge.length for edge in self.edges])
+        points = self._point2d_array.array
+        delta = np.roll(points, -1, axis=0) - points
+        return np.sum(np.hypot(delta[:,0], delta[:,1]))
 
     ##############################################
 
     @property
     def point_barycenter(self):
-        center = self.start_point
-        for point in self.iter_from_second_point():
-            center += point
-        return center / self.number_of_points
+        return self.__vector_cls__(*np.mean(self._point2d_array.array, axis=0))
 
     ##############################################
 
-    def _compute_area_barycenter(self):
-
-        """Compute polygon area and barycenter."""
-
-        if not self.is_simple:
-            return None
-
-        # area = self._points[-1].cross(self._points[0])
-        # for i in range(self.number_of_points):
-        #     area *= self._points[i].cross(self._points[i+1])
-
-        # P0, P1, Pn-1, P0
-        points = self.closed_point_array
-
-        # from 0 to n-1 : P0, ..., Pn-1
-        xi  = points[0,:-1]
-        yi  = points[1,:-1]
-        # from 1 to n : P1, ..., Pn-1, P0
-        xi1 = points[0,1:]
-        yi1 = points[1,1:]
-
-        # Fixme: np.cross ???
-        cross = xi * yi1 - xi1 * yi
-        self._cross = cross
-
-        area = .5 * np.sum(cross)
-
-        if area == 0:
-            # print('Null area')
-            self._area = 0
-            self._barycenter = self.start_point
-        else:
-            factor = 1 / (6*area)
-            x = factor * np.sum((xi + xi1) * cross)
-            y = factor * np.sum((yi + yi1) * cross)
-
-            # area of a convex polygon is defined to be positive if the points are arranged in a
-            # counterclockwise order, and negative if they are in clockwise order (Beyer 1987).
-            self._area = abs(area)
-            self._barycenter = self.__vector_cls__(x, y)
-
-    ##############################################
-
-    def _compute_inertia_moment(self):
-
-        """Compute inertia moment on vertices."""
-
-        # self.recenter()
-
-        # Fixme: duplicated code
-        # P0, P1, Pn-1, P0
-        points = self.closed_point_array
-
-        # from 0 to n-1 : P0, ..., Pn-1
-        xi  = points[0,:-1]
-        yi  = points[1,:-1]
-        # from 1 to n : P1, ..., Pn-1, P0
-        xi1 = points[0,1:]
-        yi1 = points[1,1:]
-
-        # computation on vertices
-        number_of_points = self.number_of_points
-        Ix =    np.sum(yi**2) / number_of_points
-        Iy =    np.sum(xi**2) / number_of_points
-        Ixy = - np.sum(xi*yi) / number_of_points
-
-        # cross = xi * yi1 - xi1 * yi
-        # cross = self._cross
-        # Ix  = 1/(12*self._area) * np.sum((yi**2 + yi*yi1 + yi1**2) * cross)
-        # Iy  = 1/(12*self._area) * np.sum((xi**2 + xi*xi1 + xi1**2) * cross)
-        # Ixy = 1/(24*self._area) * np.sum((xi*yi1 + 2*(xi*yi + xi1*yi1) + xi1*yi) * cross)
-        # cx, cy = self._barycenter
-        # Ix -= cy**2
-        # Iy -= cx**2
-        # Ixy -= cx*cy
-        # Ix = -Ix
-        # Iy = -Iy
-        # print(Ix, Iy, Ixy)
-
-        if Ixy == 0:
-            if Iy >= Ix:
-                self._major_axis_angle = 0
-
-                lambda1 = Iy
-                lambda2 = Ix
-
-                vx  = 0
-                v1y = 1
-                v2y = 0
-            else:
-                self._major_axis_angle = 90
-
-                lambda1 = Ix
-                lambda2 = Iy
-
-                vx  = 1
-                v1y = 0
-                v2y = 1
-        else:
-            Is = Iy + Ix
-            Id = Ix - Iy
+    def _compute_properties(self):
 
-            sqrt0 = math.sqrt(Id*Id + 4*Ixy*Ixy)
+        """Compute polygon area, barycenter and inertia moment."""
 
-            lambda1 = (Is + sqrt0) / 2
-            lambda2 = (Is - sqrt0) / 2
+        vertices = self._point2d_array.array
+        properties = _polygon_properties(vertices, np.array((0, vertices.shape[0])))
 
-            vx  = Ixy
-            v1y = (Id + sqrt0) / 2
-            v2y = (Id - sqrt0) / 2
-
-            if lambda1 < lambda2:
-                v1y, v2y = v2y, v1y
-                lambda1, lambda2 = lambda2, lambda1
-
-            self._major_axis_angle = - math.degrees(math.atan(v1y/vx))
-
-        self._major_axis = 4 * math.sqrt(math.fabs(lambda1))
-        self._minor_axis = 4 * math.sqrt(math.fabs(lambda2))
-
-        if self._minor_axis != 0:
-            self._axis_ratio = self._major_axis / self._minor_axis
-        else:
-            self._axis_ratio = 0
+        self._area = properties['area'][0]
+        self._barycenter = self.__vector_cls__(*properties['barycenter'][0])
+        self._inertia_moment = properties['inertia_moment'][0]
+        self._major_axis_angle = properties['major_axis_angle'][0]
+        self._major_axis = properties['major_axis'][0]
+        self._minor_axis = properties['minor_axis'][0]
+        self._axis_ratio = properties['axis_ratio'][0]
 
     ##############################################
 
     def _check_area(self):
         if self.is_simple and self._area is None:
-            self._compute_area_barycenter()
+            self._compute_properties()
 
     ##############################################
 
@@ -366,39 +382,43 @@ class Polygon2D(Primitive2DMixin, ClosedPrimitiveMixin, PathMixin, PrimitiveNP):
 
     def recenter(self):
         """Recenter the polygon to the barycenter."""
-        # if self._centred:
-        #     return
+        self._check_area()
         barycenter = self._barycenter
-        for point in self._points:
-            point -= barycenter
-        # self._centred = True
+        if barycenter is None:
+            raise ValueError('The barycenter of a non simple polygon is not defined')
+        array = self._point2d_array.array - (barycenter.x, barycenter.y)
+        self._set_point2d_array(Point2DArray._from_array(array))
 
     ##############################################
 
-    def _check_moment(self):
-        if self.is_simple and self._major_axis is None:
-            self._compute_inertia_moment()
+    @property
+    def inertia_moment(self):
+        """Return the central second moments of the area ``(Ixx, Iyy, Ixy)`` divided by the area, i.e.
+        the covariance of the surface.
 
-    ##############################################
+        """
+        self._check_area()
+        return self._inertia_moment
 
     @property
     def major_axis_angle(self):
-        self._check_moment()
+        """Return the angle of the major axis in degrees"""
+        self._check_area()
         return self._major_axis_angle
 
     @property
     def major_axis(self):
-        self._check_moment()
+        self._check_area()
         return self._major_axis
 
     @property
     def minor_axis(self):
-        self._check_moment()
+        self._check_area()
         return self._minor_axis
 
     @property
     def axis_ratio(self):
-        self._check_moment()
+        self._check_area()
         return self._axis_ratio
 
     ##############################################
@@ -426,38 +446,189 @@ class Polygon2D(Primitive2DMixin, ClosedPrimitiveMixin, PathMixin, PrimitiveNP):
 
     ##############################################
 
-    def _winding_number_test(self, point):
+    @property
+    def prepared(self):
+        """Return a :class:`PreparedPolygon` for bulk point-in-polygon queries, it is cached."""
+        if self._prepared is None:
+            self._prepared = PreparedPolygon(self)
+        return self._prepared
 
-        """Winding number test for a point in a polygon."""
+    ##############################################
 
-        # more accurate than crossing number test
-        # http://geomalgorithms.com/a03-_inclusion.html#wn_PnPoly()
+    def is_point_inside(self, point):
 
-        winding_number = 0
-        y = point.y
+        # http://geomalgorithms.com/a03-_inclusion.html
+        # http://paulbourke.net/geometry/polygonmesh/#insidepoly
 
-        for edge in self.edges:
-            if edge.p0.y <= y:
-                if edge.p1.y > y: # upward crossing
-                    if edge.is_left(point):
-                        winding_number += 1
-            else:
-                if edge.p1.y <= y: #  downward crossing
-                    if edge.is_right(point):
-                        winding_number -= 1
+        return self.prepared.contains_point(point)
+
+    ##############################################
 
-        return winding_number > 0
+    def are_points_inside(self, points):
+        """Return a boolean array which tells if the points of a N×2 array are inside the polygon"""
+        return self.prepared.contains(points)
 
     ##############################################
 
-    def is_point_inside(self, point):
+    def _boolean_operation(self, other, operation):
+        from .BooleanOperation import boolean_operation
+        return boolean_operation(self, other, operation)
 
-        # http://geomalgorithms.com/a03-_inclusion.html
-        # http://paulbourke.net/geometry/polygonmesh/#insidepoly
+    def union(self, other):
+        """Return the union with a polygon as a list of polygons, see :mod:`BooleanOperation`"""
+        return self._boolean_operation(other, 'union')
+
+    def intersection(self, other):
+        """Return the intersection with a polygon as a list of polygons"""
+        return self._boolean_operation(other, 'intersection')
+
+    def difference(self, other):
+        """Return the difference with a polygon as a list of polygons"""
+        return self._boolean_operation(other, 'difference')
+
+    def xor(self, other):
+        """Return the symmetric difference with a polygon as a list of polygons"""
+        return self._boolean_operation(other, 'xor')
+
+    ##############################################
+
+    def offset(self, distance, join='miter', **kwargs):
+
+        """Return the polygons offset outward by *distance*, inward if it is negative, e.g. to compute
+        a seam allowance.  See :func:`Offset.offset_polygons`.
+
+        """
+
+        from .Offset import offset_polygons
+        return [Polygon2D(ring) for ring in offset_polygons([self], distance, join, **kwargs)[0]]
+
+####################################################################################################
+
+class PreparedPolygon:
+
+    """Class to answer point-in-polygon queries for arrays of points.
+
+    The edges are stored as arrays and are indexed by horizontal slabs, thus a point is only tested
+    against the edges which cross the slab of the point.  The test is the winding number with the
+    non-zero rule.
+
+    *polygon* is a :class:`Polygon2D`, a list of vectors or a N×2 array of vertices.  *number_of_slabs*
+    is computed from the number of edges by default, use 1 to disable the index.
+
+    """
+
+    # Maximum number of point-edge pairs processed at once
+    CHUNK_SIZE = 2**20
+
+    ##############################################
+
+    def __init__(self, polygon, number_of_slabs=None):
+
+        if isinstance(polygon, Polygon2D):
+            vertices = polygon.point2d_array.array
+        else:
+            vertices = Point2DArray._to_array(polygon)
+        vertices = np.asarray(vertices, dtype=np.float64)
+        if vertices.shape[0] < 3:
+            raise ValueError('Polygon require at least 3 vertexes')
+
+        self._start = vertices
+        self._stop = np.roll(vertices, -1, axis=0)
+        number_of_edges = vertices.shape[0]
+
+        self._x_min, self._y_min = vertices.min(axis=0)
+        self._x_max, self._y_max = vertices.max(axis=0)
+
+        if number_of_slabs is None:
+            number_of_slabs = max(int(math.sqrt(number_of_edges)), 1)
+        self._number_of_slabs = number_of_slabs
+        height = self._y_max - self._y_min
+        self._slab_height = height / number_of_slabs if height > 0 else 1
+
+        # slab range of each edge
+        y_min = np.minimum(self._start[:,1], self._stop[:,1])
+        y_max = np.maximum(self._start[:,1], self._stop[:,1])
+        first_slab = self._slab_of(y_min)
+        last_slab = self._slab_of(y_max)
+        counts = last_slab - first_slab + 1
+        edges = np.repeat(np.arange(number_of_edges), counts)
+        # offset of the slab for each repeated edge
+        offsets = np.arange(edges.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        slabs = first_slab[edges] + offsets
+        order = np.argsort(slabs, kind='stable')
+        self._slab_edges = edges[order]
+        self._slab_offsets = np.searchsorted(slabs[order], np.arange(number_of_slabs + 1))
+
+    ##############################################
+
+    @property
+    def bounding_box(self):
+        return Interval2D((self._x_min, self._x_max), (self._y_min, self._y_max))
+
+    ##############################################
+
+    def _slab_of(self, y):
+        slabs = np.floor((y - self._y_min) / self._slab_height).astype(np.int64)
+        return np.clip(slabs, 0, self._number_of_slabs - 1)
+
+    ##############################################
 
-        # Fixme: bounding box test
+    def _winding_numbers(self, points, edges):
+
+        """Return the winding numbers of a M×2 array of points for the given edges"""
+
+        x0, y0 = self._start[edges].transpose()
+        x1, y1 = self._stop[edges].transpose()
+        x = points[:,0,np.newaxis]
+        y = points[:,1,np.newaxis]
+        # > 0 if the point is on the left of the edge
+        is_left = (x1 - x0) * (y - y0) - (x - x0) * (y1 - y0)
+        upward = (y0 <= y) & (y < y1) & (is_left > 0)
+        downward = (y1 <= y) & (y < y0) & (is_left < 0)
+        return np.sum(upward, axis=1) - np.sum(downward, axis=1)
+
+    ##############################################
+
+    def contains(self, points):
+
+        """Return a boolean array which tells if the points of a N×2 array, or a
+        :class:`Point2DArray`, are inside the polygon.
+
+        """
+
+        points = np.asarray(Point2DArray._to_array(points), dtype=np.float64)
+        x, y = points[:,0], points[:,1]
+        is_inside = np.zeros(points.shape[0], dtype=np.bool_)
+
+        # bounding box test
+        candidates = np.nonzero((self._x_min <= x) & (x <= self._x_max) &
+                                (self._y_min <= y) & (y <= self._y_max))[0]
+        if not candidates.size:
+            return is_inside
+
+        # group the points by slab
+        slabs = self._slab_of(y[candidates])
+        order = np.argsort(slabs, kind='stable')
+        candidates = candidates[order]
+        bounds = np.searchsorted(slabs[order], np.arange(self._number_of_slabs + 1))
+
+        for slab in np.nonzero(bounds[1:] > bounds[:-1])[0]:
+            edges = self._slab_edges[self._slab_offsets[slab]:self._slab_offsets[slab+1]]
+            indexes = candidates[bounds[slab]:bounds[slab+1]]
+            if not edges.size:
+                continue
+            chunk_size = max(self.CHUNK_SIZE // edges.size, 1)
+            for i in range(0, indexes.size, chunk_size):
+                chunk = indexes[i:i+chunk_size]
+                is_inside[chunk] = self._winding_numbers(points[chunk], edges) != 0
+
+        return is_inside
+
+    ##############################################
 
-        return self._winding_number_test(point)
+    def contains_point(self, point):
+        """Test if a point is inside the polygon"""
+        return bool(self.contains(np.array(((point.x, point.y),)))[0])
 
 ####################################################################################################
 
@@ -42,10 +42,16 @@ class Polyline2D(Primitive2DMixin, PrimitiveNP):
 
     def __init__(self, *points):
 
+        points = self.handle_points(points)
         if len(points) < 2:
             raise ValueError('Polyline require at least 2 vertexes')
 
         PrimitiveNP.__init__(self, points)
+
+    ##############################################
+
+    def _set_point2d_array(self, array):
+        PrimitiveNP._set_point2d_array(self, array)
         self._edges = None
 
     ##############################################
@@ -78,6 +84,18 @@ class Polyline2D(Primitive2DMixin, PrimitiveNP):
 
     ##############################################
 
+    def offset(self, distance, join='miter', **kwargs):
+
+        """Return the polyline offset to the left by *distance*, to the right if it is negative, as a
+        list of polylines.  See :func:`Offset.offset_polylines`.
+
+        """
+
+        from .Offset import offset_polylines
+        return [Polyline2D(polyline) for polyline in offset_polylines([self], distance, join, **kwargs)[0]]
+
+    ##############################################
+
     def to_path(self):
 
         path = Path2D(self.start_point)
@@ -44,6 +44,7 @@ from collections import abc as collections
 import numpy as np
 
 from .BoundingBox import bounding_box_from_points
+from .PointArray import Point2DArray
 # Fixme: circular import
 # from .Transformation import Transformation2D
 
@@ -53,6 +54,9 @@ class Primitive:
 
     """Base class for geometric primitive"""
 
+    # allow slots in subclasses
+    __slots__ = ()
+
     __vector_cls__ = None
 
     ##############################################
@@ -159,12 +163,24 @@ class Primitive:
     def apply_transformation(self, transformation):
         """Apply a transformation to the primitive.
 
-        If *clone* is set then the primitive is cloned.
+        The points are stacked in an array and transformed by a single matrix product.
 
         """
-        # for point in self.points:
-        #     point *= transformation # don't work
-        self._set_points([transformation*p for p in self.points])
+        array = transformation.apply_to_array(self._array_to_transform())
+        self._set_transformed_array(array, transformation)
+
+    ##############################################
+
+    def _array_to_transform(self):
+        """Return the N×2 array of the points to be transformed."""
+        return Point2DArray(self.points).array
+
+    ##############################################
+
+    def _set_transformed_array(self, array, transformation):
+        """Set the points from the transformed array and transform the other parameters."""
+        Vector2D = self.__vector_cls__
+        self._set_points([Vector2D(xy) for xy in array])
 
     ##############################################
 
@@ -220,6 +236,8 @@ class Primitive:
 
 class Primitive2DMixin:
 
+    __slots__ = ()
+
     __vector_cls__ = None # Fixme: due to import, done in module's __init__.py
 
     # __dimension__ = 2
@@ -499,6 +517,13 @@ class Primitive4P(Primitive3P):
 
 class PrimitiveNP(Primitive, ReversiblePrimitiveMixin):
 
+    """Base class for primitive defined by N points.
+
+    The points are stored in a :class:`Patro.GeometryEngine.PointArray.Point2DArray`, vectors
+    returned by the point API share their storage with this array.
+
+    """
+
     ##############################################
 
     @staticmethod
@@ -512,14 +537,35 @@ class PrimitiveNP(Primitive, ReversiblePrimitiveMixin):
     def __init__(self, *points):
 
         points = self.handle_points(points)
-        self._points = [self.__vector_cls__(p) for p in points]
-        self._point_array = None
+        self._set_point2d_array(Point2DArray(points))
 
     ##############################################
 
     @property
     def number_of_points(self):
-        return len(self._points)
+        return len(self._point2d_array)
+
+    ##############################################
+
+    @property
+    def point2d_array(self):
+        """Points as a :class:`Patro.GeometryEngine.PointArray.Point2DArray`"""
+        return self._point2d_array
+
+    ##############################################
+
+    def _set_point2d_array(self, array):
+        self._point2d_array = array
+        self._vectors = None
+
+    ##############################################
+
+    @property
+    def _points(self):
+        # Vectors are built on demand
+        if self._vectors is None:
+            self._vectors = self._point2d_array.vector_views()
+        return self._vectors
 
     ##############################################
 
@@ -547,8 +593,27 @@ class PrimitiveNP(Primitive, ReversiblePrimitiveMixin):
     ##############################################
 
     def _set_points(self, points):
-        self._points = points
-        self._point_array = None
+        self._set_point2d_array(Point2DArray(points))
+
+    ##############################################
+
+    def _array_to_transform(self):
+        return self._point2d_array.array
+
+    def _set_transformed_array(self, array, transformation):
+        self._set_point2d_array(Point2DArray._from_array(array))
+
+    ##############################################
+
+    @property
+    def point_array(self):
+        return self._point2d_array.array.transpose().copy()
+
+    ##############################################
+
+    @property
+    def bounding_box(self):
+        return self._point2d_array.bounding_box
 
     ##############################################
 
@@ -0,0 +1,510 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""Module to implement static spatial indexes for a set of primitives.
+
+The indexes are built once from the bounding boxes of the primitives and stored in Numpy arrays, thus
+they can be pickled:
+
+* :class:`STRTree` is a R-tree bulk loaded by the Sort-Tile-Recursive algorithm, it suits any
+  distribution of the primitives,
+* :class:`GridIndex` is a uniform grid, it is simpler and faster for primitives of similar sizes
+  which are evenly distributed.
+
+Both implement window queries, which return the primitives whose bounding box intersects a box, and
+k-nearest neighbour queries.  The neighbours are found using the distance to the bounding boxes then
+refined by a distance function, by default the method :meth:`distance_to_point` of the primitives.
+
+Example of usage::
+
+  index = STRTree(primitives)
+  primitives = index.query(Interval2D((0, 10), (0, 10)))
+  for primitive, distance in index.nearest(Vector2D(5, 5), k=3):
+      ...
+
+References
+
+  * S. T. Leutenegger, M. A. Lopez, J. Edgington, STR: a simple and efficient algorithm for R-tree
+    packing, Proceedings of the 13th International Conference on Data Engineering, 1997
+  * G. R. Hjaltason, H. Samet, Distance browsing in spatial databases, ACM Transactions on Database
+    Systems, 24 (1999)
+
+"""
+
+####################################################################################################
+
+__all__ = [
+    'GridIndex',
+    'STRTree',
+]
+
+####################################################################################################
+
+import heapq
+import math
+
+import numpy as np
+
+from .Vector import Vector2D
+
+####################################################################################################
+
+# maximum number of cells of a grid by item
+MAXIMUM_CELLS_BY_ITEM = 4
+
+####################################################################################################
+
+def _to_box(bounding_box):
+
+    """Return a bounding box as a ``(x_min, y_min, x_max, y_max)`` array, *bounding_box* is an
+    :class:`Interval2D` or a sequence of 4 numbers.
+
+    """
+
+    if hasattr(bounding_box, 'x'):
+        return np.array((bounding_box.x.inf, bounding_box.y.inf,
+                         bounding_box.x.sup, bounding_box.y.sup), dtype=np.float64)
+    else:
+        return np.array(bounding_box, dtype=np.float64)
+
+####################################################################################################
+
+def _intersects(boxes, box):
+    """Test if a N×4 array of boxes intersects a box, return a boolean array"""
+    return ((boxes[:,0] <= box[2]) & (box[0] <= boxes[:,2]) &
+            (boxes[:,1] <= box[3]) & (box[1] <= boxes[:,3]))
+
+####################################################################################################
+
+def _box_distances(boxes, x, y):
+    """Return the distances of a point to a N×4 array of boxes, zero inside"""
+    dx = np.maximum(np.maximum(boxes[:,0] - x, x - boxes[:,2]), 0)
+    dy = np.maximum(np.maximum(boxes[:,1] - y, y - boxes[:,3]), 0)
+    return np.hypot(dx, dy)
+
+####################################################################################################
+
+def _expand_ranges(starts, stops):
+    """Return the concatenation of the ranges ``starts[i]:stops[i]``"""
+    counts = stops - starts
+    offsets = np.arange(np.sum(counts)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + offsets
+
+####################################################################################################
+
+class SpatialIndex:
+
+    """Base class for the static spatial indexes."""
+
+    ##############################################
+
+    def __init__(self, items, bounding_boxes=None):
+
+        """*items* is a list of primitives, *bounding_boxes* is a N×4 array of ``(x_min, y_min, x_max,
+        y_max)`` or a list of :class:`Interval2D`, by default the property :attr:`bounding_box` of
+        the items.
+
+        """
+
+        self._items = list(items)
+        if bounding_boxes is None:
+            bounding_boxes = [item.bounding_box for item in self._items]
+        if isinstance(bounding_boxes, np.ndarray):
+            boxes = np.array(bounding_boxes, dtype=np.float64).reshape(-1, 4)
+        else:
+            if any(bounding_box is None for bounding_box in bounding_boxes):
+                raise ValueError('An infinite primitive cannot be indexed')
+            boxes = np.array([_to_box(bounding_box) for bounding_box in bounding_boxes],
+                             dtype=np.float64).reshape(-1, 4)
+        if boxes.shape[0] != len(self._items):
+            raise ValueError('Inconsistent number of bounding boxes')
+        self._boxes = boxes
+
+    ##############################################
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def items(self):
+        return self._items
+
+    @property
+    def bounding_boxes(self):
+        """N×4 array of the bounding boxes ``(x_min, y_min, x_max, y_max)`` of the items"""
+        return self._boxes
+
+    ##############################################
+
+    def query_indexes(self, bounding_box):
+        """Return the sorted array of the indexes of the items whose bounding box intersects
+        *bounding_box*.
+
+        """
+        raise NotImplementedError
+
+    ##############################################
+
+    def query(self, bounding_box):
+        """Return the items whose bounding box intersects *bounding_box*"""
+        return [self._items[i] for i in self.query_indexes(bounding_box)]
+
+    ##############################################
+
+    def _distance_function(self, distance):
+
+        """Return a function ``(index, point) -> distance``.
+
+        *distance* is a function ``(item, point) -> distance``, by default the method
+        :meth:`distance_to_point` of the item is used, else the distance to its bounding box.
+
+        """
+
+        items = self._items
+        boxes = self._boxes
+        def box_distance(i, point):
+            return float(_box_distances(boxes[i:i+1], point.x, point.y)[0])
+        if distance is not None:
+            return lambda i, point: distance(items[i], point)
+        else:
+            def default_distance(i, point):
+                item = items[i]
+                if hasattr(item, 'distance_to_point'):
+                    try:
+                        return item.distance_to_point(point)
+                    except NotImplementedError:
+                        pass
+                return box_distance(i, point)
+            return default_distance
+
+    ##############################################
+
+    def nearest_indexes(self, point, k=1, distance=None):
+        """Return the indexes of the *k* nearest items to *point* and their distances, sorted by
+        distance, see :meth:`nearest`.
+
+        """
+        raise NotImplementedError
+
+    ##############################################
+
+    def nearest(self, point, k=1, distance=None):
+
+        """Return the list of the *k* nearest items to *point* as ``(item, distance)`` tuples sorted
+        by distance.
+
+        *distance* is a function ``(item, point) -> distance`` which must be greater or equal to the
+        distance to the bounding box of the item, by default the method :meth:`distance_to_point` of
+        the item.
+
+        """
+
+        indexes, distances = self.nearest_indexes(point, k, distance)
+        return [(self._items[i], d) for i, d in zip(indexes, distances)]
+
+####################################################################################################
+
+class STRTree(SpatialIndex):
+
+    """Class to implement a R-tree bulk loaded by the Sort-Tile-Recursive algorithm.
+
+    The entries of each level are sorted by the x coordinate of their center and cut in vertical
+    slices of about :math:`\\sqrt{n / M}` nodes, each slice is then sorted by y and packed in nodes
+    of *M* entries, where *M* is :attr:`NodeCapacity`.  The tree is stored by level as arrays of
+    the node boxes and of the ranges of their children in the level below.
+
+    """
+
+    NodeCapacity = 16
+
+    ##############################################
+
+    def __init__(self, items, bounding_boxes=None, node_capacity=None):
+
+        super().__init__(items, bounding_boxes)
+
+        if node_capacity is None:
+            node_capacity = self.NodeCapacity
+        if node_capacity < 2:
+            raise ValueError('Node capacity must be greater than 1')
+        self._node_capacity = int(node_capacity)
+
+        self._order = self._str_order(self._boxes)
+        # levels from the leaves to the root of (boxes, child starts, child stops)
+        self._levels = []
+        boxes = self._boxes[self._order]
+        while boxes.shape[0]:
+            node_boxes, node_starts, node_stops = self._pack(boxes)
+            if node_boxes.shape[0] > 1:
+                order = self._str_order(node_boxes)
+                node_boxes, node_starts, node_stops = (node_boxes[order], node_starts[order],
+                                                       node_stops[order])
+            self._levels.append((node_boxes, node_starts, node_stops))
+            if node_boxes.shape[0] == 1:
+                break
+            boxes = node_boxes
+
+    ##############################################
+
+    @property
+    def node_capacity(self):
+        return self._node_capacity
+
+    @property
+    def depth(self):
+        return len(self._levels)
+
+    ##############################################
+
+    def _str_order(self, boxes):
+
+        """Return the Sort-Tile-Recursive order of a N×4 array of boxes, the consecutive groups of
+        :attr:`node_capacity` boxes form the nodes.
+
+        """
+
+        capacity = self._node_capacity
+        number_of_boxes = boxes.shape[0]
+        number_of_nodes = math.ceil(number_of_boxes / capacity)
+        slice_size = math.ceil(math.sqrt(number_of_nodes)) * capacity
+        centers = (boxes[:,:2] + boxes[:,2:]) / 2
+        ranks = np.empty(number_of_boxes, dtype=np.int64)
+        ranks[np.argsort(centers[:,0], kind='stable')] = np.arange(number_of_boxes)
+        # the slice size is a multiple of the capacity, thus a node doesn't overlap two slices
+        return np.lexsort((centers[:,1], ranks // slice_size))
+
+    ##############################################
+
+    def _pack(self, boxes):
+
+        """Pack consecutive boxes in nodes, return the node boxes and the ranges of their entries"""
+
+        starts = np.arange(0, boxes.shape[0], self._node_capacity)
+        stops = np.minimum(starts + self._node_capacity, boxes.shape[0])
+        node_boxes = np.concatenate((np.minimum.reduceat(boxes[:,:2], starts),
+                                     np.maximum.reduceat(boxes[:,2:], starts)), axis=1)
+        return node_boxes, starts, stops
+
+    ##############################################
+
+    def query_indexes(self, bounding_box):
+
+        box = _to_box(bounding_box)
+        if not self._levels:
+            return np.zeros(0, dtype=np.int64)
+
+        # traverse all the nodes of a level at once
+        nodes = np.arange(self._levels[-1][0].shape[0])
+        for boxes, starts, stops in reversed(self._levels):
+            nodes = nodes[_intersects(boxes[nodes], box)]
+            nodes = _expand_ranges(starts[nodes], stops[nodes])
+        # the leaf entries are sorted in the STR order
+        entries = nodes[_intersects(self._boxes[self._order[nodes]], box)]
+        return np.sort(self._order[entries])
+
+    ##############################################
+
+    def nearest_indexes(self, point, k=1, distance=None):
+
+        x, y = point
+        point = Vector2D(x, y)
+        distance = self._distance_function(distance)
+        if not self._levels:
+            return [], []
+
+        # best-first search, the heap entries are (distance, counter, level, index), the level is -1
+        # for an item bounded by its box and -2 for an item with its refined distance
+        counter = 0
+        heap = []
+        root_boxes = self._levels[-1][0]
+        for i, d in enumerate(_box_distances(root_boxes, x, y)):
+            heap.append((d, counter, len(self._levels) - 1, i))
+            counter += 1
+        heapq.heapify(heap)
+
+        indexes = []
+        distances = []
+        while heap and len(indexes) < k:
+            d, _, level, i = heapq.heappop(heap)
+            if level == -2:
+                indexes.append(i)
+                distances.append(d)
+            elif level == -1:
+                heapq.heappush(heap, (distance(i, point), counter, -2, i))
+                counter += 1
+            else:
+                boxes, starts, stops = self._levels[level]
+                children = np.arange(starts[i], stops[i])
+                if level:
+                    child_boxes = self._levels[level - 1][0][children]
+                    child_level = level - 1
+                else:
+                    children = self._order[children]
+                    child_boxes = self._boxes[children]
+                    child_level = -1
+                for child, d in zip(children.tolist(), _box_distances(child_boxes, x, y).tolist()):
+                    heapq.heappush(heap, (d, counter, child_level, child))
+                    counter += 1
+
+        return indexes, distances
+
+####################################################################################################
+
+class GridIndex(SpatialIndex):
+
+    """Class to implement a uniform grid index.
+
+    Each item is registered in the cells covered by its bounding box.  The cells are stored in a
+    compressed sparse row layout: the item indexes sorted by cell and the start of each cell in this
+    array.
+
+    """
+
+    ##############################################
+
+    def __init__(self, items, bounding_boxes=None, cell_size=None):
+
+        """By default *cell_size* is chosen to have about one item by cell, but not lower than the
+        mean size of the items.  If the items are collinear, the cells are distributed along their
+        line.  The cell size is enlarged to have at most :data:`MAXIMUM_CELLS_BY_ITEM` cells by item.
+
+        """
+
+        super().__init__(items, bounding_boxes)
+
+        boxes = self._boxes
+        number_of_items = boxes.shape[0]
+        if number_of_items:
+            origin = boxes[:,:2].min(axis=0)
+            extent = boxes[:,2:].max(axis=0) - origin
+        else:
+            origin = extent = np.zeros(2)
+        if cell_size is None:
+            mean_size = np.mean(boxes[:,2:] - boxes[:,:2]) if number_of_items else 0
+            area = np.prod(np.maximum(extent, mean_size))
+            cell_size = max(math.sqrt(area / max(number_of_items, 1)), mean_size)
+            if cell_size == 0:
+                # the items are points on a line
+                cell_size = np.max(extent) / max(number_of_items, 1)
+        elif cell_size <= 0:
+            raise ValueError('Cell size must be positive')
+        maximum_number_of_cells = MAXIMUM_CELLS_BY_ITEM * max(number_of_items, 1)
+        cell_size = max(cell_size, np.max(extent) / maximum_number_of_cells,
+                        math.sqrt(np.prod(extent) / maximum_number_of_cells))
+        if cell_size == 0:
+            # the items are the same point
+            cell_size = 1
+        self._origin = origin
+        self._cell_size = float(cell_size)
+        self._shape = np.floor(extent / self._cell_size).astype(np.int64) + 1
+
+        # register the items in the cells
+        lower = self._cells(boxes[:,:2])
+        upper = self._cells(boxes[:,2:])
+        widths = upper[:,0] - lower[:,0] + 1
+        counts = widths * (upper[:,1] - lower[:,1] + 1)
+        item_indexes = np.repeat(np.arange(number_of_items), counts)
+        offsets = _expand_ranges(np.zeros(number_of_items, dtype=np.int64), counts)
+        widths = widths[item_indexes]
+        columns = lower[item_indexes,0] + offsets % widths
+        rows = lower[item_indexes,1] + offsets // widths
+        cell_ids = rows * self._shape[0] + columns
+        order = np.argsort(cell_ids, kind='stable')
+        self._cell_items = item_indexes[order]
+        self._cell_starts = np.searchsorted(cell_ids[order], np.arange(np.prod(self._shape) + 1))
+
+    ##############################################
+
+    @property
+    def cell_size(self):
+        return self._cell_size
+
+    @property
+    def shape(self):
+        """Number of columns and rows"""
+        return tuple(self._shape.tolist())
+
+    ##############################################
+
+    def _cells(self, points):
+        """Return the clipped column and row of a N×2 array of points"""
+        cells = np.floor((points - self._origin) / self._cell_size).astype(np.int64)
+        return np.clip(cells, 0, self._shape - 1)
+
+    ##############################################
+
+    def _block_items(self, lower, upper):
+        """Return the items registered in the block of cells from *lower* to *upper* included"""
+        columns = np.arange(lower[0], upper[0] + 1)
+        rows = np.arange(lower[1], upper[1] + 1)
+        cell_ids = (rows[:,np.newaxis] * self._shape[0] + columns).ravel()
+        return self._cell_items[_expand_ranges(self._cell_starts[cell_ids],
+                                               self._cell_starts[cell_ids + 1])]
+
+    ##############################################
+
+    def query_indexes(self, bounding_box):
+
+        box = _to_box(bounding_box)
+        if not self._items:
+            return np.zeros(0, dtype=np.int64)
+        lower, upper = self._cells(np.array((box[:2], box[2:])))
+        items = np.unique(self._block_items(lower, upper))
+        return items[_intersects(self._boxes[items], box)]
+
+    ##############################################
+
+    def nearest_indexes(self, point, k=1, distance=None):
+
+        x, y = point
+        point = Vector2D(x, y)
+        distance = self._distance_function(distance)
+        if not self._items:
+            return [], []
+
+        # visit the rings of cells around the cell of the point
+        center = self._cells(np.array(((x, y),)))[0]
+        is_visited = np.zeros(len(self._items), dtype=np.bool_)
+        candidates = [] # heap of (distance, index)
+        ring = 0
+        maximum_ring = int(np.max(np.maximum(center, self._shape - 1 - center)))
+        while True:
+            lower = np.maximum(center - ring, 0)
+            upper = np.minimum(center + ring, self._shape - 1)
+            items = np.unique(self._block_items(lower, upper))
+            items = items[~is_visited[items]]
+            is_visited[items] = True
+            for i in items.tolist():
+                heapq.heappush(candidates, (distance(i, point), i))
+            if ring >= maximum_ring:
+                break
+            # the items which are not visited lie outside the block
+            x_min, y_min = self._origin + lower * self._cell_size
+            x_max, y_max = self._origin + (upper + 1) * self._cell_size
+            bound = min(x - x_min if lower[0] else math.inf,
+                        x_max - x if upper[0] < self._shape[0] - 1 else math.inf,
+                        y - y_min if lower[1] else math.inf,
+                        y_max - y if upper[1] < self._shape[1] - 1 else math.inf)
+            if len(candidates) >= k and heapq.nsmallest(k, candidates)[-1][0] <= bound:
+                break
+            ring += 1
+
+        nearest = heapq.nsmallest(k, candidates)
+        return [i for d, i in nearest], [d for d, i in nearest]
@@ -37,14 +37,236 @@ __all__ = ['BSpline2D']
 ####################################################################################################
 
 # from math import log, sqrt
+import math
 
+from IntervalArithmetic import Interval2D
 import numpy as np
 
-from .Bezier import QuadraticBezier2D, CubicBezier2D
+from .Bezier import BasisMatrixMixin, QuadraticBezier2D, CubicBezier2D, _bezier_extrema
+from .Flattening import FlatteningMixin, MAXIMUM_DEPTH, flatten_parametric, _split_bezier
 from .Primitive import Primitive3P, Primitive4P, PrimitiveNP, Primitive2DMixin
 
 ####################################################################################################
 
+def _basis_matrix(knots, degree, t):
+
+    """Return the N×(len(knots)-degree-1) matrix of the B-spline basis functions evaluated at the array
+    *t*, using the De Boor-Cox recursion formula on arrays.
+
+    """
+
+    knots = np.asarray(knots, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)[:,np.newaxis]
+
+    basis = ((knots[:-1] <= t) & (t < knots[1:])).astype(np.float64)
+    # the last knot belongs to the last non empty span
+    last_span = np.nonzero(knots[:-1] < knots[1:])[0][-1]
+    basis[t[:,0] == knots[-1], last_span] = 1
+
+    for k in range(1, degree +1):
+        n = basis.shape[1] - 1
+        ki = knots[:n]
+        kik = knots[k:k+n]
+        ki1 = knots[1:n+1]
+        kik1 = knots[k+1:k+1+n]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            c1 = np.where(kik > ki, (t - ki) / (kik - ki), 0)
+            c2 = np.where(kik1 > ki1, (kik1 - t) / (kik1 - ki1), 0)
+        basis = c1 * basis[:,:n] + c2 * basis[:,1:]
+
+    return basis
+
+####################################################################################################
+
+def _find_spans(knots, degree, t):
+
+    """Return the knot spans of the array *t* using a binary search.
+
+    The span *l* is the index of the knot such that :math:`u_l \\le t < u_{l+1}`, the last knot
+    belongs to the last non empty span.
+
+    """
+
+    spans = np.searchsorted(knots, t, side='right') - 1
+    last_span = np.nonzero(knots[:-1] < knots[1:])[0][-1]
+    return np.clip(spans, degree, last_span)
+
+####################################################################################################
+
+def _local_basis(knots, degree, t):
+
+    """Return the knot spans of the array *t* and the N×(degree+1) array of the non zero basis
+    functions, i.e. :math:`N_{l-degree}, \\ldots, N_l` for the span *l*.
+
+    The basis functions are computed using the triangular scheme of The NURBS Book, algorithm A2.2.
+
+    """
+
+    spans = _find_spans(knots, degree, t)
+    basis = np.zeros((t.shape[0], degree + 1))
+    basis[:,0] = 1
+    left = np.zeros_like(basis)
+    right = np.zeros_like(basis)
+    for j in range(1, degree + 1):
+        left[:,j] = t - knots[spans + 1 - j]
+        right[:,j] = knots[spans + j] - t
+        saved = 0
+        for r in range(j):
+            temp = basis[:,r] / (right[:,r+1] + left[:,j-r])
+            basis[:,r] = saved + right[:,r+1] * temp
+            saved = left[:,j-r] * temp
+        basis[:,j] = saved
+
+    return spans, basis
+
+####################################################################################################
+
+BASIS_CACHE_SIZE = 32
+
+_local_basis_cache = {}
+
+def _cached_local_basis(knots, degree, t):
+
+    """Return :func:`_local_basis`, the result is cached by knot vector, degree and array *t* since a
+    pattern is often evaluated for several sizes, i.e. for several sets of control points which share
+    the same knots.
+
+    """
+
+    knots = np.asarray(knots, dtype=np.float64)
+    t = np.ascontiguousarray(t, dtype=np.float64)
+    key = (knots.tobytes(), degree, t.tobytes())
+    value = _local_basis_cache.get(key, None)
+    if value is None:
+        value = _local_basis(knots, degree, t)
+        for array in value:
+            array.setflags(write=False)
+        if len(_local_basis_cache) >= BASIS_CACHE_SIZE:
+            del _local_basis_cache[next(iter(_local_basis_cache))]
+        _local_basis_cache[key] = value
+    return value
+
+####################################################################################################
+
+def _evaluate(knots, degree, points, t):
+
+    """Evaluate a B-spline defined by a N×2 array of control points at the array *t* using the cached
+    basis functions, return a N×2 array.
+
+    """
+
+    spans, basis = _cached_local_basis(knots, degree, t)
+    indexes = spans[:,np.newaxis] - degree + np.arange(degree + 1)
+    return np.einsum('ij,ijk->ik', basis, points[indexes])
+
+####################################################################################################
+
+def _bezier_spans(knots, degree, points):
+
+    """Return the Bézier control points of the non empty knot spans of a B-spline as a
+    M×(degree+1)×2 array.
+
+    The k-th control point of the span :math:`[u_l, u_{l+1}]` is the blossom value
+    :math:`f(u_l, \\ldots, u_l, u_{l+1}, \\ldots, u_{l+1})` with *k* times :math:`u_{l+1}`, it is
+    computed by the De Boor algorithm using one parameter per level.  All the spans and control
+    points are computed at once, which is equivalent to insert each inner knot up to a multiplicity
+    of degree + 1.
+
+    """
+
+    knots = np.asarray(knots, dtype=np.float64)
+    points = np.asarray(points, dtype=np.float64)
+    order = degree + 1
+
+    spans = np.arange(degree, points.shape[0])
+    spans = spans[knots[spans] < knots[spans + 1]]
+    # parameters of the levels, the blossom is symmetric
+    k = np.arange(order)[:,np.newaxis]
+    is_upper = np.arange(degree)[np.newaxis] >= degree - k
+    parameters = np.where(is_upper, knots[spans + 1,np.newaxis,np.newaxis], knots[spans,np.newaxis,np.newaxis])
+
+    # span, control point, De Boor point, xy
+    first = spans - degree
+    control_points = np.repeat(points[first[:,np.newaxis] + np.arange(order)][:,np.newaxis], order, axis=1)
+    for level in range(1, order):
+        j = np.arange(level, order)
+        lower = knots[first[:,np.newaxis] + j]
+        upper = knots[first[:,np.newaxis] + j + order - level]
+        alpha = (parameters[:,:,level-1,np.newaxis] - lower[:,np.newaxis]) / (upper - lower)[:,np.newaxis]
+        alpha = alpha[...,np.newaxis]
+        control_points[:,:,j] = (1 - alpha) * control_points[:,:,j-1] + alpha * control_points[:,:,j]
+
+    return control_points[:,:,degree]
+
+####################################################################################################
+
+def _bezier_points_at_t(control_points, t):
+
+    """Evaluate a M×(degree+1)×2 array of Bézier curves at the array *t*, return a M×N×2 array"""
+
+    degree = control_points.shape[1] - 1
+    t = np.asarray(t, dtype=np.float64)[:,np.newaxis]
+    i = np.arange(degree + 1)
+    coefficients = np.array([math.comb(degree, j) for j in i], dtype=np.float64)
+    basis = coefficients * t**i * (1 - t)**(degree - i)
+    return np.einsum('ni,mik->mnk', basis, control_points)
+
+####################################################################################################
+
+def _reduce_to_cubic(control_points, tolerance):
+
+    """Approximate a M×(degree+1)×2 array of Bézier curves by cubic Bézier curves within *tolerance*.
+
+    Return a K×4×2 array and the indexes of the approximated curves.
+
+    The cubic curve has the same end points and derivatives, thus the approximation is C1 and exact
+    for an elevated cubic curve.  The error is the distance at equal parameters at some samples, the
+    curves whose error exceeds *tolerance* are split at t = 1/2 and reduced again.
+
+    """
+
+    degree = control_points.shape[1] - 1
+    samples = np.linspace(0, 1, 2*degree + 1)[1:-1]
+
+    curves = control_points
+    indexes = np.arange(curves.shape[0])
+    t = np.zeros(curves.shape[0])
+    dt = 1.
+
+    reduced_curves = []
+    reduced_indexes = []
+    reduced_t = []
+    for depth in range(MAXIMUM_DEPTH + 1):
+        start, stop = curves[:,0], curves[:,-1]
+        cubics = np.stack((
+            start,
+            start + (curves[:,1] - start) * degree / 3,
+            stop - (stop - curves[:,-2]) * degree / 3,
+            stop,
+        ), axis=1)
+        if depth < MAXIMUM_DEPTH:
+            delta = _bezier_points_at_t(curves, samples) - _bezier_points_at_t(cubics, samples)
+            is_close = np.max(np.hypot(delta[...,0], delta[...,1]), axis=1) <= tolerance
+        else:
+            is_close = np.ones(t.shape, dtype=np.bool_)
+        reduced_curves.append(cubics[is_close])
+        reduced_indexes.append(indexes[is_close])
+        reduced_t.append(t[is_close])
+        if np.all(is_close):
+            break
+        left, right = _split_bezier(curves[~is_close])
+        curves = np.concatenate((left, right))
+        indexes = np.tile(indexes[~is_close], 2)
+        t = t[~is_close]
+        dt /= 2
+        t = np.concatenate((t, t + dt))
+
+    indexes = np.concatenate(reduced_indexes)
+    order = np.lexsort((np.concatenate(reduced_t), indexes))
+    return np.concatenate(reduced_curves)[order], indexes[order]
+
+####################################################################################################
+
 class QuadraticUniformSpline2D(Primitive2DMixin, Primitive3P):
 
     """Class to implements 2D Quadratic Spline Curve."""
@@ -98,7 +320,7 @@ class QuadraticUniformSpline2D(Primitive2DMixin, Primitive3P):
 
 ####################################################################################################
 
-class CubicUniformSpline2D(Primitive2DMixin, Primitive4P):
+class CubicUniformSpline2D(BasisMatrixMixin, Primitive2DMixin, Primitive4P):
 
     """Class to implements 2D Cubic Spline Curve."""
 
@@ -157,14 +379,30 @@ class CubicUniformSpline2D(Primitive2DMixin, Primitive4P):
         #
         #     = P0*(1-t)**3/6 + P1*(3*t**3 - 6*t**2 + 4)/6 + P2*(-3*t**3 + 3*t**2 + 3*t + 1)/6 + P3*t**3/6
 
+        if np.ndim(t):
+            return self._points_at_t(t)
+
         return (self._p0/6 + self._p1*2/3 + self._p2/6 +
                 (-self._p0/2 + self._p2/2)*t +
                 (self._p0/2 - self._p1 + self._p2/2)*t**2 +
                 (-self._p0/6 + self._p1/2 - self._p2/2 + self._p3/6)*t**3)
 
+    ##############################################
+
+    def tangent_at(self, t):
+
+        """Return the derivative at *t*"""
+
+        if np.ndim(t):
+            return self._points_at_t(t, derivative=True)
+
+        return ((-self._p0/2 + self._p2/2) +
+                (self._p0/2 - self._p1 + self._p2/2)*2*t +
+                (-self._p0/6 + self._p1/2 - self._p2/2 + self._p3/6)*3*t**2)
+
 ####################################################################################################
 
-class BSpline2D(Primitive2DMixin, PrimitiveNP):
+class BSpline2D(FlatteningMixin, Primitive2DMixin, PrimitiveNP):
 
     """Class to implement a 2D B-Spline curve.
 
@@ -272,9 +510,7 @@ class BSpline2D(Primitive2DMixin, PrimitiveNP):
         if self._uniform:
             return int(t) + self._degree # start padding
         else:
-            for i, t_span in enumerate(self._knots):
-                if t < t_span:
-                    return i-1
+            return int(_find_spans(np.array(self._knots, dtype=np.float64), self._degree, t))
 
     ##############################################
 
@@ -350,15 +586,40 @@ class BSpline2D(Primitive2DMixin, PrimitiveNP):
 
         """Compute point at t using a naive algorithm"""
 
-        basis = np.array([self.basis_function(i, self._degree, t)
-                          for i in range(self.number_of_points)])
+        basis = _basis_matrix(self._knots, self._degree, np.array((t,)))[0]
         points = self.point_array
-        return self.__vector_cls__(np.dot(basis, points))
+        return self.__vector_cls__(*np.dot(points, basis))
+
+    ##############################################
+
+    def basis_matrix(self, t):
+
+        """Return the N×number_of_points matrix of the basis functions evaluated at the array *t*.
+
+        The points are given by ``np.dot(matrix, spline.point_array.transpose())``.
+
+        """
+
+        spans, basis = _cached_local_basis(self._knots, self._degree, t)
+        matrix = np.zeros((basis.shape[0], self.number_of_points))
+        indexes = spans[:,np.newaxis] - self._degree + np.arange(self.order)
+        np.put_along_axis(matrix, indexes, basis, axis=1)
+        return matrix
 
     ##############################################
 
     def point_at_t(self, t, naive=False):
 
+        """Return the point at *t*, or a N×2 array if *t* is an array.
+
+        The basis functions for an array are cached, thus evaluating splines which share the same
+        knots at the same array costs a product.
+
+        """
+
+        if np.ndim(t):
+            return _evaluate(self._knots, self._degree, self.point_array.transpose(), t)
+
         # Spline curve as a Bézier span at start and end
         if self._uniform:
             if t == 0:
@@ -374,6 +635,66 @@ class BSpline2D(Primitive2DMixin, PrimitiveNP):
 
     ##############################################
 
+    def _derivative_control_points(self):
+
+        """Return the control points as a N×2 array and the knots of the derivative curve, which is a
+        B-spline of degree - 1.
+
+        """
+
+        degree = self._degree
+        knots = np.array(self._knots, dtype=np.float64)
+        points = self.point_array.transpose()
+        d = knots[degree+1:degree+points.shape[0]] - knots[1:points.shape[0]]
+        with np.errstate(divide='ignore'):
+            scale = np.where(d > 0, degree / d, 0)
+        return (points[1:] - points[:-1]) * scale[:,np.newaxis], knots[1:-1]
+
+    ##############################################
+
+    def tangent_at(self, t):
+
+        """Return the derivative at *t*, or a N×2 array if *t* is an array."""
+
+        points, knots = self._derivative_control_points()
+        tangents = _evaluate(knots, self._degree -1, points, np.atleast_1d(t))
+        if np.ndim(t):
+            return tangents
+        else:
+            return self.__vector_cls__(*tangents[0])
+
+    ##############################################
+
+    def _flattening_key(self):
+        return FlatteningMixin._flattening_key(self), tuple(self._knots), self._degree
+
+    ##############################################
+
+    def _flatten(self, tolerance):
+        # start with two intervals by knot span
+        knots = np.unique(self._knots)
+        t = np.interp(np.arange(2*knots.shape[0] - 1) / 2, np.arange(knots.shape[0]), knots)
+        return flatten_parametric(self.point_at_t, t, tolerance)[1]
+
+    ##############################################
+
+    def offset(self, distance, tolerance=None):
+
+        """Return the offset curve at *distance*, on the left for a positive distance, as a list of
+        cubic Bézier curves which approximate the true offset within *tolerance*.
+
+        The knot spans are approximated separately, thus the curves have a gap at a corner.
+
+        """
+
+        from .Offset import offset_parametric
+        if tolerance is None:
+            tolerance = self.FlatteningTolerance
+        curves = offset_parametric(self.point_at_t, self.tangent_at, np.unique(self._knots), distance, tolerance)
+        return [CubicBezier2D(*points) for points in curves]
+
+    ##############################################
+
     def insert_knot(self, t):
 
         # http://pages.mtu.edu/~shene/COURSES/cs3621/NOTES/spline/B-spline/single-insertion.html
@@ -417,45 +738,59 @@ class BSpline2D(Primitive2DMixin, PrimitiveNP):
 
     ##############################################
 
-    def to_bezier_form(self, degree=None):
+    def _bezier_spans(self):
+        return _bezier_spans(self._knots, self._degree, self.point_array.transpose())
+
+    ##############################################
+
+    @property
+    def bounding_box(self):
+        """Return the tight bounding box of the curve computed from its Bézier spans"""
+        minimum, maximum = _bezier_extrema(self._bezier_spans())
+        (x_min, y_min), (x_max, y_max) = minimum.min(axis=0), maximum.max(axis=0)
+        return Interval2D((x_min, x_max), (y_min, y_max))
 
-        if not self._uniform:
-            raise ValueError('Must be uniform')
+    ##############################################
 
-        if degree is None:
-            degree = self._degree
+    def to_bezier_form(self):
 
-        new_spline = self
-        for t in range(1, self.end_knot):
-            multiplicity = self.knot_multiplicity(t)
-            for i in range(degree - multiplicity +1):
-                new_spline = new_spline.insert_knot(t)
+        """Return the B-spline where each inner knot is inserted up to a multiplicity of degree + 1, thus
+        the control points of each knot span are those of a Bézier curve.
 
-        return new_spline
+        """
+
+        spans = self._bezier_spans()
+        knots = np.unique(self._knots[self._degree:self.number_of_points + 1])
+        knots = np.repeat(knots, self.order)
+        return self.__class__(spans.reshape(-1, 2), self._degree, knots=knots)
 
     ##############################################
 
-    def to_bezier(self):
+    def to_bezier(self, tolerance=None):
+
+        """Return the list of Bézier curves of the knot spans, a spline of degree 1 gives segments.
+
+        A spline of degree greater than 3 is approximated by cubic Bézier curves within *tolerance*,
+        some spans are then split.
+
+        """
 
         from . import Bezier
+        from .Segment import Segment2D
 
-        if self._degree == 2:
+        if self._degree == 1:
+            cls = Segment2D
+        elif self._degree == 2:
             cls = Bezier.QuadraticBezier2D
         elif self._degree >= 3:
             cls = Bezier.CubicBezier2D
         else:
-            not NotImplementedError
-
-        # Fixme: degree > 3
-        spline = self.to_bezier_form()
+            raise NotImplementedError
 
-        bezier_curves = []
-        order = spline.order
-        for i in range(self.number_of_spans):
-            i_inf = i * order
-            i_sup = i_inf + order
-            points = spline._points[i_inf:i_sup]
-            bezier = cls(*points)
-            bezier_curves.append(bezier)
+        spans = self._bezier_spans()
+        if self._degree > 3:
+            if tolerance is None:
+                tolerance = self.FlatteningTolerance
+            spans, _ = _reduce_to_cubic(spans, tolerance)
 
-        return bezier_curves
+        return [cls(*points) for points in spans]
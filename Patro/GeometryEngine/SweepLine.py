@@ -0,0 +1,210 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""Module to implement the Bentley–Ottmann sweep line algorithm to find the intersections of a set
+of segments.
+
+A vertical line sweeps the plane from left to right and stops at the end points of the segments and
+at the intersections found so far.  The segments which cross the sweep line are kept sorted along
+it, so only neighbour segments have to be intersected.  The complexity is :math:`O((n + k) \\log n)`
+where *k* is the number of intersections.
+
+References
+
+  * J. L. Bentley, T. A. Ottmann, Algorithms for Reporting and Counting Geometric Intersections,
+    IEEE Transactions on Computers, 1979
+  * M. de Berg, O. Cheong, M. van Kreveld, M. Overmars, Computational Geometry, Algorithms and
+    Applications, chapter 2, Springer
+
+"""
+
+####################################################################################################
+
+__all__ = [
+    'segment_intersections',
+]
+
+####################################################################################################
+
+import heapq
+import math
+
+import numpy as np
+
+####################################################################################################
+
+def _intersect_segments(p0, p1, q0, q1):
+
+    """Return the intersection point of the segments *p0* – *p1* and *q0* – *q1* as a tuple, or None
+    if they don't intersect or are parallel.
+
+    """
+
+    dpx, dpy = p1[0] - p0[0], p1[1] - p0[1]
+    dqx, dqy = q1[0] - q0[0], q1[1] - q0[1]
+    denominator = dpx*dqy - dpy*dqx
+    if denominator == 0:
+        return None
+    ox, oy = q0[0] - p0[0], q0[1] - p0[1]
+    s = (ox*dqy - oy*dqx) / denominator
+    r = (ox*dpy - oy*dpx) / denominator
+    epsilon = 1e-12
+    if -epsilon <= s <= 1 + epsilon and -epsilon <= r <= 1 + epsilon:
+        s = min(max(s, 0), 1)
+        return (p0[0] + s*dpx, p0[1] + s*dpy)
+    return None
+
+####################################################################################################
+
+def segment_intersections(segments, tolerance=None):
+
+    """Find the intersections of a set of segments using the Bentley–Ottmann sweep line algorithm.
+
+    *segments* is a M×2×2 array of start and stop points.
+
+    Yield tuples ``(point, indexes)`` in the sweep order, i.e. by ascending x then y, where *point*
+    is a ``(x, y)`` tuple and *indexes* a sorted tuple of the indexes of the segments which meet at
+    this point.  Segments which share an end point are reported, thus a caller can filter
+    consecutive segments of a polyline.  Collinear overlapping segments are reported at the end
+    points of the overlap.
+
+    *tolerance* is the distance under which a point is considered to lie on a segment, it is
+    relative to the extent of the segments by default.
+
+    """
+
+    segments = np.asarray(segments, dtype=np.float64)
+    if not segments.size:
+        return
+    if tolerance is None:
+        extent = np.max(np.ptp(segments.reshape(-1, 2), axis=0))
+        tolerance = 1e-9 * max(extent, 1)
+
+    # orient the segments from left to right
+    left = []
+    right = []
+    starts_at = {}
+    ends_at = {}
+    for i, (p0, p1) in enumerate(segments.tolist()):
+        p0, p1 = tuple(p0), tuple(p1)
+        if p1 < p0:
+            p0, p1 = p1, p0
+        left.append(p0)
+        right.append(p1)
+        starts_at.setdefault(p0, []).append(i)
+        ends_at.setdefault(p1, []).append(i)
+
+    def y_at(i, x, y):
+        # y of the segment on the sweep line, a vertical segment is clamped to the event
+        (x0, y0), (x1, y1) = left[i], right[i]
+        if x0 == x1:
+            return min(max(y, y0), y1)
+        elif x <= x0:
+            return y0
+        elif x >= x1:
+            return y1
+        else:
+            return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+    def slope(i):
+        (x0, y0), (x1, y1) = left[i], right[i]
+        if x0 == x1:
+            return math.inf
+        return (y1 - y0) / (x1 - x0)
+
+    def find(x, y):
+        # index of the first segment of the status whose y is >= y
+        lower, upper = 0, len(status)
+        while lower < upper:
+            middle = (lower + upper) // 2
+            if y_at(status[middle], x, y) < y:
+                lower = middle + 1
+            else:
+                upper = middle
+        return lower
+
+    def find_passing(x, y):
+        # range of the segments of the status which pass through the point
+        lower = find(x, y - tolerance)
+        upper = lower
+        while upper < len(status) and y_at(status[upper], x, y) <= y + tolerance:
+            upper += 1
+        return lower, upper
+
+    def push_intersection(i, j, x, y):
+        p0, p1, q0, q1 = left[i], right[i], left[j], right[j]
+        # segments which share an end point only meet there, unless they are collinear
+        if p0 == q0 or p0 == q1 or p1 == q0 or p1 == q1:
+            return
+        point = _intersect_segments(p0, p1, q0, q1)
+        if point is None:
+            return
+        px, py = point
+        # only the intersections on the right of the sweep line are new
+        if px > x + tolerance or (px >= x - tolerance and py > y + tolerance):
+            if point not in queued:
+                queued.add(point)
+                heapq.heappush(events, point)
+
+    events = list(set(left) | set(right))
+    heapq.heapify(events)
+    queued = set(events)
+    status = [] # segments crossing the sweep line sorted by y
+    active = set()
+
+    while events:
+        point = heapq.heappop(events)
+        x, y = point
+
+        # segments which pass through the point
+        lower, upper = find_passing(x, y)
+        passing = status[lower:upper]
+        # guard against a segment missed due to the rounding
+        missed = [i for i in ends_at.get(point, ()) if i in active and i not in passing]
+        if missed:
+            for i in missed:
+                status.remove(i)
+            active.difference_update(missed)
+            lower, upper = find_passing(x, y)
+            passing = status[lower:upper] + missed
+        starting = starts_at.get(point, ())
+
+        involved = set(passing)
+        involved.update(starting)
+        if len(involved) > 1:
+            yield point, tuple(sorted(involved))
+
+        # reorder the segments which continue after the point
+        # a null segment starts and stops at the point
+        continuing = [i for i in involved
+                      if abs(right[i][0] - x) > tolerance or abs(right[i][1] - y) > tolerance]
+        new = sorted(continuing, key=slope)
+        status[lower:upper] = new
+        active.difference_update(passing)
+        active.update(new)
+
+        if new:
+            if lower > 0:
+                push_intersection(status[lower - 1], new[0], x, y)
+            after = lower + len(new)
+            if after < len(status):
+                push_intersection(new[-1], status[after], x, y)
+        elif 0 < lower < len(status):
+            push_intersection(status[lower - 1], status[lower], x, y)
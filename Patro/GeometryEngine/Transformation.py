@@ -37,10 +37,11 @@ __all__ = [
 ####################################################################################################
 
 from enum import Enum, auto
-from math import sin, cos, radians, degrees
+from math import sin, cos, radians, degrees, hypot, isclose
 
 import numpy as np
 
+from .ScalarVector import ScalarVector2D
 from .Vector import Vector2D, HomogeneousVector2D
 
 ####################################################################################################
@@ -69,6 +70,11 @@ class IncompatibleArrayDimension(ValueError):
 
 ####################################################################################################
 
+# Number of products cached by :meth:`Transformation.compose`
+COMPOSE_CACHE_SIZE = 4
+
+####################################################################################################
+
 class Transformation:
 
     __dimension__ = None
@@ -110,6 +116,25 @@ class Transformation:
             transformation_type = self._check_type()
         self._type = transformation_type
 
+        self._reset_cache()
+
+    ##############################################
+
+    def _reset_cache(self):
+
+        # Must be called when the matrix is modified.
+        # Note: the factory methods modify the matrix in place before any cache is built.
+
+        self._kernel = None
+        # unlink the cached inverse, thus modifying one of them doesn't corrupt the other
+        inverse = getattr(self, '_inverse', None)
+        if inverse is not None and inverse._inverse is self:
+            inverse._inverse = None
+        self._inverse = None
+        # the composed products are checked against the version of the operands
+        self._version = getattr(self, '_version', -1) + 1
+        self._composed = {}
+
     ##############################################
 
     @property
@@ -118,12 +143,16 @@ class Transformation:
 
     @property
     def size(self):
-        return self._size
+        return self.__size__
 
     @property
     def array(self):
         return self._m
 
+    @property
+    def matrix_part(self):
+        return self._m
+
     @property
     def type(self):
         return self._type
@@ -132,6 +161,17 @@ class Transformation:
     def is_identity(self):
         return self._type == TransformationType.Identity
 
+    @property
+    def is_axis_scale(self):
+        """Return True if the transformation scales the axes, i.e. the matrix is diagonal."""
+        return self._type in (
+            TransformationType.Scale,
+            TransformationType.Shear,
+            TransformationType.Parity,
+            TransformationType.XParity,
+            TransformationType.YParity,
+        )
+
     ##############################################
 
     def __repr__(self):
@@ -176,6 +216,77 @@ class Transformation:
         else: # shear, generic
             return TransformationType.Generic
 
+    ##############################################
+
+    def _translation_coefficients(self):
+        return 0., 0.
+
+    ##############################################
+
+    @property
+    def kernel(self):
+
+        """Return a function which transforms a point given by its coordinates, ``x, y = kernel(x, y)``.
+
+        The function is specialised for the type of the transformation and works on Python floats, it
+        is thus much faster than a Numpy matrix product for a single point.
+
+        """
+
+        if self._kernel is None:
+            self._kernel = self._make_kernel()
+        return self._kernel
+
+    ##############################################
+
+    def _make_kernel(self):
+
+        (m00, m01), (m10, m11) = self.matrix_part[:2,:2].tolist()
+        tx, ty = self._translation_coefficients()
+
+        transformation_type = self._type
+        if transformation_type == TransformationType.Identity:
+            def kernel(x, y):
+                return x, y
+        elif transformation_type == TransformationType.Translation:
+            def kernel(x, y):
+                return x + tx, y + ty
+        elif self.is_axis_scale:
+            def kernel(x, y):
+                return m00*x, m11*y
+        elif transformation_type == TransformationType.Rotation:
+            def kernel(x, y):
+                return m00*x + m01*y, m10*x + m11*y
+        else:
+            def kernel(x, y):
+                return m00*x + m01*y + tx, m10*x + m11*y + ty
+
+        return kernel
+
+    ##############################################
+
+    def _scale_scalar(self, value):
+
+        # Scalar can only be scaled if the frame is not sheared
+
+        transformation_type = self._type
+        if transformation_type in (
+                TransformationType.Identity,
+                TransformationType.Rotation,
+                TransformationType.Translation,
+        ):
+            return value
+        elif transformation_type != TransformationType.Shear and self.is_axis_scale:
+            return abs(self._m[0,0]) * value
+        else:
+            # a rotation, a scale and a reflection keep the circles
+            (m00, m01), (m10, m11) = self.matrix_part[:2,:2].tolist()
+            if ((isclose(m00, m11, abs_tol=1e-12) and isclose(m01, -m10, abs_tol=1e-12)) or
+                (isclose(m00, -m11, abs_tol=1e-12) and isclose(m01, m10, abs_tol=1e-12))):
+                return hypot(m00, m10) * value
+            else:
+                raise ValueError('Transformation is sheared')
+
     #######################################
 
     def __mul__(self, obj):
@@ -187,21 +298,135 @@ class Transformation:
             array = np.matmul(self._m, obj.array)
             return self.__class__(array, self._mul_type(obj))
         elif isinstance(obj, Vector2D):
-            array = np.matmul(self._m, np.transpose(obj.v))
-            return Vector2D(array)
+            # Note: a subclass like NormalisedVector2D gives a Vector2D
+            x, y = obj._v.tolist()
+            return Vector2D._make(*self.kernel(x, y))
+        elif isinstance(obj, ScalarVector2D):
+            return obj._make(*self.kernel(obj.x, obj.y))
         elif isinstance(obj, (int, float)):
-            # Scalar can only be scaled if the frame is not sheared
-            if self._type in (TransformationType.Identity, TransformationType.Rotation):
-                return obj
-            elif self._type not in (TransformationType.Shear, TransformationType.Generic):
-                return abs(self._m[0,0]) * obj
-            else:
-                raise ValueError('Transformation is sheared')
+            return self._scale_scalar(obj)
         else:
             raise ValueError
 
     #######################################
 
+    def compose(self, other):
+
+        """Return the composition self * other.
+
+        The last products are cached until one of the transformations is modified, thus the
+        transformations of a painter and a scene are only composed once for all the positions.  The
+        product is shared, if it is modified in place then it is computed again on the next call.
+
+        """
+
+        key = id(other)
+        cached = self._composed.pop(key, None)
+        # the reference to other prevents to reuse its id
+        if cached is not None:
+            operand, version, product, product_version = cached
+            if operand is other and version == other._version and product._version == product_version:
+                self._composed[key] = cached
+                return product
+        product = self * other
+        if len(self._composed) >= COMPOSE_CACHE_SIZE:
+            # drop the least recently used product
+            del self._composed[next(iter(self._composed))]
+        self._composed[key] = (other, other._version, product, product._version)
+        return product
+
+    #######################################
+
+    def _check_array(self, array):
+        array = np.asarray(array)
+        if array.ndim != 2 or array.shape[1] != self.__dimension__:
+            raise IncompatibleArrayDimension
+        return array
+
+    #######################################
+
+    def apply_to_array(self, array):
+
+        """Return a new N×2 array of the transformed points.
+
+        *array* is a N×2 array of points.  A translation or an axis scale is computed by a broadcast
+        operation, else by a single matrix product.
+
+        """
+
+        array = self._check_array(array)
+
+        transformation_type = self._type
+        if transformation_type == TransformationType.Identity:
+            return np.array(array, dtype=np.float64)
+        elif transformation_type == TransformationType.Translation:
+            return array + self._translation_coefficients()
+        elif self.is_axis_scale:
+            return array * np.diagonal(self._m)[:self.__dimension__]
+        else:
+            dimension = self.__dimension__
+            array = np.matmul(array, self.matrix_part[:dimension,:dimension].transpose())
+            if transformation_type != TransformationType.Rotation:
+                array += self._translation_coefficients()
+            return array
+
+    #######################################
+
+    def apply_to_primitives(self, primitives):
+
+        """Apply the transformation to a list of primitives.
+
+        The points of all the primitives are stacked in an array which is transformed by a single
+        matrix product.
+
+        """
+
+        if self.is_identity or not primitives:
+            return
+
+        arrays = [primitive._array_to_transform() for primitive in primitives]
+        array = self.apply_to_array(np.concatenate(arrays))
+        start = 0
+        for primitive, primitive_array in zip(primitives, arrays):
+            stop = start + primitive_array.shape[0]
+            primitive._set_transformed_array(array[start:stop], self)
+            start = stop
+
+    #######################################
+
+    @property
+    def inverse(self):
+
+        """Return the inverse transformation, it is cached until the transformation is modified."""
+
+        if self._inverse is None:
+            self._inverse = self._make_inverse()
+            self._inverse._inverse = self
+        return self._inverse
+
+    #######################################
+
+    def _make_inverse(self):
+
+        transformation_type = self._type
+        if transformation_type == TransformationType.Identity:
+            array = self._m.copy()
+        elif transformation_type == TransformationType.Rotation:
+            # orthogonal matrix
+            array = self._m.transpose().copy()
+        elif self.is_axis_scale:
+            array = np.diag(1 / np.diagonal(self._m))
+        elif transformation_type == TransformationType.Translation:
+            array = self._m.copy()
+            array[:self.__dimension__,-1] *= -1
+        else:
+            array = np.linalg.inv(self._m)
+            # Generic triggers a type check
+            transformation_type = TransformationType.Generic
+        return self.__class__(array, transformation_type)
+
+    #######################################
+
     def __imul__(self, obj):
 
         """Set transformation to obj * self composition."""
@@ -217,6 +442,7 @@ class Transformation:
                 self._type = self._mul_type(obj)
                 if self._type == TransformationType.Generic:
                     self._type = self._check_type()
+                self._reset_cache()
         else:
             raise ValueError
 
@@ -254,31 +480,21 @@ class Transformation2D(Transformation):
     ##############################################
 
     @classmethod
-    def check_matrix_type(self, matrix):
+    def check_matrix_type(cls, matrix):
 
-        # Fixme: check
         m00, m01, m10, m11 = matrix
         if m01 == 0 and m10 == 0:
-            if m00 == 1:
-                if m11 == 1:
-                    return TransformationType.Identity
-                elif m11 == -1:
-                    return TransformationType.YParity
-            elif m00 == -1:
-                if m11 == 1:
-                    return TransformationType.XParity
-                elif m11 == -1:
-                    return TransformationType.Parity
-            elif m00 == m11:
-                return TransformationType.Scale
-
-        # Fixme: check for rotation
+            return cls.type_for_scale(m00, m11)
+        elif (isclose(m00, m11, abs_tol=1e-12) and isclose(m01, -m10, abs_tol=1e-12) and
+              isclose(m00**2 + m10**2, 1)):
+            return TransformationType.Rotation
+
         return TransformationType.Generic
 
     ##############################################
 
     def _check_type(self):
-        return self._check_matrix_type(self.to_list())
+        return self.check_matrix_type(self.to_list())
 
     ##############################################
 
@@ -359,6 +575,11 @@ class AffineTransformation(Transformation):
     def translation_part(self):
         return self._m[:self.__dimension__,-1]
 
+    ##############################################
+
+    def _translation_coefficients(self):
+        return tuple(self.translation_part.tolist())
+
 ####################################################################################################
 
 class AffineTransformation2D(AffineTransformation):
@@ -369,8 +590,14 @@ class AffineTransformation2D(AffineTransformation):
     ##############################################
 
     def _check_type(self):
-        matrix_type = Transformation2D.check_matrix_type(self.matrix_part.flat)
-        # Fixme: translation etc. !!!
+        matrix_type = Transformation2D.check_matrix_type(list(self.matrix_part.flat))
+        if np.any(self.translation_part):
+            if matrix_type == TransformationType.Identity:
+                return TransformationType.Translation
+            else:
+                return TransformationType.Generic
+        else:
+            return matrix_type
 
     ##############################################
 
@@ -385,13 +612,16 @@ class AffineTransformation2D(AffineTransformation):
     ##############################################
 
     @classmethod
-    def Scale(cls, x_scale, y_scale):
+    def Scale(cls, x_scale, y_scale=None):
 
         # Fixme: others, use *= ? (comment means ???)
 
+        if y_scale is None:
+            y_scale = x_scale
+
         transformation = cls.Identity()
         transformation.matrix_part[...] = Transformation2D.Scale(x_scale, y_scale).array
-        transformation._type = cls.type_for_scale(x_scale, y_scale)
+        transformation._type = Transformation2D.type_for_scale(x_scale, y_scale)
         return transformation
 
     ##############################################
@@ -413,10 +643,6 @@ class AffineTransformation2D(AffineTransformation):
         if isinstance(obj, HomogeneousVector2D):
             array = np.matmul(self._m, obj.v)
             return obj.__class__(array)
-        elif isinstance(obj, Vector2D):
-            array = np.matmul(self._m, HomogeneousVector2D(obj).v)
-            # return HomogeneousVector2D(array).to_vector()
-            return Vector2D(array[:2])
         else:
             return super(AffineTransformation, self).__mul__(obj)
 
@@ -88,6 +88,15 @@ class Vector2DBase(Primitive, Primitive2DMixin):
 
     ##############################################
 
+    @classmethod
+    def _make(cls, x, y):
+        # Fast constructor without argument check
+        obj = cls.__new__(cls)
+        obj._v = np.array((x, y), dtype=cls.__data_type__)
+        return obj
+
+    ##############################################
+
     def _check_arguments(self, args):
 
         size = len(args)
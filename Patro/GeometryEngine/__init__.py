@@ -52,10 +52,51 @@ collaborative encyclopedia: article quality, review process, content modificatio
 
 ####################################################################################################
 
+import os
+
+from .PointArray import Point2DArray
 from .Primitive import Primitive2DMixin
+from .ScalarVector import ScalarVector2D
 from .Vector import Vector2D
 
 ####################################################################################################
 
+VECTOR_BACKENDS = {
+    'numpy': Vector2D,
+    'scalar': ScalarVector2D,
+}
+
+####################################################################################################
+
+def vector_backend(name=None):
+
+    """Return the vector class for the backend *name*, ``numpy`` or ``scalar``, or the class used by
+    the primitives if *name* is None.
+
+    """
+
+    if name is None:
+        return Primitive2DMixin.__vector_cls__
+    try:
+        return VECTOR_BACKENDS[name]
+    except KeyError:
+        raise ValueError('Unknown vector backend {}'.format(name))
+
+####################################################################################################
+
+def set_vector_backend(name):
+
+    """Set the vector class used by the primitives to store their points.
+
+    Note: it only applies to primitives created after the call.
+
+    """
+
+    # Point2DArray keeps Numpy vectors since they are views on the array
+    Primitive2DMixin.__vector_cls__ = vector_backend(name)
+
+####################################################################################################
+
 # Fixme: to fix cyclic import issue
-Primitive2DMixin.__vector_cls__ = Vector2D
+set_vector_backend(os.environ.get('PATRO_VECTOR_BACKEND', 'numpy'))
+Point2DArray.__vector_cls__ = Vector2D
@@ -49,7 +49,6 @@ from Patro.GeometryEngine import (
     Triangle,
 )
 from Patro.GeometryEngine.Transformation import AffineTransformation2D
-from Patro.GeometryEngine.Vector import Vector2D
 from . import GraphicItem
 from .GraphicItem import CoordinateItem
 
@@ -173,12 +172,11 @@ class GraphicSceneScope:
 
         """
 
-        # Fixme: cache ?
+        # Note: this method is called for each position on each paint,
+        #   the transformation applies a kernel specialised for its type
         if isinstance(position, str):
-            vector = self._coordinates[position].position
-        elif isinstance(position, Vector2D):
-            vector = position
-        return self._transformation * vector
+            position = self._coordinates[position].position
+        return self._transformation * position
 
     ##############################################
 
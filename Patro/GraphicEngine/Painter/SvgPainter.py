@@ -98,7 +98,8 @@ class SvgPainter(Painter):
 
         if isinstance(position, str):
             position = self._coordinates[position]
-        return self._transformation * position
+        # the scope and the painter transformations are composed once for all the positions
+        return self._transformation.compose(self._scene.transformation) * position
 
     ##############################################
 
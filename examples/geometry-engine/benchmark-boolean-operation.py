@@ -0,0 +1,90 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""Benchmark the polygon boolean operations on large outlines.
+
+Usage: benchmark-boolean-operation.py [DXF_PATH]
+
+The outlines are the closed polylines and splines of the DXF file, flattened and paired with a
+shifted copy of themselves, or synthetic pattern pieces if no file is given.
+
+"""
+
+####################################################################################################
+
+import sys
+import timeit
+
+import numpy as np
+
+from Patro.GeometryEngine.BooleanOperation import boolean_operation
+from Patro.GeometryEngine.Conic import Circle2D
+from Patro.GeometryEngine.Segment import Segment2D
+from Patro.GeometryEngine.Spline import BSpline2D
+
+####################################################################################################
+
+NUMBER = 3
+TOLERANCE = .1
+
+def synthetic_outline(number_of_points, random):
+    # a wavy piece with notches
+    angles = np.linspace(0, 2*np.pi, number_of_points, endpoint=False)
+    radius = 100 + 5*np.sin(40*angles) + random.uniform(0, 1, number_of_points)
+    return np.stack((radius * np.cos(angles), radius * np.sin(angles)), axis=1)
+
+def dxf_outlines(path):
+    from Patro.FileFormat.Dxf.Importer import DxfImporter
+    outlines = []
+    for item in DxfImporter(path):
+        if isinstance(item, list):
+            # closed polyline made of segments and arcs
+            points = []
+            for part in item:
+                if isinstance(part, Segment2D):
+                    points.append((part.p0.x, part.p0.y))
+                elif isinstance(part, Circle2D):
+                    points.extend(part.flatten(TOLERANCE).array[:-1].tolist())
+            if len(points) >= 3:
+                outlines.append(np.array(points))
+        elif isinstance(item, BSpline2D) and item.is_closed:
+            outlines.append(np.array(item.flatten(TOLERANCE).array[:-1]))
+    return outlines
+
+def bench(label, subject, clipping):
+    print('{}: {} + {} vertices'.format(label, subject.shape[0], clipping.shape[0]))
+    for operation in ('union', 'intersection', 'difference', 'xor'):
+        rings = boolean_operation(subject, clipping, operation)
+        time = timeit.timeit(lambda: boolean_operation(subject, clipping, operation), number=NUMBER) / NUMBER
+        print('  {:12} {:3} rings {:6} vertices {:8.1f} ms'.format(
+            operation, len(rings), sum(ring.number_of_points for ring in rings), time * 1e3))
+
+####################################################################################################
+
+if len(sys.argv) > 1:
+    for i, outline in enumerate(dxf_outlines(sys.argv[1])):
+        shift = np.ptp(outline, axis=0) * (.1, .05)
+        bench('Outline {}'.format(i), outline, outline + shift)
+else:
+    random = np.random.RandomState(0)
+    for number_of_points in (100, 1000, 5000, 10000):
+        subject = synthetic_outline(number_of_points, random)
+        clipping = synthetic_outline(number_of_points, random) + (30, 10)
+        bench('Synthetic piece', subject, clipping)
@@ -0,0 +1,83 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+"""Compare the adaptive flattening to an uniform sampling of the same accuracy."""
+
+####################################################################################################
+
+import timeit
+
+import numpy as np
+
+from Patro.GeometryEngine.Bezier import CubicBezier2D
+from Patro.GeometryEngine.Conic import Ellipse2D
+from Patro.GeometryEngine.Spline import BSpline2D
+from Patro.GeometryEngine.Vector import Vector2D
+
+####################################################################################################
+
+NUMBER = 100
+TOLERANCE = .05
+
+def max_distance(points, polyline):
+    start = polyline[:-1][:,np.newaxis]
+    direction = polyline[1:][:,np.newaxis] - start
+    offset = points[np.newaxis] - start
+    length_square = np.maximum(np.einsum('ijk,ijk->ij', direction, direction), 1e-300)
+    s = np.einsum('ijk,ijk->ij', offset, direction) / length_square
+    delta = offset - direction * np.clip(s, 0, 1)[...,np.newaxis]
+    return np.max(np.min(np.hypot(delta[...,0], delta[...,1]), axis=0))
+
+def bench(label, curve, sample, t0, t1):
+
+    reference = sample(np.linspace(t0, t1, 2001))
+
+    # find the number of uniform samples to reach the tolerance
+    number_of_samples = 2
+    while max_distance(reference, sample(np.linspace(t0, t1, number_of_samples))) > TOLERANCE:
+        number_of_samples = int(number_of_samples * 1.1) + 1
+
+    polyline = curve._flatten(TOLERANCE)
+    adaptive_time = timeit.timeit(lambda: curve._flatten(TOLERANCE), number=NUMBER) / NUMBER
+    curve.flatten(TOLERANCE)
+    cached_time = timeit.timeit(lambda: curve.flatten(TOLERANCE), number=NUMBER) / NUMBER
+    uniform_time = timeit.timeit(lambda: sample(np.linspace(t0, t1, number_of_samples)),
+                                 number=NUMBER) / NUMBER
+
+    print('{}'.format(label))
+    print('  adaptive {:5} points  error {:.4f}  {:8.1f} us  cached {:6.2f} us'.format(
+        polyline.shape[0], max_distance(reference, polyline), adaptive_time * 1e6, cached_time * 1e6))
+    print('  uniform  {:5} points                {:8.1f} us'.format(number_of_samples, uniform_time * 1e6))
+
+####################################################################################################
+
+curve = CubicBezier2D(Vector2D(0, 0), Vector2D(40, 50), Vector2D(60, -50), Vector2D(100, 0))
+bench('Cubic Bézier', curve, curve.point_at_t, 0, 1)
+
+curve = CubicBezier2D(Vector2D(0, 0), Vector2D(100, 0), Vector2D(0, 100), Vector2D(100, 100))
+bench('Cubic Bézier with a sharp turn', curve, curve.point_at_t, 0, 1)
+
+points = [Vector2D(*point) for point in ((0, 0), (30, 50), (60, 60), (100, 80), (150, 100), (190, 150))]
+curve = BSpline2D(points, 3)
+bench('Cubic B-spline', curve, curve.point_at_t, 0, curve.end_knot)
+
+curve = Ellipse2D(Vector2D(0, 0), 100, 10, 30)
+bench('Ellipse', curve, curve._points_at_angles, 0, 360)
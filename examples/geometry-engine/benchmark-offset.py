@@ -0,0 +1,72 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""Benchmark the seam allowance offset of pattern pieces.
+
+Usage: benchmark-offset.py
+
+The pieces are synthetic smooth outlines, they are offset one by one then all at once.  Jagged
+outlines whose vertex spacing is much smaller than the distance are slower, since their loops are
+resolved by a boolean union.
+
+"""
+
+####################################################################################################
+
+import timeit
+
+import numpy as np
+
+from Patro.GeometryEngine.Offset import offset_polygons
+
+####################################################################################################
+
+NUMBER = 10
+
+def synthetic_outline(number_of_points, random):
+    # a smooth wavy piece, like a flattened spline outline
+    angles = np.linspace(0, 2*np.pi, number_of_points, endpoint=False)
+    phase = random.uniform(0, 2*np.pi)
+    radius = 300 + 20*np.sin(12*angles + phase) + 3*np.sin(90*angles)
+    return np.stack((radius * np.cos(angles), radius * np.sin(angles)), axis=1)
+
+def bench(label, outlines, distance, join):
+    results = offset_polygons(outlines, distance, join)
+    time = timeit.timeit(lambda: offset_polygons(outlines, distance, join), number=NUMBER) / NUMBER
+    print('  {:24} {:6} {:5} {:4} rings {:7} vertices {:8.1f} ms'.format(
+        label, join, distance,
+        sum(len(rings) for rings in results),
+        sum(ring.shape[0] for rings in results for ring in rings),
+        time * 1e3))
+
+####################################################################################################
+
+random = np.random.RandomState(0)
+for number_of_points in (100, 1000, 5000):
+    outline = synthetic_outline(number_of_points, random)
+    print('Outline of {} vertices'.format(number_of_points))
+    for join in ('miter', 'round', 'bevel'):
+        for distance in (1, 10, -10):
+            bench('one piece', [outline], distance, join)
+
+outlines = [synthetic_outline(1000, random) for i in range(20)]
+print('20 pieces of 1000 vertices')
+for join in ('miter', 'round'):
+    bench('one pass', outlines, 10, join)
@@ -0,0 +1,62 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""Compare the Numpy and the scalar vector backends."""
+
+####################################################################################################
+
+import timeit
+import tracemalloc
+
+from Patro.GeometryEngine import vector_backend
+
+####################################################################################################
+
+NUMBER = 100000
+
+def bench(backend):
+
+    Vector2D = vector_backend(backend)
+    v1 = Vector2D(10, 20)
+    v2 = Vector2D(30, 40)
+    namespace = dict(Vector2D=Vector2D, v1=v1, v2=v2)
+
+    print('{} backend: {}'.format(backend, Vector2D.__name__))
+    for label, statement in (
+            ('creation', 'Vector2D(10, 20)'),
+            ('addition', 'v1 + v2'),
+            ('scale', 'v1 * 2'),
+            ('dot', 'v1.dot(v2)'),
+            ('magnitude', 'v1.magnitude'),
+            ('rotate', 'v1.rotate(30)'),
+    ):
+        time = timeit.timeit(statement, globals=namespace, number=NUMBER)
+        print('  {:10} {:8.3f} us'.format(label, time / NUMBER * 1e6))
+
+    tracemalloc.start()
+    vectors = [Vector2D(i, i) for i in range(NUMBER)]
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('  {:10} {:8.1f} bytes per point'.format('memory', size / NUMBER))
+
+####################################################################################################
+
+for backend in ('numpy', 'scalar'):
+    bench(backend)
@@ -0,0 +1,122 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+####################################################################################################
+
+import unittest
+
+import numpy as np
+import numpy.testing as np_testing
+
+try:
+    import sympy
+except ImportError:
+    sympy = None
+
+from Patro.Common.Math.Root import *
+
+####################################################################################################
+
+def sympy_real_roots(coefficients):
+    # reference solver
+    x = sympy.Symbol('x', real=True)
+    expression = sum(coefficient * x**i for i, coefficient in enumerate(reversed(coefficients)))
+    return sorted(set(float(root.n()) for root in sympy.real_roots(expression, x)))
+
+####################################################################################################
+
+class TestRoot(unittest.TestCase):
+
+    ##############################################
+
+    def test_closed_form(self):
+
+        self.assertListEqual(quadratic_root(1, -3, 2), [1, 2])
+        self.assertListEqual(quadratic_root(1, 0, 1), [])
+        self.assertListEqual(quadratic_root(0, 2, -1), [.5])
+        # double root
+        np_testing.assert_almost_equal(quadratic_root(1, -2, 1), [1])
+
+        # 3*x**3 - 25*x**2 + 27*x + 9 has 3 real roots
+        np_testing.assert_almost_equal(cubic_root(3, -25, 27, 9), np.sort(np.roots((3, -25, 27, 9)).real))
+        # (x - 1)**2 (x + 2)
+        np_testing.assert_almost_equal(cubic_root(1, 0, -3, 2), [-2, 1])
+        np_testing.assert_almost_equal(cubic_root(1, 0, 0, -8), [2])
+
+        # (x - 1) (x - 2) (x + 3) (x + 4)
+        coefficients = np.poly((1, 2, -3, -4))
+        np_testing.assert_almost_equal(quartic_root(*coefficients), [-4, -3, 1, 2])
+        # (x**2 + 1) (x - 1)**2
+        np_testing.assert_almost_equal(quartic_root(1, -2, 2, -2, 1), [1], decimal=6)
+
+        coefficients = np.poly((-2, -1, .25, .5, 3))
+        np_testing.assert_almost_equal(fifth_root(*coefficients), [-2, -1, .25, .5, 3])
+        np_testing.assert_almost_equal(polynomial_root(coefficients, (0, 1)), [.25, .5])
+
+    ##############################################
+
+    def test_random(self):
+
+        random = np.random.RandomState(0)
+        for degree in (2, 3, 4, 5, 6):
+            for i in range(200):
+                coefficients = random.normal(size=degree + 1)
+                roots = np.roots(coefficients)
+                roots = np.sort(roots[np.abs(roots.imag) < 1e-7].real)
+                np_testing.assert_almost_equal(polynomial_root(coefficients), roots)
+
+    ##############################################
+
+    def test_batch(self):
+
+        random = np.random.RandomState(0)
+        coefficients = random.normal(size=(100, 6))
+        coefficients[0,0] = 0
+        batch_roots = polynomial_root_batch(coefficients)
+        self.assertEqual(batch_roots.shape, (100, 5))
+        for row, roots in zip(coefficients, batch_roots):
+            roots = roots[~np.isnan(roots)]
+            np_testing.assert_almost_equal(roots, polynomial_root(row))
+
+        # a triple root is returned less than three times
+        roots = polynomial_root_batch([[1, -3, 3, -1]])[0]
+        roots = roots[~np.isnan(roots)]
+        self.assertTrue(1 <= roots.size <= 3)
+        np_testing.assert_allclose(roots, 1, atol=1e-4)
+
+    ##############################################
+
+    @unittest.skipIf(sympy is None, 'sympy is not installed')
+    def test_sympy(self):
+
+        random = np.random.RandomState(1)
+        for degree in (3, 5):
+            for i in range(10):
+                coefficients = random.randint(-20, 20, size=degree + 1)
+                if coefficients[0] == 0:
+                    continue
+                np_testing.assert_almost_equal(polynomial_root(coefficients),
+                                               sympy_real_roots(coefficients))
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
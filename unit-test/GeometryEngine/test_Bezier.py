@@ -22,6 +22,9 @@
 
 import unittest
 
+import numpy as np
+import numpy.testing as np_testing
+
 from Patro.GeometryEngine.Bezier import *
 from Patro.GeometryEngine.Vector import Vector2D
 
@@ -71,6 +74,132 @@ class TestCubicBezier(unittest.TestCase):
         split = curve.split_at_t(.5)
         self.assertAlmostEqual(sum([curve.length for curve in split]), curve.length, 4)
 
+    ##############################################
+
+    def test_arc_length(self):
+
+        curve = CubicBezier2D(Vector2D(0, 0), Vector2D(3, 5), Vector2D(6, 5), Vector2D(10, 0))
+        length = curve.length
+        self.assertAlmostEqual(length, curve.interpolated_length(dt=1e-4), 6)
+        self.assertAlmostEqual(curve.length_at_t(.3), curve.split_at_t(.3)[0].length)
+        self.assertAlmostEqual(curve.length_at_t(.3, cache=True), curve.length_at_t(.3))
+
+        self.assertEqual(curve.t_at_length(0), 0)
+        self.assertEqual(curve.t_at_length(length), 1)
+        t = curve.t_at_length(length / 3)
+        self.assertAlmostEqual(curve.length_at_t(t), length / 3, 6)
+        lengths = np.linspace(0, length, 11)
+        for t, length in zip(curve.t_at_length(lengths), lengths):
+            self.assertAlmostEqual(curve.length_at_t(t), length, 6)
+
+        # the table is updated when a point is moved
+        curve.p3 = Vector2D(20, 0)
+        self.assertAlmostEqual(curve.arc_length_table()[1][-1], curve.length)
+
+        with self.assertRaises(ValueError):
+            curve.t_at_length(2 * curve.length)
+
+    ##############################################
+
+    def test_closest_point(self):
+
+        curve = CubicBezier2D(Vector2D(0, 0), Vector2D(4, 5), Vector2D(6, 5), Vector2D(10, 0))
+
+        # symmetric point: the closest point is the top of the curve
+        self.assertTrue(curve.closest_point(Vector2D(5, 10)).almost_equal(curve.point_at_t(.5)))
+        # the closest point is an end point
+        self.assertTrue(curve.closest_point(Vector2D(-5, -1)).almost_equal(Vector2D(0, 0)))
+        # curve with a null first tangent, found more than one root
+        curve = CubicBezier2D(Vector2D(1394.4334, 1672.0004), Vector2D(1394.4334, 1672.0004),
+                              Vector2D(1585.0004, 1624.9634), Vector2D(1585.0004, 1622.0004))
+        self.assertIsNotNone(curve.closest_point(Vector2D(1495.11502887, 1649.7386517)))
+
+        random = np.random.RandomState(0)
+        points = random.uniform(-10, 1700, (100, 2))
+        t, closest_points, distances = curve.closest_points(points)
+        np_testing.assert_almost_equal(distances,
+                                       [curve.distance_to_point(Vector2D(point)) for point in points])
+        np_testing.assert_almost_equal(closest_points.array,
+                                       [curve.point_at_t(x).v for x in t])
+
+        # two branches almost equally close, compare to a dense sampling
+        curves = [CubicBezier2D(Vector2D(9, 1), Vector2D(1, 1), Vector2D(0, 9), Vector2D(9, 1))]
+        curves += [CubicBezier2D(*[Vector2D(*point) for point in random.uniform(0, 10, (4, 2))])
+                   for i in range(10)]
+        for curve in curves:
+            points = np.concatenate((((10.7, 3.4),), random.uniform(-2, 12, (50, 2))))
+            distances = curve.distances_to_points(points)
+            samples = curve.point_at_t(np.linspace(0, 1, 20001))
+            deltas = samples[np.newaxis,:,:] - points[:,np.newaxis,:]
+            expected = np.sqrt(np.min(np.einsum('ijk,ijk->ij', deltas, deltas), axis=1))
+            self.assertTrue(np.all(distances <= expected + 1e-9))
+
+    ##############################################
+
+    def test_point_at_t_array(self):
+
+        t = np.linspace(0, 1, 11)
+        for curve in (
+                QuadraticBezier2D(Vector2D(0, 0), Vector2D(3, 5), Vector2D(6, 1)),
+                CubicBezier2D(Vector2D(0, 0), Vector2D(4, 5), Vector2D(6, 5), Vector2D(10, 0)),
+        ):
+            points = curve.point_at_t(t)
+            self.assertEqual(points.shape, (11, 2))
+            np_testing.assert_almost_equal(points, [curve.point_at_t(x).v for x in t])
+            np_testing.assert_almost_equal(curve.tangent_at(t), [curve.tangent_at(x).v for x in t])
+            # the basis matrix can be reused for another curve
+            matrix = curve.basis_matrix(t)
+            np_testing.assert_almost_equal(np.dot(matrix, curve.point_array.transpose()), points)
+
+    ##############################################
+
+    def test_intersect_curve(self):
+
+        curve1 = CubicBezier2D(Vector2D(0, 0), Vector2D(30, 100), Vector2D(70, -100), Vector2D(100, 0))
+        curve2 = CubicBezier2D(Vector2D(0, 10), Vector2D(100, 10), Vector2D(0, -10), Vector2D(100, -10))
+        intersections = curve1.intersect_curve(curve2)
+        self.assertEqual(len(intersections), 5)
+        for t1, t2 in intersections:
+            self.assertTrue(curve1.point_at_t(t1).almost_equal(curve2.point_at_t(t2)))
+        # symmetric curves
+        t1, t2 = intersections[2]
+        self.assertAlmostEqual(t1, .5)
+        self.assertAlmostEqual(t2, .5)
+
+        # tangential intersection
+        curve1 = QuadraticBezier2D(Vector2D(0, 0), Vector2D(50, 50), Vector2D(100, 0))
+        curve2 = QuadraticBezier2D(Vector2D(0, 50), Vector2D(50, 0), Vector2D(100, 50))
+        intersections = curve1.intersect_curve(curve2)
+        self.assertEqual(len(intersections), 1)
+        np_testing.assert_almost_equal(intersections[0], (.5, .5), decimal=3)
+
+        # disjoint bounding boxes
+        curve2 = QuadraticBezier2D(Vector2D(0, 100), Vector2D(50, 150), Vector2D(100, 100))
+        self.assertEqual(curve1.intersect_curve(curve2), [])
+
+        # shared end point
+        curve2 = CubicBezier2D(Vector2D(100, 0), Vector2D(120, 50), Vector2D(150, 50), Vector2D(200, 0))
+        np_testing.assert_almost_equal(curve1.intersect_curve(curve2), [(1, 0)])
+
+    ##############################################
+
+    def test_bounding_box(self):
+
+        random = np.random.RandomState(0)
+        t = np.linspace(0, 1, 100001)
+        for points in random.uniform(-10, 10, (20, 4, 2)):
+            points = [Vector2D(point) for point in points]
+            for curve in (QuadraticBezier2D(*points[:3]), CubicBezier2D(*points)):
+                bounding_box = curve.bounding_box
+                samples = curve.point_at_t(t)
+                np_testing.assert_allclose(
+                    (bounding_box.x.inf, bounding_box.y.inf, bounding_box.x.sup, bounding_box.y.sup),
+                    np.concatenate((samples.min(axis=0), samples.max(axis=0))), atol=1e-6)
+
+        # tighter than the control points
+        curve = CubicBezier2D(Vector2D(0, 0), Vector2D(4, 5), Vector2D(6, 5), Vector2D(10, 0))
+        self.assertAlmostEqual(curve.bounding_box.y.sup, 3.75)
+
 ####################################################################################################
 
 if __name__ == '__main__':
@@ -0,0 +1,131 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+####################################################################################################
+
+import unittest
+
+import numpy as np
+import numpy.testing as np_testing
+
+from Patro.GeometryEngine.BooleanOperation import *
+from Patro.GeometryEngine.Polygon import Polygon2D, polygon_properties
+
+####################################################################################################
+
+def square(x, y, size):
+    return np.array(((x, y), (x + size, y), (x + size, y + size), (x, y + size)), dtype=np.float64)
+
+def star(random, number_of_points, center, radius_min, radius_max):
+    angles = np.sort(random.uniform(0, 2*np.pi, number_of_points))
+    radius = random.uniform(radius_min, radius_max, number_of_points)
+    return np.stack((center[0] + radius * np.cos(angles), center[1] + radius * np.sin(angles)), axis=1)
+
+def is_inside(rings, points):
+    # even-odd crossing number
+    is_inside = np.zeros(points.shape[0], dtype=np.bool_)
+    for ring in rings:
+        if isinstance(ring, Polygon2D):
+            ring = ring.point2d_array.array
+        x0, y0 = ring.T
+        x1, y1 = np.roll(ring, -1, axis=0).T
+        x, y = points[:,0,np.newaxis], points[:,1,np.newaxis]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crosses = ((y0 <= y) != (y1 <= y)) & (x < x0 + (y - y0) * (x1 - x0) / (y1 - y0))
+        is_inside ^= np.sum(crosses, axis=1) % 2 == 1
+    return is_inside
+
+####################################################################################################
+
+class TestBooleanOperation(unittest.TestCase):
+
+    ##############################################
+
+    def _check_areas(self, rings, signed_areas):
+        np_testing.assert_allclose(sorted(polygon_properties(rings)['signed_area']), sorted(signed_areas))
+
+    ##############################################
+
+    def test_squares(self):
+
+        square1 = square(0, 0, 2)
+        square2 = square(1, 1, 2)
+
+        self._check_areas(union(square1, square2), (7,))
+        self._check_areas(intersection(square1, square2), (1,))
+        self._check_areas(difference(square1, square2), (3,))
+        self._check_areas(xor(square1, square2), (3, 3))
+
+        # shared edge and vertex
+        rings = union(square(0, 0, 1), square(1, 0, 1))
+        self.assertEqual(len(rings), 1)
+        self.assertEqual(rings[0].number_of_points, 4)
+        self._check_areas(union(square(0, 0, 1), square(1, 1, 1)), (1, 1))
+        self.assertEqual(intersection(square(0, 0, 1), square(1, 1, 1)), [])
+        self.assertEqual(xor(square1, square1), [])
+
+        # holes are clockwise
+        self._check_areas(difference(square(0, 0, 4), square(1, 1, 2)), (16, -4))
+        self._check_areas(intersection([square(0, 0, 4), square(1, 1, 2)], square(2, 0, 4)), (6,))
+
+        # fill rules of an operand with overlapping rings
+        self._check_areas(union([square1, square2], []), (3, 3))
+        self._check_areas(union([square1, square2], [], 'nonzero'), (7,))
+        self._check_areas(union([square1, square2[::-1]], [], 'nonzero'), (3, 3))
+        self._check_areas(union([square1, square2[::-1]], [], 'positive'), (3,))
+
+        polygon = Polygon2D(*square1)
+        self._check_areas(polygon.union(Polygon2D(*square2)), (7,))
+
+    ##############################################
+
+    def test_random(self):
+
+        operations = {
+            'union': lambda a, b: a | b,
+            'intersection': lambda a, b: a & b,
+            'difference': lambda a, b: a & ~b,
+            'xor': lambda a, b: a ^ b,
+        }
+
+        for seed in range(10):
+            random = np.random.RandomState(seed)
+            number_of_points = random.randint(5, 200)
+            subject = [star(random, number_of_points, (0, 0), 30, 100)]
+            clipping = [star(random, number_of_points, random.uniform(-50, 50, 2), 20, 90)]
+            if seed % 3 == 0:
+                # hole
+                subject.append(star(random, 20, (0, 0), 5, 15))
+            if seed % 5 == 0:
+                # shared vertices
+                clipping = [subject[0][::3].copy()]
+            points = random.uniform(-160, 160, (2000, 2))
+            is_inside_subject = is_inside(subject, points)
+            is_inside_clipping = is_inside(clipping, points)
+            for operation, function in operations.items():
+                rings = boolean_operation(subject, clipping, operation)
+                np_testing.assert_array_equal(is_inside(rings, points),
+                                              function(is_inside_subject, is_inside_clipping))
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,77 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+####################################################################################################
+####################################################################################################
+
+import unittest
+
+import numpy as np
+import numpy.testing as np_testing
+
+from Patro.GeometryEngine.BoundingBox import *
+from Patro.GeometryEngine.PointArray import Point2DArray
+from Patro.GeometryEngine.Vector import Vector2D
+
+####################################################################################################
+
+class TestConvexHull(unittest.TestCase):
+
+    ##############################################
+
+    def test_convex_hull(self):
+
+        points = [Vector2D(0, 0), Vector2D(1, 0), Vector2D(2, 0), Vector2D(1, 1), Vector2D(1, .5),
+                  Vector2D(0, 0)]
+        # duplicated and collinear points are removed, counter-clockwise order
+        self.assertEqual(convex_hull(points), [Vector2D(0, 0), Vector2D(2, 0), Vector2D(1, 1)])
+
+        grid = np.array([(x, y) for x in range(20) for y in range(20)], dtype=np.float64)
+        np_testing.assert_equal(convex_hull(grid), ((0, 0), (19, 0), (19, 19), (0, 19)))
+
+        random = np.random.RandomState(0)
+        array = random.uniform(0, 100, (10000, 2))
+        hull = convex_hull(Point2DArray(array))
+        self.assertIsInstance(hull, Point2DArray)
+        # all the points are on the left of the edges
+        for p0, p1 in zip(hull.array, np.roll(hull.array, -1, axis=0)):
+            cross = (p1[0] - p0[0])*(array[:,1] - p0[1]) - (p1[1] - p0[1])*(array[:,0] - p0[0])
+            self.assertTrue(np.all(cross >= -1e-9))
+
+        self.assertEqual(convex_hull([]), [])
+        self.assertEqual(convex_hull(np.zeros((0, 2))).shape, (0, 2))
+        self.assertEqual(convex_hull([Vector2D(1, 2)]), [Vector2D(1, 2)])
+
+    ##############################################
+
+    def test_bounding_box_from_points(self):
+
+        points = [Vector2D(1, 2), Vector2D(-1, 5), Vector2D(3, 0)]
+        for argument in (points, np.array([(1, 2), (-1, 5), (3, 0)]), Point2DArray(points)):
+            bounding_box = bounding_box_from_points(argument)
+            self.assertEqual((bounding_box.x.inf, bounding_box.x.sup), (-1, 3))
+            self.assertEqual((bounding_box.y.inf, bounding_box.y.sup), (0, 5))
+        self.assertIsNone(bounding_box_from_points([]))
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
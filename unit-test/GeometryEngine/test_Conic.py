@@ -22,6 +22,9 @@
 
 import unittest
 
+import numpy as np
+import numpy.testing as np_testing
+
 from Patro.GeometryEngine.Conic import *
 from Patro.GeometryEngine.Vector import Vector2D
 
@@ -35,6 +38,133 @@ class TestConic(unittest.TestCase):
 
         pass
 
+    ##############################################
+
+    def test_angular_domain(self):
+
+        angles = np.arange(-360, 725, 5)
+        for start, stop in ((30, 200), (300, 30), (300, -45), (350, 370), (0, 360)):
+            domain = AngularDomain(start, stop)
+            np_testing.assert_array_equal(domain.is_inside_array(angles),
+                                          [domain.is_inside(angle) for angle in angles])
+
+        # the arc is swept from start to stop
+        domain = AngularDomain(300, 30)
+        self.assertTrue(domain.is_clockwise)
+        self.assertTrue(domain.is_inside(100))
+        self.assertFalse(domain.is_inside(0))
+        self.assertAlmostEqual(domain.length, np.radians(270))
+        domain = AngularDomain(300, 390)
+        self.assertTrue(domain.is_counterclockwise)
+        self.assertTrue(domain.is_inside(0))
+        self.assertFalse(domain.is_inside(100))
+        self.assertAlmostEqual(domain.length, np.pi/2)
+
+        # the circles and the ellipses agree
+        for domain in (AngularDomain(300, 30), AngularDomain(300, 390)):
+            circle = Circle2D(Vector2D(1, 2), 3, domain=domain)
+            ellipse = Ellipse2D(Vector2D(1, 2), 3, 3, 0, domain)
+            self.assertAlmostEqual(circle.perimeter, ellipse.length, places=3)
+            for conic in (circle, ellipse):
+                polyline = conic.flatten(1e-3).array
+                np_testing.assert_allclose(polyline[0], (circle.start_point.x, circle.start_point.y), atol=1e-9)
+                np_testing.assert_allclose(polyline[-1], (circle.stop_point.x, circle.stop_point.y), atol=1e-9)
+                middle = conic.point_at_angle((domain.start + domain.stop) / 2)
+                self.assertLess(np.min(np.hypot(*(polyline - (middle.x, middle.y)).T)), .1)
+
+    ##############################################
+
+    def test_ellipse_distance(self):
+
+        random = np.random.RandomState(0)
+        points = random.uniform(-8, 10, (200, 2))
+        points[0] = (1, 2)
+        for radius_x, radius_y, angle, domain in (
+                (5, 3, 30, None),
+                (3, 5, -20, None),
+                (4, 4, 0, None),
+                (6, 2, 10, AngularDomain(30, 200)),
+                (6, 2, 10, AngularDomain(300, -45)),
+        ):
+            ellipse = Ellipse2D(Vector2D(1, 2), radius_x, radius_y, angle, domain)
+            distances, feet = ellipse.distances_to_points(points)
+            if domain is None:
+                angles = np.linspace(0, 360, 100001)
+            else:
+                angles = np.linspace(domain.start, domain.stop, 100001)
+            samples = ellipse._points_at_angles(angles)
+            def distances_to_samples(points):
+                return np.min(np.hypot(*(points[:,np.newaxis] - samples).transpose(2, 0, 1)), axis=1)
+            # the feet lie on the arc and are at least as close as the samples
+            self.assertLess(np.max(distances_to_samples(feet)), 1e-3)
+            expected = distances_to_samples(points)
+            self.assertTrue(np.all(distances <= expected + 1e-12))
+            np_testing.assert_allclose(distances, expected, atol=1e-3)
+            np_testing.assert_allclose(np.hypot(*(feet - points).T), distances, atol=1e-12)
+            for point, distance in zip(points[:10], distances):
+                self.assertAlmostEqual(ellipse.distance_to_point(Vector2D(*point)), distance)
+
+    ##############################################
+
+    def test_svg_arc(self):
+
+        point1, point2 = Vector2D(0, 0), Vector2D(20, 5)
+        for angle in (0, 30):
+            for large_arc in (False, True):
+                for sweep in (False, True):
+                    arc = Ellipse2D.svg_arc(point1, point2, 15, 10, angle, large_arc, sweep)
+                    polyline = arc.flatten().array
+                    np_testing.assert_allclose(polyline[[0, -1]], ((0, 0), (20, 5)), atol=1e-9)
+                    # the sweep flag selects increasing angles
+                    self.assertEqual(arc.domain.is_counterclockwise, sweep)
+                    self.assertEqual(arc.domain.span > 180, large_arc)
+                    length = np.sum(np.hypot(*np.diff(polyline, axis=0).transpose()))
+                    self.assertAlmostEqual(arc.length, length, places=1)
+
+        # the radii are too small for the chord, they are scaled and the arc is a half ellipse
+        for angle in (0, 30, 75):
+            for radius_x, radius_y in ((1, 1), (1, 3), (2.5, 0.5)):
+                for large_arc in (False, True):
+                    for sweep in (False, True):
+                        arc = Ellipse2D.svg_arc(point1, point2, radius_x, radius_y, angle, large_arc, sweep)
+                        values = (arc.center.x, arc.center.y, arc.domain.start, arc.domain.stop)
+                        self.assertFalse(np.any(np.isnan(values)))
+                        polyline = arc.flatten().array
+                        np_testing.assert_allclose(polyline[[0, -1]], ((0, 0), (20, 5)), atol=1e-9)
+                        np_testing.assert_allclose((arc.center.x, arc.center.y), (10, 2.5), atol=1e-6)
+                        self.assertAlmostEqual(arc.domain.span, 180, places=4)
+                        self.assertEqual(arc.domain.is_counterclockwise, sweep)
+
+    ##############################################
+
+    def test_arc_bounding_box(self):
+
+        for domain in (None, AngularDomain(30, 200), AngularDomain(300, -45), AngularDomain(350, 10),
+                       AngularDomain(300, 30), AngularDomain(300, 390)):
+            conics = [Ellipse2D(Vector2D(1, 2), radius_x, radius_y, angle, domain)
+                      for radius_x, radius_y, angle in ((5, 3, 30), (3, 5, -20), (6, 2, 110))]
+            circle = Circle2D(Vector2D(1, 2), 3)
+            circle.domain = domain
+            conics.append(circle)
+            for conic in conics:
+                bounding_box = conic.bounding_box
+                polyline = conic.flatten(1e-8).array
+                np_testing.assert_allclose(
+                    (bounding_box.x.inf, bounding_box.y.inf, bounding_box.x.sup, bounding_box.y.sup),
+                    np.concatenate((polyline.min(axis=0), polyline.max(axis=0))), atol=1e-6)
+            # a circle and a circular ellipse have the same arc
+            bounding_box = Ellipse2D(Vector2D(1, 2), 3, 3, 0, domain).bounding_box
+            np_testing.assert_allclose(
+                (bounding_box.x.inf, bounding_box.y.inf, bounding_box.x.sup, bounding_box.y.sup),
+                (circle.bounding_box.x.inf, circle.bounding_box.y.inf,
+                 circle.bounding_box.x.sup, circle.bounding_box.y.sup), atol=1e-12)
+
+        # the cached bounding box follows the changes
+        ellipse = Ellipse2D(Vector2D(0, 0), 5, 3)
+        self.assertEqual(ellipse.bounding_box.x.sup, 5)
+        ellipse.radius_x = 6
+        self.assertEqual(ellipse.bounding_box.x.sup, 6)
+
 ####################################################################################################
 
 if __name__ == '__main__':
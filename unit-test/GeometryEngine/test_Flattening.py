@@ -0,0 +1,143 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+####################################################################################################
+####################################################################################################
+
+import unittest
+
+import numpy as np
+import numpy.testing as np_testing
+
+from Patro.GeometryEngine.Bezier import QuadraticBezier2D, CubicBezier2D
+from Patro.GeometryEngine.Conic import AngularDomain, Circle2D, Ellipse2D
+from Patro.GeometryEngine.Flattening import *
+from Patro.GeometryEngine.Path import Path2D
+from Patro.GeometryEngine.Spline import BSpline2D
+from Patro.GeometryEngine.Vector import Vector2D
+
+####################################################################################################
+
+def max_distance(points, polyline):
+
+    """Return the maximum distance of *points* to a polyline"""
+
+    start = polyline[:-1][:,np.newaxis]
+    direction = polyline[1:][:,np.newaxis] - start
+    offset = points[np.newaxis] - start
+    s = np.einsum('ijk,ijk->ij', offset, direction) / np.einsum('ijk,ijk->ij', direction, direction)
+    delta = offset - direction * np.clip(s, 0, 1)[...,np.newaxis]
+    return np.max(np.min(np.hypot(delta[...,0], delta[...,1]), axis=0))
+
+####################################################################################################
+
+class TestFlattening(unittest.TestCase):
+
+    ##############################################
+
+    def test_bezier(self):
+
+        t = np.linspace(0, 1, 1001)
+        for curve in (
+                QuadraticBezier2D(Vector2D(0, 0), Vector2D(50, 100), Vector2D(100, 0)),
+                CubicBezier2D(Vector2D(0, 0), Vector2D(40, 50), Vector2D(60, -50), Vector2D(100, 0)),
+        ):
+            for tolerance in (1, .1, .01):
+                polyline = curve.flatten(tolerance)
+                self.assertTrue(polyline[0].almost_equal(curve.start_point))
+                self.assertTrue(polyline[-1].almost_equal(curve.end_point))
+                self.assertLessEqual(max_distance(curve.point_at_t(t), polyline.array), tolerance)
+
+        # a line is flat
+        curve = CubicBezier2D(Vector2D(0, 0), Vector2D(10, 0), Vector2D(20, 0), Vector2D(30, 0))
+        self.assertEqual(len(curve.flatten(.1)), 2)
+
+    ##############################################
+
+    def test_cache(self):
+
+        curve = CubicBezier2D(Vector2D(0, 0), Vector2D(40, 50), Vector2D(60, -50), Vector2D(100, 0))
+        polyline = curve.flatten(.1)
+        self.assertIs(curve.flatten(.1), polyline)
+        self.assertIsNot(curve.flatten(.2), polyline)
+        self.assertFalse(polyline.array.flags.writeable)
+        curve.p3 = Vector2D(200, 0)
+        self.assertTrue(curve.flatten(.1)[-1].almost_equal(Vector2D(200, 0)))
+
+    ##############################################
+
+    def test_spline(self):
+
+        points = [Vector2D(*point) for point in ((0, 0), (30, 50), (60, 60), (100, 80), (150, 100), (190, 150))]
+        spline = BSpline2D(points, 3)
+        polyline = spline.flatten(.1)
+        t = np.linspace(0, spline.end_knot, 1001)
+        self.assertLessEqual(max_distance(spline.point_at_t(t), polyline.array), .1)
+
+    ##############################################
+
+    def test_conic(self):
+
+        circle = Circle2D(Vector2D(10, 10), 10)
+        polyline = circle.flatten(.1)
+        self.assertTrue(polyline[0].almost_equal(polyline[-1]))
+        # the sagitta is lower than the tolerance
+        middles = (polyline.array[1:] + polyline.array[:-1]) / 2
+        distances = 10 - np.hypot(*(middles - (10, 10)).transpose())
+        self.assertLessEqual(np.max(distances), .1)
+
+        arc = Circle2D(Vector2D(0, 0), 10, domain=AngularDomain(350, 370))
+        polyline = arc.flatten(.01)
+        self.assertTrue(polyline[0].almost_equal(arc.point_at_angle(350)))
+        self.assertTrue(polyline[-1].almost_equal(arc.point_at_angle(10)))
+        self.assertTrue(np.all(polyline.x > 9))
+
+        ellipse = Ellipse2D(Vector2D(1, 1), 20, 10, 30)
+        polyline = ellipse.flatten(.1)
+        angles = np.linspace(0, 360, 1001)
+        points = np.array([ellipse.point_at_angle(angle).v for angle in angles])
+        self.assertLessEqual(max_distance(points, polyline.array), .1)
+
+    ##############################################
+
+    def test_path(self):
+
+        path = Path2D.rounded_rectangle(Vector2D(0, 0), 100, 50, radius=5)
+        polyline = path.flatten(.1)
+        self.assertTrue(polyline[0].almost_equal(polyline[-1]))
+        np_testing.assert_almost_equal(polyline.bounding_box.x.length, 100)
+        np_testing.assert_almost_equal(polyline.bounding_box.y.length, 50)
+
+        path = Path2D(Vector2D(0, 0))
+        path.line_to(Vector2D(10, 0))
+        path.cubic_to(Vector2D(10, 10), Vector2D(20, 10), Vector2D(20, 0))
+        polyline = path.flatten(.1)
+        self.assertTrue(polyline[0].almost_equal(Vector2D(0, 0)))
+        self.assertTrue(polyline[1].almost_equal(Vector2D(10, 0)))
+        self.assertTrue(polyline[-1].almost_equal(Vector2D(30, 0)))
+        self.assertIs(path.flatten(.1), polyline)
+        path.line_to(Vector2D(10, 0))
+        self.assertTrue(path.flatten(.1)[-1].almost_equal(Vector2D(40, 0)))
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
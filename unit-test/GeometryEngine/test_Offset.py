@@ -0,0 +1,233 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+####################################################################################################
+
+import math
+import unittest
+
+import numpy as np
+import numpy.testing as np_testing
+
+from Patro.GeometryEngine.Bezier import CubicBezier2D, QuadraticBezier2D
+from Patro.GeometryEngine.Offset import *
+from Patro.GeometryEngine.Polygon import Polygon2D, polygon_properties
+from Patro.GeometryEngine.Polyline import Polyline2D
+from Patro.GeometryEngine.Spline import BSpline2D
+from Patro.GeometryEngine.Vector import Vector2D
+
+####################################################################################################
+
+def square(x, y, size):
+    return np.array(((x, y), (x + size, y), (x + size, y + size), (x, y + size)), dtype=np.float64)
+
+def star(random, number_of_points, radius_min, radius_max):
+    angles = np.sort(random.uniform(0, 2*np.pi, number_of_points))
+    radius = random.uniform(radius_min, radius_max, number_of_points)
+    return np.stack((radius * np.cos(angles), radius * np.sin(angles)), axis=1)
+
+def is_inside(rings, points):
+    # even-odd crossing number
+    is_inside = np.zeros(points.shape[0], dtype=np.bool_)
+    for ring in rings:
+        x0, y0 = ring.T
+        x1, y1 = np.roll(ring, -1, axis=0).T
+        x, y = points[:,0,np.newaxis], points[:,1,np.newaxis]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crosses = ((y0 <= y) != (y1 <= y)) & (x < x0 + (y - y0) * (x1 - x0) / (y1 - y0))
+        is_inside ^= np.sum(crosses, axis=1) % 2 == 1
+    return is_inside
+
+def distance_to_polyline(polyline, points):
+    start = polyline[np.newaxis,:-1]
+    direction = polyline[np.newaxis,1:] - start
+    offset = points[:,np.newaxis] - start
+    length_square = np.maximum(np.sum(direction * direction, axis=2), 1e-300)
+    s = np.clip(np.sum(offset * direction, axis=2) / length_square, 0, 1)
+    delta = offset - direction * s[...,np.newaxis]
+    return np.min(np.hypot(delta[...,0], delta[...,1]), axis=1)
+
+def distance_to_ring(ring, points):
+    return distance_to_polyline(np.concatenate((ring, ring[:1])), points)
+
+####################################################################################################
+
+class TestOffset(unittest.TestCase):
+
+    ##############################################
+
+    def _check_areas(self, rings, signed_areas, **kwargs):
+        np_testing.assert_allclose(sorted(polygon_properties(rings)['signed_area']), sorted(signed_areas),
+                                   **kwargs)
+
+    ##############################################
+
+    def test_square(self):
+
+        polygon = square(0, 0, 10)
+        # the orientation of a polygon doesn't matter
+        for ring in (polygon, polygon[::-1]):
+            rings, = offset_polygons([ring], 1)
+            self.assertEqual(len(rings), 1)
+            np_testing.assert_allclose(rings[0], square(-1, -1, 12))
+            self._check_areas(offset_polygons([ring], 1, join='bevel')[0], (144 - 2,))
+            self._check_areas(offset_polygons([ring], 1, join='round', tolerance=1e-4)[0], (140 + math.pi,),
+                              rtol=1e-5)
+            self._check_areas(offset_polygons([ring], -1)[0], (64,))
+            # collapse
+            self.assertEqual(offset_polygons([ring], -6), [[]])
+
+        # miter limit
+        triangle = np.array(((0, 0), (10, 0), (0, 1)), dtype=np.float64)
+        rings, = offset_polygons([triangle], 1, miter_limit=100)
+        self.assertEqual(rings[0].shape[0], 3)
+        rings, = offset_polygons([triangle], 1)
+        self.assertEqual(rings[0].shape[0], 4)
+
+        # several polygons with distinct distances
+        results = offset_polygons([polygon, square(20, 0, 4)], (1, -1))
+        self._check_areas(results[0], (144,))
+        self._check_areas(results[1], (4,))
+
+        # an empty piece gives an empty result
+        empty = np.zeros((0, 2))
+        results = offset_polygons([polygon, empty, square(20, 0, 4), empty], (1, 1, -1, 1))
+        self.assertEqual(len(results), 4)
+        self._check_areas(results[0], (144,))
+        self._check_areas(results[2], (4,))
+        self.assertEqual((results[1], results[3]), ([], []))
+        self.assertEqual(offset_polygons([empty], 1), [[]])
+
+        polygon = Polygon2D(*[Vector2D(x, y) for x, y in polygon])
+        offset_polygon, = polygon.offset(1, join='round')
+        self.assertIsInstance(offset_polygon, Polygon2D)
+
+    ##############################################
+
+    def test_notch(self):
+
+        # a notch narrower than twice the distance is filled
+        polygon = np.array(((0, 0), (10, 0), (10, 10), (5.5, 10), (5.5, 5), (4.5, 5), (4.5, 10), (0, 10)),
+                           dtype=np.float64)
+        self._check_areas(offset_polygons([polygon], 1)[0], (144,))
+
+        # a neck splits the polygon
+        polygon = np.array(((0, 0), (4, 0), (4, 1.8), (6, 1.8), (6, 0), (10, 0),
+                            (10, 4), (6, 4), (6, 2.2), (4, 2.2), (4, 4), (0, 4)), dtype=np.float64)
+        self._check_areas(offset_polygons([polygon], -0.5)[0], (9, 9))
+
+    ##############################################
+
+    def test_polyline(self):
+
+        polyline = np.array(((0, 0), (10, 0), (10, 10)), dtype=np.float64)
+        parts, = offset_polylines([polyline], 1)
+        np_testing.assert_allclose(parts[0], ((0, 1), (9, 1), (9, 10)))
+        parts, = offset_polylines([polyline], -1, join='round')
+        np_testing.assert_allclose(parts[0][[0, 1, -2, -1]], ((0, -1), (10, -1), (11, 0), (11, 10)))
+        np_testing.assert_allclose(distance_to_ring(polyline, parts[0][1:-1]), 1)
+
+        # the loops are removed
+        polyline = np.array(((0, 0), (10, 0), (10, 1), (11, 1), (11, 0), (20, 0)), dtype=np.float64)
+        parts, = offset_polylines([polyline], 2)
+        np_testing.assert_allclose(parts[0], ((0, 2), (8, 2), (8, 3), (13, 3), (13, 2), (20, 2)))
+        parts, = offset_polylines([polyline], -2)
+        np_testing.assert_allclose(parts[0], ((0, -2), (9, -2), (20, -2)))
+        polyline = np.array(((0, 0), (10, 0), (10, 10), (5, 10), (5, -5)), dtype=np.float64)
+        parts, = offset_polylines([polyline], 1)
+        np_testing.assert_allclose(parts[0], ((0, 1), (6, 1), (6, -5)))
+
+        polyline = Polyline2D(*[Vector2D(x, y) for x, y in polyline])
+        offset_polyline, = polyline.offset(-1)
+        self.assertIsInstance(offset_polyline, Polyline2D)
+
+    ##############################################
+
+    def test_curve(self):
+
+        tolerance = 0.01
+        cubic = CubicBezier2D(Vector2D(0, 0), Vector2D(100, 200), Vector2D(300, 200), Vector2D(400, 0))
+        quadratic = QuadraticBezier2D(Vector2D(0, 0), Vector2D(100, 200), Vector2D(300, 0))
+        spline = BSpline2D([Vector2D(x, y) for x, y in ((0, 0), (50, 100), (100, 0), (150, 100), (200, 0))], 3)
+        for curve, t0, t1 in ((cubic, 0, 1), (quadratic, 0, 1), (spline, spline.start_knot, spline.end_knot)):
+            for distance in (5, -20):
+                curves = curve.offset(distance, tolerance)
+                for curve1, curve2 in zip(curves[:-1], curves[1:]):
+                    self.assertEqual(curve1.p3, curve2.p0)
+                t = np.linspace(t0, t1, 501)
+                points = curve.point_at_t(t)
+                tangents = curve.tangent_at(t)
+                tangents /= np.hypot(tangents[:,0], tangents[:,1])[:,np.newaxis]
+                expected = points + distance * np.stack((-tangents[:,1], tangents[:,0]), axis=1)
+                approximation = np.concatenate([part.flatten(tolerance / 10).array for part in curves])
+                distances = distance_to_polyline(approximation, expected)
+                self.assertLess(np.max(distances), 1.1*tolerance)
+
+    ##############################################
+
+    def test_cusp(self):
+
+        # the radius of curvature of the cubic is between 56.25 and 140 and the one of the quadratic
+        # between 12.5 and 140, on the right
+        tolerance = 0.01
+        cubic = CubicBezier2D(Vector2D(0, 0), Vector2D(100, 200), Vector2D(300, 200), Vector2D(400, 0))
+        quadratic = QuadraticBezier2D(Vector2D(0, 0), Vector2D(100, 200), Vector2D(200, 0))
+        # the true offset is also compared between the samples of the fits
+        t = np.linspace(0, 1, 4001)
+        # the offset has two cusps, then it runs backward
+        for curve, distance in ((cubic, -100), (cubic, -300), (quadratic, -50)):
+            points = curve.point_at_t(t)
+            tangents = curve.tangent_at(t)
+            tangents /= np.hypot(tangents[:,0], tangents[:,1])[:,np.newaxis]
+            curves = curve.offset(distance, tolerance)
+            self.assertLess(len(curves), 50)
+            for curve1, curve2 in zip(curves[:-1], curves[1:]):
+                self.assertEqual(curve1.p3, curve2.p0)
+            expected = points + distance * np.stack((-tangents[:,1], tangents[:,0]), axis=1)
+            approximation = np.concatenate([part.flatten(tolerance / 10).array for part in curves])
+            self.assertLess(np.max(distance_to_polyline(approximation, expected)), 1.1*tolerance)
+            self.assertLess(np.max(distance_to_polyline(expected, approximation)), 1.1*tolerance)
+
+    ##############################################
+
+    def test_random(self):
+
+        tolerance = 0.01
+        for seed in range(10):
+            random = np.random.RandomState(seed)
+            polygon = star(random, random.randint(4, 60), 30, 100)
+            distance = random.choice((3., 10., 25., -3., -10.))
+            rings, = offset_polygons([polygon], distance, join='round', tolerance=tolerance)
+            points = random.uniform(-140, 140, (2000, 2))
+            is_inside_polygon = is_inside([polygon], points)
+            distances = distance_to_ring(polygon, points)
+            if distance > 0:
+                expected = is_inside_polygon | (distances < distance)
+            else:
+                expected = is_inside_polygon & (distances > -distance)
+            # skip the points near the offset
+            is_far = np.abs(distances - abs(distance)) > 2*tolerance
+            np_testing.assert_array_equal(is_inside(rings, points)[is_far], expected[is_far])
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,142 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+####################################################################################################
+
+import unittest
+
+import numpy as np
+import numpy.testing as np_testing
+
+from Patro.GeometryEngine.PackedPath import *
+from Patro.GeometryEngine.Path import Path2D
+from Patro.GeometryEngine.Transformation import AffineTransformation2D
+from Patro.GeometryEngine.Vector import Vector2D
+
+####################################################################################################
+
+def distance_to_polyline(points, polyline):
+    start = polyline[np.newaxis,:-1]
+    direction = polyline[np.newaxis,1:] - start
+    offset = points[:,np.newaxis] - start
+    length_square = np.maximum(np.sum(direction * direction, axis=2), 1e-300)
+    s = np.clip(np.sum(offset * direction, axis=2) / length_square, 0, 1)
+    delta = offset - direction * s[...,np.newaxis]
+    return np.max(np.min(np.hypot(delta[...,0], delta[...,1]), axis=1))
+
+def hausdorff_distance(polyline1, polyline2):
+    return max(distance_to_polyline(polyline1, polyline2), distance_to_polyline(polyline2, polyline1))
+
+####################################################################################################
+
+class TestPackedPath(unittest.TestCase):
+
+    ##############################################
+
+    def make_paths(self, with_arc=True):
+
+        path1 = Path2D(Vector2D(0, 0))
+        path1.east_to(10)
+        path1.north_to(10, radius=2)
+        path1.line_to(Vector2D(-3, 2), radius=1)
+        path1.cubic_to(Vector2D(1, 1), Vector2D(2, -1), Vector2D(3, 0))
+        path1.quadratic_to(Vector2D(2, 2), Vector2D(4, 0))
+        if with_arc:
+            path1.arc_to(Vector2D(5, 5), 30, 20, 30, False, True)
+        path1.line_to(Vector2D(1, -2))
+        path1.close(radius=1, close_radius=1.5)
+
+        path2 = Path2D.rounded_rectangle(Vector2D(30, 0), 20, 10, radius=2)
+
+        path3 = Path2D(Vector2D(0, 20))
+        path3.line_to(Vector2D(10, 30), absolute=True)
+        path3.cubic_to(Vector2D(15, 35), Vector2D(20, 25), Vector2D(25, 30), absolute=True)
+
+        return path1, path2, path3
+
+    ##############################################
+
+    def test_conversion(self):
+
+        paths = self.make_paths()
+        packed_path = PackedPath2D.from_paths(paths)
+        self.assertEqual(packed_path.number_of_paths, 3)
+        self.assertEqual(packed_path.commands.dtype, np.uint8)
+        self.assertEqual(packed_path.coordinates.shape, (22, 2))
+        self.assertEqual(packed_path.arcs.shape, (1, 5))
+        np_testing.assert_array_equal(packed_path.commands[:9], (0, 1, 1, 1, 3, 2, 4, 1, 5))
+        np_testing.assert_array_equal(packed_path.radii[:4], (np.nan, 1.5, 2, 1))
+
+        unpacked_paths = packed_path.to_paths()
+        self.assertEqual(len(unpacked_paths), 3)
+        for path, unpacked_path in zip(paths, unpacked_paths):
+            self.assertEqual(path.is_closed, unpacked_path.is_closed)
+            np_testing.assert_allclose(unpacked_path.flatten(.01).array, path.flatten(.01).array, atol=1e-12)
+
+        bounding_box = packed_path.bounding_box
+        expected = paths[0].bounding_box | paths[1].bounding_box | paths[2].bounding_box
+        np_testing.assert_allclose((bounding_box.x.inf, bounding_box.x.sup, bounding_box.y.inf, bounding_box.y.sup),
+                                   (expected.x.inf, expected.x.sup, expected.y.inf, expected.y.sup))
+
+    ##############################################
+
+    def test_transformation(self):
+
+        transformation = AffineTransformation2D.RotationAt(Vector2D(1, 2), 33) * AffineTransformation2D.Scale(2, -2)
+
+        packed_path = PackedPath2D.from_paths(self.make_paths())
+        transformed_path = packed_path.transform(transformation, clone=True)
+        np_testing.assert_allclose(transformed_path.coordinates, transformation.apply_to_array(packed_path.coordinates))
+        np_testing.assert_allclose(transformed_path.radii[:4], (np.nan, 3, 4, 2))
+        # the reflection maps the angle 30 to -30 and inverts the sweep flag
+        radius_x, radius_y, angle, large_arc, sweep = transformed_path.arcs[0]
+        np_testing.assert_allclose((radius_x, radius_y, angle % 180, large_arc, sweep), (60, 40, 3, 0, 0))
+
+        paths = self.make_paths(with_arc=False)
+        transformed_path = PackedPath2D.from_paths(paths).transform(transformation)
+        for path, transformed_path in zip(paths, transformed_path.to_paths()):
+            expected = transformation.apply_to_array(path.flatten(.001).array)
+            self.assertLess(hausdorff_distance(transformed_path.flatten(.001).array, expected), .01)
+
+    ##############################################
+
+    def test_reversed(self):
+
+        packed_path = PackedPath2D.from_paths(self.make_paths())
+        reversed_path = packed_path.reversed()
+        np_testing.assert_array_equal(reversed_path.commands[:9], (0, 1, 1, 4, 2, 3, 1, 1, 5))
+        np_testing.assert_array_equal(reversed_path.arcs[:,4], 1 - packed_path.arcs[:,4])
+        twice_reversed_path = reversed_path.reversed()
+        np_testing.assert_array_equal(twice_reversed_path.commands, packed_path.commands)
+        np_testing.assert_array_equal(twice_reversed_path.coordinates, packed_path.coordinates)
+        np_testing.assert_array_equal(twice_reversed_path.radii, packed_path.radii)
+        np_testing.assert_array_equal(twice_reversed_path.arcs, packed_path.arcs)
+
+        paths = self.make_paths(with_arc=False)
+        reversed_paths = PackedPath2D.from_paths(paths).reversed().to_paths()
+        for path, reversed_path in zip(paths, reversed_paths):
+            self.assertLess(hausdorff_distance(reversed_path.flatten(.001).array, path.flatten(.001).array), 1e-9)
+            self.assertEqual(tuple(reversed_path.p0), tuple(path.stop_segment.stop_point))
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
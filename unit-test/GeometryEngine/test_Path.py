@@ -22,18 +22,133 @@
 
 import unittest
 
+import numpy as np
+
 from Patro.GeometryEngine.Path import *
+from Patro.GeometryEngine.Transformation import AffineTransformation2D
 from Patro.GeometryEngine.Vector import Vector2D
 
 ####################################################################################################
 
+def polyline_length(polyline):
+    return float(np.sum(np.hypot(*np.diff(polyline.array, axis=0).transpose())))
+
+####################################################################################################
+
 class TestPath(unittest.TestCase):
 
     ##############################################
 
-    def test(self):
+    def _make_path(self, y=10):
+        path = Path2D(Vector2D(0, 0))
+        path.line_to(Vector2D(10, 0))
+        path.line_to(Vector2D(10, y), radius=3)
+        path.line_to(Vector2D(0, 10), radius=2)
+        path.cubic_to(Vector2D(-10, 5), Vector2D(-5, 20), Vector2D(-20, 30))
+        path.quadratic_to(Vector2D(5, 5), Vector2D(10, -5))
+        return path
+
+    ##############################################
+
+    def test_length(self):
+
+        path = Path2D.rounded_rectangle(Vector2D(0, 0), 100, 50, radius=10)
+        self.assertAlmostEqual(path.length, 2*(80 + 30) + 2*np.pi*10)
+        self.assertAlmostEqual(path.length, polyline_length(path.flatten(1e-6)), places=4)
+
+        path = self._make_path()
+        lengths = path.cumulative_lengths
+        self.assertEqual(lengths.shape, (len(path) + 1,))
+        self.assertEqual(lengths[0], 0)
+        self.assertTrue(np.all(np.diff(lengths) > 0))
+        self.assertAlmostEqual(path.length, polyline_length(path.flatten(1e-6)), places=4)
+
+    ##############################################
+
+    def test_cache(self):
+
+        path = self._make_path()
+        self.assertIs(path.cumulative_lengths, path.cumulative_lengths)
+        self.assertIs(path.flatten(), path.flatten())
+        bounding_box = path.bounding_box
+        x_sup = bounding_box.x.sup
+        bounding_box |= Vector2D(1000, 1000).bounding_box
+        self.assertEqual(path.bounding_box.x.sup, x_sup)
+
+        # add a part
+        length = path.length
+        stop_point = path.stop_segment.stop_point
+        path.line_to(Vector2D(0, 100), absolute=True)
+        self.assertAlmostEqual(path.length - length, (Vector2D(0, 100) - stop_point).magnitude)
+        self.assertEqual(path.bounding_box.y.sup, 100)
+
+        # edit a part, the bulges which follow must be updated
+        path[1].point = Vector2D(10, 20)
+        reference = self._make_path(y=20)
+        reference.line_to(Vector2D(0, 100), absolute=True)
+        self.assertAlmostEqual(path.length, reference.length)
+        np.testing.assert_allclose(path.flatten().array, reference.flatten().array)
+        self.assertEqual(path.bounding_box.y.sup, reference.bounding_box.y.sup)
+
+        # move the start point
+        path.move_to(Vector2D(0, -10))
+        self.assertEqual(path.bounding_box.y.inf, -10)
+
+        # transform
+        length = path.length
+        path.apply_transformation(AffineTransformation2D.Scale(2, 2))
+        self.assertAlmostEqual(path.length, 2*length)
+        self.assertEqual(path.bounding_box.y.inf, -20)
+
+    ##############################################
+
+    def test_length_parametrization(self):
+
+        path = self._make_path()
+        path.arc_to(Vector2D(-40, 40), 20, 20, 0, False, True, absolute=True)
+        path.line_to(Vector2D(-40, 10), absolute=True)
+        path.south_east_to(10, radius=2)
+        path.close(radius=3, close_radius=4)
+
+        polyline = path.flatten(1e-7).array
+        polyline_lengths = np.zeros(polyline.shape[0])
+        np.cumsum(np.hypot(*np.diff(polyline, axis=0).transpose()), out=polyline_lengths[1:])
+        self.assertAlmostEqual(path.length, polyline_lengths[-1], places=5)
+
+        lengths = np.linspace(0, path.length, 1001)
+        points = path.point_at_length(lengths)
+        expected = np.stack([np.interp(lengths, polyline_lengths, polyline[:,i]) for i in range(2)], axis=1)
+        np.testing.assert_allclose(points, expected, atol=1e-5)
+        tangents = path.tangent_at_length(lengths)
+        np.testing.assert_allclose(np.hypot(*tangents.transpose()), 1)
+        # compare to finite differences apart from the corners
+        differences = np.gradient(points, axis=0)
+        differences /= np.hypot(*differences.transpose())[:,np.newaxis]
+        self.assertLess(np.median(np.hypot(*(differences - tangents).transpose())), 1e-6)
+
+        point = path.point_at_length(50)
+        self.assertIsInstance(point, Vector2D)
+        np.testing.assert_allclose(tuple(point), points[np.searchsorted(lengths, 50)], atol=1)
+        self.assertAlmostEqual(path.tangent_at_length(5).x, 1)
+
+        with self.assertRaises(ValueError):
+            path.point_at_length(path.length + 1)
+
+        # split
+        left, right = path.split_at_length(50)
+        self.assertAlmostEqual(left.length, 50, places=5)
+        self.assertAlmostEqual(right.length, path.length - 50, places=5)
+        np.testing.assert_allclose(tuple(left.point_at_length(left.length)), tuple(right.p0), atol=1e-9)
+        np.testing.assert_allclose(tuple(right.point_at_length(10)), tuple(path.point_at_length(60)),
+                                   atol=1e-5)
 
-        pass
+        cuts = [5, 17, 40, 80, 120, 180, 200]
+        paths = path.split_at_length(cuts)
+        self.assertEqual(len(paths), len(cuts) + 1)
+        np.testing.assert_allclose([part.length for part in paths], np.diff([0] + cuts + [path.length]),
+                                   atol=1e-5)
+        for part, cut in zip(paths[1:], cuts):
+            np.testing.assert_allclose(tuple(part.p0), tuple(path.point_at_length(cut)), atol=1e-9)
 
 ####################################################################################################
 
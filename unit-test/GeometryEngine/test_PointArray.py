@@ -0,0 +1,83 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+####################################################################################################
+
+import unittest
+
+import numpy.testing as np_testing
+
+from Patro.GeometryEngine.PointArray import *
+from Patro.GeometryEngine.Polygon import Polygon2D
+from Patro.GeometryEngine.Vector import Vector2D
+
+####################################################################################################
+
+class TestPoint2DArray(unittest.TestCase):
+
+    ##############################################
+
+    def test_vector_api(self):
+
+        vectors = [Vector2D(x, y) for x, y in ((10, 20), (-5, 3), (0, -7), (-4, -4))]
+        points = Point2DArray(vectors)
+        direction = Vector2D(3, 1)
+
+        self.assertEqual(len(points), len(vectors))
+        self.assertEqual(points[1], vectors[1])
+        self.assertListEqual(points.to_vectors(), vectors)
+
+        for name in ('magnitude', 'orientation'):
+            np_testing.assert_almost_equal(getattr(points, name), [getattr(v, name) for v in vectors])
+        for name in ('dot', 'cross', 'projection_on', 'angle_with'):
+            np_testing.assert_almost_equal(getattr(points, name)(direction),
+                                           [getattr(v, name)(direction) for v in vectors])
+        for name in ('normal', 'anti_normal', 'parity'):
+            self.assertTrue(getattr(points, name).almost_equal(
+                Point2DArray([getattr(v, name) for v in vectors])))
+        self.assertTrue(points.rotate(30).almost_equal(Point2DArray([v.rotate(30) for v in vectors])))
+
+        self.assertTrue((points + direction).almost_equal(Point2DArray([v + direction for v in vectors])))
+        self.assertTrue((points * 2).almost_equal(Point2DArray([v * 2 for v in vectors])))
+
+    ##############################################
+
+    def test_primitive(self):
+
+        x, y = 10, 20
+        points = Point2DArray(((x, y), (x, -y), (-x, -y), (-x, y)))
+        polygon = Polygon2D(points)
+        self.assertEqual(polygon.number_of_points, len(points))
+        self.assertEqual(polygon.area, 4*x*y)
+        self.assertEqual(polygon.perimeter, 4*(x+y))
+
+        bounding_box = polygon.bounding_box
+        self.assertEqual(bounding_box.x.inf, -x)
+        self.assertEqual(bounding_box.y.sup, y)
+
+        # vectors share the storage of the array
+        polygon.start_point.x = 2*x
+        self.assertEqual(polygon.point2d_array[0], Vector2D(2*x, y))
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
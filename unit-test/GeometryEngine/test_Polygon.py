@@ -22,6 +22,8 @@
 
 import unittest
 
+import numpy as np
+
 from Patro.GeometryEngine.Polygon import *
 from Patro.GeometryEngine.Vector import Vector2D
 
@@ -51,6 +53,120 @@ class TestPolygon(unittest.TestCase):
         self.assertEqual(polygon.point_barycenter, origin)
         self.assertEqual(polygon.barycenter, origin)
 
+    ##############################################
+
+    def test_is_simple(self):
+
+        square = Polygon2D(Vector2D(0, 0), Vector2D(10, 0), Vector2D(10, 10), Vector2D(0, 10))
+        self.assertTrue(square.is_simple)
+        self.assertTrue(square.is_convex)
+        self.assertEqual(square.self_intersections, [])
+
+        bow_tie = Polygon2D(Vector2D(0, 0), Vector2D(10, 10), Vector2D(10, 0), Vector2D(0, 10))
+        self.assertFalse(bow_tie.is_simple)
+        self.assertFalse(bow_tie.is_convex)
+        self.assertEqual(bow_tie.self_intersections, [Vector2D(5, 5)])
+
+        # a vertex lies on an edge
+        polygon = Polygon2D(Vector2D(0, 0), Vector2D(10, 0), Vector2D(10, 10),
+                            Vector2D(5, 0), Vector2D(0, 10))
+        self.assertEqual(polygon.self_intersections, [Vector2D(5, 0)])
+
+        concave = Polygon2D(Vector2D(0, 0), Vector2D(10, 0), Vector2D(5, 5), Vector2D(10, 10), Vector2D(0, 10))
+        self.assertTrue(concave.is_simple)
+        self.assertFalse(concave.is_convex)
+
+        # comb with vertical edges
+        points = [Vector2D(0, 0)]
+        for i in range(1, 20, 2):
+            points.extend((Vector2D(i, 0), Vector2D(i, 5), Vector2D(i+1, 5), Vector2D(i+1, 0)))
+        points.extend((Vector2D(21, 0), Vector2D(21, 10), Vector2D(0, 10)))
+        self.assertTrue(Polygon2D(*points).is_simple)
+        points[-1] = Vector2D(10, -1)
+        self.assertEqual(len(Polygon2D(*points).self_intersections), 6)
+
+        # star shaped polygon
+        random = np.random.RandomState(0)
+        angles = np.sort(random.uniform(0, 2*np.pi, 1000))
+        radius = random.uniform(50, 100, 1000)
+        points = [Vector2D(x, y) for x, y in zip(radius * np.cos(angles), radius * np.sin(angles))]
+        self.assertTrue(Polygon2D(*points).is_simple)
+        points[500] = points[250] * 2
+        self.assertFalse(Polygon2D(*points).is_simple)
+
+    ##############################################
+
+    def test_properties(self):
+
+        # 4×2 rectangle rotated by 30° and clockwise
+        angle = np.radians(30)
+        rotation = np.array(((np.cos(angle), -np.sin(angle)), (np.sin(angle), np.cos(angle))))
+        vertices = np.array(((0, 0), (0, 2), (4, 2), (4, 0))) @ rotation.T + (5, 7)
+        polygon = Polygon2D(*[Vector2D(x, y) for x, y in vertices])
+
+        self.assertAlmostEqual(polygon.area, 8)
+        self.assertAlmostEqual(polygon.perimeter, 12)
+        np.testing.assert_allclose((polygon.barycenter.x, polygon.barycenter.y), rotation @ (2, 1) + (5, 7))
+        self.assertAlmostEqual(polygon.major_axis_angle, 30)
+        # variances of a uniform 4×2 rectangle are 4²/12 and 2²/12
+        self.assertAlmostEqual(polygon.major_axis, 4 * np.sqrt(16/12))
+        self.assertAlmostEqual(polygon.minor_axis, 4 * np.sqrt(4/12))
+        self.assertAlmostEqual(polygon.axis_ratio, 2)
+
+        triangle = np.array(((0, 0), (3, 0), (0, 3)))
+        properties = polygon_properties([polygon, triangle])
+        np.testing.assert_allclose(properties['area'], (8, 4.5))
+        np.testing.assert_allclose(properties['signed_area'], (-8, 4.5))
+        np.testing.assert_allclose(properties['barycenter'][1], (1, 1))
+        np.testing.assert_allclose(properties['perimeter'], (12, 6 + 3*np.sqrt(2)))
+        self.assertAlmostEqual(properties['major_axis_angle'][0], polygon.major_axis_angle)
+
+        # the properties don't depend on the distance to the origin
+        translated = polygon_properties([vertices + 1e6, vertices])
+        np.testing.assert_allclose(translated['barycenter'][0] - 1e6, translated['barycenter'][1], atol=1e-9)
+        for name in ('area', 'inertia_moment', 'major_axis_angle', 'major_axis', 'minor_axis', 'axis_ratio'):
+            np.testing.assert_allclose(translated[name][0], translated[name][1], rtol=1e-9, atol=1e-9)
+
+        polygon.recenter()
+        np.testing.assert_allclose((polygon.barycenter.x, polygon.barycenter.y), (0, 0), atol=1e-12)
+
+        # the properties of a non simple polygon are not defined
+        bow_tie = Polygon2D(Vector2D(0, 0), Vector2D(10, 10), Vector2D(10, 0), Vector2D(0, 10))
+        for name in ('area', 'barycenter', 'inertia_moment', 'major_axis_angle', 'major_axis',
+                     'minor_axis', 'axis_ratio'):
+            self.assertIsNone(getattr(bow_tie, name))
+        with self.assertRaises(ValueError):
+            bow_tie.recenter()
+
+    ##############################################
+
+    def test_is_point_inside(self):
+
+        concave = Polygon2D(Vector2D(0, 0), Vector2D(10, 0), Vector2D(5, 5), Vector2D(10, 10), Vector2D(0, 10))
+        self.assertTrue(concave.is_point_inside(Vector2D(2, 5)))
+        self.assertFalse(concave.is_point_inside(Vector2D(8, 5)))
+        self.assertFalse(concave.is_point_inside(Vector2D(20, 5)))
+        # clockwise
+        clockwise = Polygon2D(*reversed(list(concave.points)))
+        self.assertTrue(clockwise.is_point_inside(Vector2D(2, 5)))
+
+        # star shaped polygon versus a brute force crossing number
+        random = np.random.RandomState(0)
+        angles = np.sort(random.uniform(0, 2*np.pi, 500))
+        radius = random.uniform(50, 100, 500)
+        vertices = np.stack((radius * np.cos(angles), radius * np.sin(angles)), axis=1)
+        polygon = Polygon2D(*[Vector2D(x, y) for x, y in vertices])
+        points = random.uniform(-110, 110, (2000, 2))
+
+        x0, y0 = vertices.T
+        x1, y1 = np.roll(vertices, -1, axis=0).T
+        x, y = points[:,0,np.newaxis], points[:,1,np.newaxis]
+        crosses = ((y0 <= y) != (y1 <= y)) & (x < x0 + (y - y0) * (x1 - x0) / (y1 - y0))
+        expected = np.sum(crosses, axis=1) % 2 == 1
+
+        np.testing.assert_array_equal(polygon.are_points_inside(points), expected)
+        np.testing.assert_array_equal(PreparedPolygon(vertices, number_of_slabs=1).contains(points), expected)
+
 ####################################################################################################
 
 if __name__ == '__main__':
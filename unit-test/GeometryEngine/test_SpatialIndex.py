@@ -0,0 +1,118 @@
+####################################################################################################
+#
+# Patro - A Python library to make patterns for fashion design
+# Copyright (C) 2019 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+####################################################################################################
+####################################################################################################
+
+import pickle
+import unittest
+
+import numpy as np
+import numpy.testing as np_testing
+
+from IntervalArithmetic import Interval2D
+
+from Patro.GeometryEngine.Segment import Segment2D
+from Patro.GeometryEngine.SpatialIndex import *
+from Patro.GeometryEngine.Vector import Vector2D
+
+####################################################################################################
+
+class TestSpatialIndex(unittest.TestCase):
+
+    ##############################################
+
+    def setUp(self):
+
+        random = np.random.RandomState(0)
+        starts = random.uniform(0, 100, (500, 2))
+        stops = starts + random.uniform(-5, 5, (500, 2))
+        self.segments = [Segment2D(Vector2D(*p0), Vector2D(*p1)) for p0, p1 in zip(starts, stops)]
+        self.boxes = np.concatenate((np.minimum(starts, stops), np.maximum(starts, stops)), axis=1)
+
+    ##############################################
+
+    def _check_index(self, index):
+
+        random = np.random.RandomState(1)
+        for x, y in random.uniform(-10, 110, (20, 2)):
+            window = Interval2D((x, x + 15), (y, y + 10))
+            expected = np.where((self.boxes[:,0] <= x + 15) & (x <= self.boxes[:,2]) &
+                                (self.boxes[:,1] <= y + 10) & (y <= self.boxes[:,3]))[0]
+            np_testing.assert_equal(index.query_indexes(window), expected)
+            self.assertEqual(index.query((x, y, x + 15, y + 10)),
+                             [index.items[i] for i in expected])
+
+            point = Vector2D(x, y)
+            distances = np.array([segment.distance_to_point(point) for segment in self.segments])
+            nearest = index.nearest(point, k=5)
+            np_testing.assert_allclose([distance for segment, distance in nearest],
+                                       np.sort(distances)[:5])
+            self.assertIs(nearest[0][0], index.items[np.argmin(distances)])
+
+        self.assertEqual(index.query(Interval2D((200, 300), (200, 300))), [])
+        self.assertEqual(len(index.nearest((50, 50), k=1000)), len(self.segments))
+
+    ##############################################
+
+    def test_str_tree(self):
+
+        index = STRTree(self.segments)
+        self.assertEqual(len(index), len(self.segments))
+        self.assertEqual(index.depth, 3)
+        self._check_index(index)
+        self._check_index(STRTree(self.segments, bounding_boxes=self.boxes, node_capacity=4))
+
+        index = pickle.loads(pickle.dumps(index))
+        self._check_index(index)
+
+        self.assertEqual(STRTree([]).query((0, 0, 1, 1)), [])
+        self.assertEqual(STRTree([]).nearest((0, 0)), [])
+
+    ##############################################
+
+    def test_grid_index(self):
+
+        index = GridIndex(self.segments)
+        self._check_index(index)
+        self._check_index(GridIndex(self.segments, bounding_boxes=self.boxes, cell_size=40))
+        self._check_index(GridIndex(self.segments, cell_size=1))
+
+        index = pickle.loads(pickle.dumps(index))
+        self._check_index(index)
+
+        self.assertEqual(GridIndex([]).query((0, 0, 1, 1)), [])
+        self.assertEqual(GridIndex([]).nearest((0, 0)), [])
+
+        # points on a line, almost on a line and at the same place
+        x = np.linspace(0, 1e6, 1000)
+        for y in (np.zeros(1000), x * 1e-12, None):
+            points = np.stack((x, y), axis=1) if y is not None else np.zeros((1000, 2))
+            index = GridIndex(list(range(1000)), bounding_boxes=np.concatenate((points, points), axis=1))
+            self.assertLessEqual(np.prod(index.shape), 3 * 4 * 1000 + 1)
+            expected = np.where((points[:,0] >= 2e5) & (points[:,0] <= 3e5))[0]
+            np_testing.assert_equal(index.query_indexes((2e5, -1, 3e5, 1)), expected)
+        self.assertLessEqual(np.prod(GridIndex(self.segments, cell_size=1e-6).shape), 3 * 4 * 500 + 1)
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
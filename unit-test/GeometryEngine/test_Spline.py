@@ -22,10 +22,134 @@
 
 import unittest
 
+import numpy as np
+import numpy.testing as np_testing
+
+from Patro.GeometryEngine.Segment import Segment2D
+from Patro.GeometryEngine.Spline import BSpline2D, CubicUniformSpline2D
 from Patro.GeometryEngine.Vector import Vector2D
 
 ####################################################################################################
 
+class TestCubicUniformSpline(unittest.TestCase):
+
+    ##############################################
+
+    def test_point_at_t_array(self):
+
+        spline = CubicUniformSpline2D(Vector2D(0, 0), Vector2D(3, 5), Vector2D(6, 5), Vector2D(10, 0))
+        t = np.linspace(0, 1, 11)
+        np_testing.assert_almost_equal(spline.point_at_t(t), [spline.point_at_t(x).v for x in t])
+        np_testing.assert_almost_equal(spline.tangent_at(t), [spline.tangent_at(x).v for x in t])
+
+####################################################################################################
+
+class TestBSpline(unittest.TestCase):
+
+    ##############################################
+
+    def test_point_at_t_array(self):
+
+        points = (
+            Vector2D(0, 0),
+            Vector2D(3, 5),
+            Vector2D(6, 6),
+            Vector2D(10, 8),
+            Vector2D(15, 10),
+            Vector2D(19, 15),
+        )
+        for degree in (2, 3):
+            spline = BSpline2D(points, degree)
+            t = np.linspace(0, spline.end_knot, 21)
+            array = spline.point_at_t(t)
+            self.assertEqual(array.shape, (21, 2))
+            np_testing.assert_almost_equal(array, [spline.point_at_t(x).v for x in t])
+            np_testing.assert_almost_equal(spline.basis_matrix(t).sum(axis=1), 1)
+            # compare the derivative to finite differences
+            t = np.linspace(.1, spline.end_knot - .1, 9)
+            h = 1e-6
+            derivative = (spline.point_at_t(t + h) - spline.point_at_t(t - h)) / (2*h)
+            np_testing.assert_almost_equal(spline.tangent_at(t), derivative, decimal=5)
+            self.assertTrue(spline.tangent_at(1.5).almost_equal(Vector2D(*spline.tangent_at(np.array([1.5]))[0])))
+
+        # non uniform knots with a double knot
+        knots = (0, 0, 0, 0, 1, 1, 2.5, 4, 4, 4, 4)
+        spline = BSpline2D(points + (Vector2D(25, 12),), 3, knots=knots)
+        t = np.linspace(0, 4, 41)
+        array = spline.point_at_t(t)
+        np_testing.assert_almost_equal(array, [spline.point_at_t(x).v for x in t])
+        np_testing.assert_almost_equal(array, [spline.point_at_t(x, naive=True).v for x in t])
+        matrix = spline.basis_matrix(t)
+        np_testing.assert_almost_equal(matrix.sum(axis=1), 1)
+        # the basis functions are cached and shared by the splines with the same knots
+        other = BSpline2D([point * 2 for point in spline.points], 3, knots=knots)
+        np_testing.assert_almost_equal(other.point_at_t(t), 2*array)
+        self.assertEqual(spline.span(1), 5)
+        self.assertEqual(spline.span(4), 6)
+
+    ##############################################
+
+    def test_to_bezier(self):
+
+        random = np.random.RandomState(0)
+        points = np.cumsum(random.uniform(-10, 10, (20, 2)), axis=0)
+        for degree in (2, 3, 4, 5):
+            spline = BSpline2D(points, degree)
+            t = np.linspace(0, spline.end_knot, 501)
+            expected = spline.point_at_t(t)
+            bezier_form = spline.to_bezier_form()
+            self.assertEqual(bezier_form.number_of_points, spline.end_knot * (degree + 1))
+            np_testing.assert_almost_equal(bezier_form.point_at_t(t), expected)
+            tolerance = 0.01
+            curves = spline.to_bezier(tolerance)
+            for curve1, curve2 in zip(curves[:-1], curves[1:]):
+                self.assertEqual(curve1.end_point, curve2.start_point)
+            if degree <= 3:
+                self.assertEqual(len(curves), spline.end_knot)
+                span = np.minimum(t.astype(int), spline.end_knot - 1)
+                points_at_t = [curves[i].point_at_t(x - i).v for i, x in zip(span, t)]
+                np_testing.assert_almost_equal(points_at_t, expected)
+            else:
+                # distance to the flattened curves
+                polyline = np.concatenate([curve.flatten(tolerance / 10).array for curve in curves])
+                start = polyline[:-1]
+                direction = polyline[1:] - start
+                offset = expected[:,np.newaxis] - start
+                length_square = np.maximum(np.sum(direction**2, axis=1), 1e-300)
+                s = np.clip(np.sum(offset * direction, axis=2) / length_square, 0, 1)
+                delta = offset - direction * s[...,np.newaxis]
+                self.assertLess(np.max(np.min(np.hypot(delta[...,0], delta[...,1]), axis=1)), 1.1*tolerance)
+
+        # a spline of degree 1 is the polyline of its control points
+        segments = BSpline2D(points, 1).to_bezier()
+        self.assertEqual(len(segments), points.shape[0] - 1)
+        for segment in segments:
+            self.assertIsInstance(segment, Segment2D)
+        np_testing.assert_almost_equal([segment.start_point.v for segment in segments], points[:-1])
+        np_testing.assert_almost_equal([segment.end_point.v for segment in segments], points[1:])
+
+        knots = (0, 0, 0, 0, 1, 1.5, 4, 4, 4, 4)
+        spline = BSpline2D(points[:6], 3, knots=knots)
+        t = np.linspace(0, 4, 101)
+        np_testing.assert_almost_equal(spline.to_bezier_form().point_at_t(t), spline.point_at_t(t))
+        self.assertEqual(len(spline.to_bezier()), 3)
+
+    ##############################################
+
+    def test_bounding_box(self):
+
+        random = np.random.RandomState(0)
+        points = np.cumsum(random.uniform(-10, 10, (20, 2)), axis=0)
+        for degree in (2, 3, 5):
+            spline = BSpline2D(points, degree)
+            samples = spline.point_at_t(np.linspace(0, spline.end_knot, 100001))
+            bounding_box = spline.bounding_box
+            np_testing.assert_allclose(
+                (bounding_box.x.inf, bounding_box.y.inf, bounding_box.x.sup, bounding_box.y.sup),
+                np.concatenate((samples.min(axis=0), samples.max(axis=0))), atol=1e-6)
+
+####################################################################################################
+
 ### class TestCubicSpline(unittest.TestCase):
 ### 
 ###     ##############################################
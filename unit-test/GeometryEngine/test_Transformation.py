@@ -22,9 +22,14 @@
 
 import unittest
 
+import numpy as np
 import numpy.testing as np_testing
 
 from Patro.GeometryEngine.Transformation import *
+from Patro.GeometryEngine.Transformation import COMPOSE_CACHE_SIZE
+from Patro.GeometryEngine.Path import Path2D
+from Patro.GeometryEngine.Polygon import Polygon2D
+from Patro.GeometryEngine.Segment import Segment2D
 from Patro.GeometryEngine.Vector import Vector2D
 
 ####################################################################################################
@@ -68,6 +73,123 @@ class TestTransformation(unittest.TestCase):
 
         # np_testing.assert_almost_equal()
 
+    ##############################################
+
+    def test_type_kernels(self):
+
+        center = Vector2D(10, 10)
+        transformations = (
+            (AffineTransformation2D.Identity(), TransformationType.Identity),
+            (AffineTransformation2D.Translation(center), TransformationType.Translation),
+            (AffineTransformation2D.Scale(2), TransformationType.Scale),
+            (AffineTransformation2D.Scale(2, 3), TransformationType.Shear),
+            (AffineTransformation2D.Scale(-1, 1), TransformationType.XParity),
+            (AffineTransformation2D.Rotation(30), TransformationType.Rotation),
+            (AffineTransformation2D.RotationAt(center, 30), TransformationType.Generic),
+            (AffineTransformation2D.Screen(100), TransformationType.Generic),
+            (Transformation2D.Rotation(30), TransformationType.Rotation),
+            (Transformation2D.Scale(-1), TransformationType.Parity),
+        )
+
+        points = [Vector2D(x, y) for x, y in ((10, 20), (-5, 3), (0, -7))]
+        for transformation, transformation_type in transformations:
+            self.assertEqual(transformation.type, transformation_type)
+            # recompute the type from the matrix
+            self.assertEqual(transformation.__class__(transformation.array.copy()).type, transformation_type)
+            for point in points:
+                if isinstance(transformation, AffineTransformation2D):
+                    true_point = np.matmul(transformation.array, (point.x, point.y, 1))[:2]
+                else:
+                    true_point = np.matmul(transformation.array, point.v)
+                np_testing.assert_almost_equal((transformation * point).v, true_point)
+                np_testing.assert_almost_equal((transformation.inverse * (transformation * point)).v, point.v)
+            np_testing.assert_almost_equal(transformation.apply_to_array([point.v for point in points]),
+                                           [(transformation * point).v for point in points])
+
+        rotation_at = AffineTransformation2D.RotationAt(center, 90)
+        self.assertAlmostEqual(rotation_at * 10., 10.)
+        with self.assertRaises(ValueError):
+            AffineTransformation2D.Scale(2, 3) * 10.
+
+    ##############################################
+
+    def test_cache(self):
+
+        transformation = AffineTransformation2D.Rotation(90)
+        inverse = transformation.inverse
+        self.assertIs(transformation.inverse, inverse)
+        self.assertIs(inverse.inverse, transformation)
+
+        # modifying a transformation resets the caches
+        transformation *= AffineTransformation2D.Translation(Vector2D(10, 0))
+        self.assertIsNot(transformation.inverse, inverse)
+        np_testing.assert_almost_equal(np.matmul(transformation.inverse.array, transformation.array),
+                                       np.identity(3))
+
+        # modifying the inverse doesn't corrupt the transformation
+        inverse = transformation.inverse
+        inverse *= AffineTransformation2D.Screen(100)
+        self.assertIsNot(transformation.inverse, inverse)
+        self.assertIsNone(inverse._inverse)
+        np_testing.assert_almost_equal(np.matmul(transformation.inverse.array, transformation.array),
+                                       np.identity(3))
+
+        # the products are cached until one of the operands is modified
+        scale = AffineTransformation2D.Scale(10, -10)
+        product = scale.compose(transformation)
+        self.assertIs(scale.compose(transformation), product)
+        np_testing.assert_almost_equal(product.array, (scale * transformation).array)
+        transformation *= AffineTransformation2D.Translation(Vector2D(0, 5))
+        product = scale.compose(transformation)
+        np_testing.assert_almost_equal(product.array, (scale * transformation).array)
+        scale *= AffineTransformation2D.Scale(2)
+        self.assertIsNot(scale.compose(transformation), product)
+        np_testing.assert_almost_equal(scale.compose(transformation).array, (scale * transformation).array)
+        # a modified product isn't returned
+        product = scale.compose(transformation)
+        product *= AffineTransformation2D.Screen(100)
+        np_testing.assert_almost_equal(scale.compose(transformation).array, (scale * transformation).array)
+        # the cache is bounded
+        others = [AffineTransformation2D.Rotation(angle) for angle in range(2*COMPOSE_CACHE_SIZE)]
+        for other in others:
+            scale.compose(other)
+        self.assertEqual(len(scale._composed), COMPOSE_CACHE_SIZE)
+
+    ##############################################
+
+    def test_apply_to_array(self):
+
+        points = [Vector2D(x, y) for x, y in ((10, 20), (-5, 3), (0, -7))]
+        array = [point.v for point in points]
+        transformation = AffineTransformation2D.RotationAt(Vector2D(10, 10), 30)
+        np_testing.assert_almost_equal(transformation.apply_to_array(array),
+                                       [(transformation * point).v for point in points])
+
+        transformation = Transformation2D.Rotation(30)
+        np_testing.assert_almost_equal(transformation.apply_to_array(array),
+                                       [(transformation * point).v for point in points])
+
+    ##############################################
+
+    def test_apply_to_primitives(self):
+
+        transformation = AffineTransformation2D.RotationAt(Vector2D(10, 10), 90)
+
+        polygon = Polygon2D((0, 0), (10, 0), (10, 10))
+        area = polygon.area
+        segment = Segment2D((0, 0), (10, 0))
+        transformation.apply_to_primitives((polygon, segment))
+        self.assertTrue(polygon.start_point.almost_equal(Vector2D(20, 0)))
+        self.assertAlmostEqual(polygon.area, area)
+        self.assertTrue(segment.p1.almost_equal(Vector2D(20, 10)))
+
+        path = Path2D((0, 0))
+        path.horizontal_to(10)
+        path.line_to((10, 10))
+        path.apply_transformation(transformation)
+        self.assertTrue(path.p0.almost_equal(Vector2D(20, 0)))
+        self.assertTrue(path.stop_segment.stop_point.almost_equal(Vector2D(10, 20)))
+
 ####################################################################################################
 
 if __name__ == '__main__':
@@ -24,6 +24,8 @@ import unittest
 
 from math import sqrt
 
+from Patro.GeometryEngine.ScalarVector import ScalarVector2D
+from Patro.GeometryEngine.Transformation import AffineTransformation2D
 from Patro.GeometryEngine.Vector import *
 
 ####################################################################################################
@@ -154,6 +156,39 @@ class TestVector2D(unittest.TestCase):
 
 ####################################################################################################
 
+class TestScalarVector2D(unittest.TestCase):
+
+    ##############################################
+
+    def test_same_api(self):
+
+        direction = Vector2D(3, 1)
+        for x, y in ((10, 20), (-5, 3), (0, -7), (-4, -4)):
+            v1 = Vector2D(x, y)
+            v2 = ScalarVector2D(x, y)
+            self.assertEqual(v2, v1)
+            self.assertEqual(list(v2), [x, y])
+            for name in ('magnitude_square', 'magnitude', 'orientation'):
+                self.assertAlmostEqual(getattr(v2, name), getattr(v1, name))
+            for name in ('dot', 'cross', 'projection_on', 'deviation_with', 'angle_with'):
+                self.assertAlmostEqual(getattr(v2, name)(direction), getattr(v1, name)(direction))
+            for name in ('normal', 'anti_normal', 'parity', 'permute'):
+                self.assertTrue(getattr(v2, name).almost_equal(getattr(v1, name)))
+            self.assertTrue(v2.rotate(30).almost_equal(v1.rotate(30)))
+            self.assertTrue((v2 + direction - v2*2 / 4).almost_equal(v1 + direction - v1*2 / 4))
+            self.assertTrue(v2.to_normalised().almost_equal(v1.to_normalised()))
+
+        transformation = AffineTransformation2D.RotationAt(Vector2D(10, 10), 90)
+        v = ScalarVector2D(20, 10)
+        p = transformation * v
+        self.assertIsInstance(p, ScalarVector2D)
+        self.assertTrue(p.almost_equal(Vector2D(10, 20)))
+
+        with self.assertRaises(AttributeError):
+            v.z = 0
+
+####################################################################################################
+
 if __name__ == '__main__':
 
     unittest.main()